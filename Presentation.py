@@ -1,13 +1,15 @@
 from manim import *
-from manim_slides.slide import ThreeDSlide
+from manim_slides.slide import Slide, ThreeDSlide
 import random
 
+from util.fonts import setup_fonts
+from util.geometry_cache import CachedTex, CachedText
 from util.slide_number import SlideNumber
 from util.table_of_contents import show_toc
 from src.Ali import ali
-from src.Parsa import parsa
+from src.Parsa import parsa, parsa_projector, parsa_sparsity
 
-Text.set_default(font="Consolas") 
+setup_fonts("Consolas")
 
 toc_items = [
     "1. The Black Box Problem",
@@ -17,73 +19,118 @@ toc_items = [
     "5. Model Circuits & Interpretability"
 ]
 
-class Presentation(ThreeDSlide):
-    def construct(self):
-        t1 = Tex("Explainable AI", font_size=42)
-        t2 = Tex("in Sparse Transformers", font_size=42).next_to(t1, DOWN, buff=0.5)
-        t3 = Tex("Presenters: Parsa Salamatipour \& Ali Hasan Yazdi", font_size=20).next_to(t2, DOWN, buff=1)
-        t4 = Tex("Professor: Dr. Nazerfard", font_size=20).next_to(t3, DOWN, buff=0.2)
-        title = VGroup(
-            t1, t2, t3, t4
-        ).move_to(ORIGIN)
+SLIDE_COUNT = 16
+
+# The Ali section ends on slide 7, which attention shares; the projector is
+# slide 8 and the scene after it continues from there
+PROJECTOR_SLIDE = 8
+
+def opening(scene):
+    """Title, contents, the Ali section and attention."""
+    t1 = CachedTex("Explainable AI", font_size=42)
+    t2 = CachedTex("in Sparse Transformers", font_size=42).next_to(t1, DOWN, buff=0.5)
+    t3 = CachedTex("Presenters: Parsa Salamatipour \& Ali Hasan Yazdi", font_size=20).next_to(t2, DOWN, buff=1)
+    t4 = CachedTex("Professor: Dr. Nazerfard", font_size=20).next_to(t3, DOWN, buff=0.2)
+    title = VGroup(
+        t1, t2, t3, t4
+    ).move_to(ORIGIN)
+
+    scene.play(Write(title))
+    scene.wait(0.5)
+    scene.next_slide()
+
+    scene.play(Unwrite(title))
+    scene.wait(1)
+
+    # scene.next_slide()
+
+    show_toc(scene, toc_items)
+
+    slide_number = SlideNumber(scene, slide_count=SLIDE_COUNT)
+
+    ali(scene, slide_number)
+    parsa(scene, slide_number)
 
-        # Create a small cube
-        cube = Cube(side_length=0.5, fill_opacity=0.5).scale(4)
-        # cube.to_edge(RIGHT + DOWN) 
+    slide_number.end()
 
-        self.play(Write(title))
-        self.wait(0.5)
-        self.next_slide()
+def projector(scene):
+    """The embedding projector."""
+    slide_number = SlideNumber(scene, slide_count=SLIDE_COUNT, start=PROJECTOR_SLIDE)
+    parsa_projector(scene)
+    slide_number.end()
 
-        self.play(Unwrite(title))
-        self.wait(1)
+def closing(scene):
+    """Sparse attention up to the circuits, references and thanks."""
+    slide_number = SlideNumber(scene, slide_count=SLIDE_COUNT, start=PROJECTOR_SLIDE + 1)
+    parsa_sparsity(scene, slide_number)
+    slide_number.end()
 
-        # self.next_slide()
+    references_title = CachedTex(r"\section*{References}", font_size=48).to_edge(UP).scale(0.8)
+    scene.play(Write(references_title))
 
-        show_toc(self, toc_items)
+    ref1 = CachedTex(r"""
+    \begin{flushleft}
+    \hangindent=1.5em\hangafter=1
+    [1] F. K. Došilović, M. Brčić, and N. Hlupić, ``Explainable artificial intelligence: A survey,'' in \textit{Proc. 41st Int. Conv. Information and Communication Technology, Electronics and Microelectronics (MIPRO)}, pp. 0210-0215, 2018.
+    \end{flushleft}
+    """, font_size=26)
 
-        slide_number = SlideNumber(self, slide_count=13)
+    ref2 = CachedTex(r"""
+    \begin{flushleft}
+    \hangindent=1.5em\hangafter=1
+    [2]  L. Bereska and E. Gavves, ``Mechanistic interpretability for AI safety—A review,'' \textit{arXiv preprint arXiv:2404.14082}, 2024.
+    \end{flushleft}
+    """, font_size=26)
 
-        ali(self, slide_number)
-        parsa(self, slide_number)
+    ref3 = CachedTex(r"""
+    \begin{flushleft}
+    \hangindent=1.5em\hangafter=1
+    [3] L. Gao, A. Rajaram, J. Coxon, S. V. Govande, B. Baker, and D. Mossing, ``Weight-sparse transformers have interpretable circuits,'' \textit{arXiv preprint arXiv:2511.13653}, 2025.
+    \end{flushleft}
+    """, font_size=26)
 
-        slide_number.end()
+    # Arrange references
+    refs = VGroup(ref1, ref2, ref3).arrange(DOWN, aligned_edge=LEFT, buff=1).next_to(references_title, DOWN, buff=0.5)
 
-        references_title = Tex(r"\section*{References}", font_size=48).to_edge(UP).scale(0.8)
-        self.play(Write(references_title))
+    scene.play(Write(refs))
 
-        ref1 = Tex(r"""
-        \begin{flushleft}
-        \hangindent=1.5em\hangafter=1
-        [1] F. K. Došilović, M. Brčić, and N. Hlupić, ``Explainable artificial intelligence: A survey,'' in \textit{Proc. 41st Int. Conv. Information and Communication Technology, Electronics and Microelectronics (MIPRO)}, pp. 0210-0215, 2018.
-        \end{flushleft}
-        """, font_size=26)
+    scene.next_slide()
 
-        ref2 = Tex(r"""
-        \begin{flushleft}
-        \hangindent=1.5em\hangafter=1
-        [2]  L. Bereska and E. Gavves, ``Mechanistic interpretability for AI safety—A review,'' \textit{arXiv preprint arXiv:2404.14082}, 2024.
-        \end{flushleft}
-        """, font_size=26)
+    scene.play(Unwrite(refs), Unwrite(references_title))
 
-        ref3 = Tex(r"""
-        \begin{flushleft}
-        \hangindent=1.5em\hangafter=1
-        [3] L. Gao, A. Rajaram, J. Coxon, S. V. Govande, B. Baker, and D. Mossing, ``Weight-sparse transformers have interpretable circuits,'' \textit{arXiv preprint arXiv:2511.13653}, 2025.
-        \end{flushleft}
-        """, font_size=26)
+    title = CachedText("Thanks for watching!", font_size=72)
+    title.set_color_by_gradient(BLUE, PURPLE)
+    scene.play(Write(title), run_time=2)
 
-        # Arrange references
-        refs = VGroup(ref1, ref2, ref3).arrange(DOWN, aligned_edge=LEFT, buff=1).next_to(references_title, DOWN, buff=0.5)
+    scene.play(Circumscribe(title, color=WHITE, time_width=0.5, fade_out=True))
 
-        self.play(Write(refs))
 
-        self.next_slide()
+def deck(scene):
+    """The whole presentation in one scene."""
+    opening(scene)
+    projector(scene)
+    closing(scene)
 
-        self.play(Unwrite(refs), Unwrite(references_title))
 
-        title = Text("Thanks for watching!", font_size=72)
-        title.set_color_by_gradient(BLUE, PURPLE)
-        self.play(Write(title), run_time=2)
+# Only the projector needs the 3D camera; the rest of the deck renders on the
+# 2D moving camera, so no other frame pays for depth sorting and the
+# fixed-in-frame bookkeeping. manim-slides plays the scenes in this order.
+class Presentation(Slide, MovingCameraScene):
+    def construct(self):
+        opening(self)
+
+
+class EmbeddingProjector(ThreeDSlide):
+    def construct(self):
+        projector(self)
+
 
-        self.play(Circumscribe(title, color=WHITE, time_width=0.5, fade_out=True))
\ No newline at end of file
+class PresentationEnd(Slide, MovingCameraScene):
+    def construct(self):
+        closing(self)
+
+
+class ThreeDPresentation(ThreeDSlide):
+    """The whole deck on the 3D camera, to compare render times against."""
+    def construct(self):
+        deck(self)
@@ -1,19 +1,26 @@
 #!/bin/bash
 
+# The deck's scenes in playing order; only EmbeddingProjector uses the 3D camera
+SCENES="Presentation EmbeddingProjector PresentationEnd"
+
 install() {
     pip install -r requirements.txt "$@"
 }
 
 render() {
-    manim-slides render Presentation.py Presentation "$@"
+    manim-slides render Presentation.py $SCENES "$@"
+}
+
+render_3d() {
+    manim-slides render Presentation.py ThreeDPresentation "$@"
 }
 
 show() {
-    manim-slides Presentation "$@"
+    manim-slides $SCENES "$@"
 }
 
 show_html() {
-    manim-slides convert Presentation slides.html --open "$@"
+    manim-slides convert $SCENES slides.html --open "$@"
 }
 
 slides_config() {
@@ -40,6 +47,9 @@ case "$cmd" in
     --render)
         render "$@"
         ;;
+    --render-3d)
+        render_3d "$@"
+        ;;
     --show)
         show "$@"
         ;;
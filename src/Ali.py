@@ -1,20 +1,33 @@
+import os
+from functools import lru_cache
+
 from manim import *
 from manim_slides.slide import ThreeDSlide
 
+from util.attribution import grad_cam, lime, occlusion
+from util.benchmark_models import MODEL_BENCHMARK_PATH
+from util.decision_tree import decision_path, make_tree
+from util.fonts import GlyphText
+from util.geometry_cache import CachedTex, CachedText
+from util.point_cloud import DotCloud, GrowDots, load_points
 from util.slide_number import SlideNumber
+from util.timeline import Timeline
+from util.toy_mlp import grid_model
+from util.transition import clear_scene
+from util.tree_mobject import DecisionTreeMobject
 
 def ali(scene: ThreeDSlide, slide_number: SlideNumber):
     # ---------------------------
     # The Black Box Problem Scene
     # ---------------------------
 
-    title = Tex(r"\section*{The Black Box Problem}", font_size=48, color=BLUE)
+    title = CachedTex(r"\section*{The Black Box Problem}", font_size=48, color=BLUE)
     title.to_edge(UP, buff=0.5)
     scene.play(Write(title))
     scene.wait(0.5)
 
     # Input features on the left
-    inputs_label = Tex(r"\textbf{Inputs}", font_size=32, color=GREEN).shift(LEFT * 4.5 + UP * 2)
+    inputs_label = CachedTex(r"\textbf{Inputs}", font_size=32, color=GREEN).shift(LEFT * 4.5 + UP * 2)
 
     # Create input features
     input_features_dots = VGroup(
@@ -25,10 +38,10 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
         ).arrange(DOWN, buff=0.4).shift(LEFT * 3.5 + DOWN * 0.5)
 
     input_features_labels = VGroup(
-            Tex(r"Age", font_size=24, color=WHITE),
-            Tex(r"Income", font_size=24, color=WHITE),
-            Tex(r"Credit Score", font_size=24, color=WHITE),
-            Tex(r"Employment Status", font_size=24, color=WHITE),
+            CachedTex(r"Age", font_size=24, color=WHITE),
+            CachedTex(r"Income", font_size=24, color=WHITE),
+            CachedTex(r"Credit Score", font_size=24, color=WHITE),
+            CachedTex(r"Employment Status", font_size=24, color=WHITE),
         ).arrange(DOWN, buff=0.4, center=False)
 
     for i, label in enumerate(input_features_labels):
@@ -44,19 +57,19 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
         stroke_width=3,
     ).shift(ORIGIN + DOWN * 0.2)
 
-    black_box_label = Tex(r"Black Box\\Model", font_size=24, color=WHITE)
+    black_box_label = CachedTex(r"Black Box\\Model", font_size=24, color=WHITE)
     black_box_label.move_to(black_box.get_center() + UP * 0.8)
 
-    question_mark = Text("?", font_size=80, color=YELLOW)
+    question_mark = GlyphText("?", font_size=80, color=YELLOW)
     question_mark.move_to(black_box.get_center() + DOWN * 0.3)
 
     # Output on the right
-    outputs_label = Tex(r"\textbf{Output}", font_size=32, color=RED).shift(RIGHT * 4.5 + UP * 2)
+    outputs_label = CachedTex(r"\textbf{Output}", font_size=32, color=RED).shift(RIGHT * 4.5 + UP * 2)
 
     output_box = VGroup(
         Rectangle(width=2, height=1.2, color=RED, fill_opacity=0.3),
-        Tex("Approve", font_size=24, color=GREEN).shift(UP * 0.2),
-        Tex("Reject", font_size=24, color=RED).shift(DOWN * 0.2),
+        CachedTex("Approve", font_size=24, color=GREEN).shift(UP * 0.2),
+        CachedTex("Reject", font_size=24, color=RED).shift(DOWN * 0.2),
     ).shift(RIGHT * 4.5 + DOWN * 0.2)
 
     # Arrows
@@ -119,7 +132,7 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
     # ---------------------------
 
     # New title
-    new_title = Tex(r"\section*{From Black Box to Explainable AI}", font_size=48, color=BLUE)
+    new_title = CachedTex(r"\section*{From Black Box to Explainable AI}", font_size=48, color=BLUE)
     new_title.to_edge(UP, buff=0.5)
     scene.play(Write(new_title))
     scene.wait(0.5)
@@ -143,24 +156,24 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
         stroke_width=3,
     ).shift(RIGHT * 3 + DOWN * 0.2)
 
-    transparent_box_label = Tex(r"XAI\\Model", font_size=24, color=BLUE)
+    transparent_box_label = CachedTex(r"XAI\\Model", font_size=24, color=BLUE)
     transparent_box_label.move_to(transparent_box.get_center() + UP * 1.3)
 
     # Create explanation icons inside transparent box
     explanations = VGroup(
-        Tex(r"Age", font_size=16, color=WHITE),
-        Tex(r"Income", font_size=16, color=WHITE),
-        Tex(r"Decision Path", font_size=16, color=WHITE),
+        CachedTex(r"Age", font_size=16, color=WHITE),
+        CachedTex(r"Income", font_size=16, color=WHITE),
+        CachedTex(r"Decision Path", font_size=16, color=WHITE),
     ).arrange(DOWN, buff=0.3).move_to(transparent_box.get_center())
 
     # Feature importance labels on the right
-    feature_importance_label = Tex(r"Feature Importance", font_size=20, color=YELLOW)
+    feature_importance_label = CachedTex(r"Feature Importance", font_size=20, color=YELLOW)
     feature_importance_label.next_to(transparent_box, RIGHT, buff=1).shift(UP * 1)
 
-    rules_label = Tex(r"Decision Rules", font_size=20, color=YELLOW)
+    rules_label = CachedTex(r"Decision Rules", font_size=20, color=YELLOW)
     rules_label.next_to(transparent_box, RIGHT, buff=1)
 
-    highlights_label = Tex(r"Key Factors", font_size=20, color=YELLOW)
+    highlights_label = CachedTex(r"Key Factors", font_size=20, color=YELLOW)
     highlights_label.next_to(transparent_box, RIGHT, buff=1).shift(DOWN * 1)
 
     # Arrows from transparent box to explanations
@@ -233,7 +246,7 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
 
     scene.wait(0.5)
     scene.next_slide()
-    scene.play(*[FadeOut(mob) for mob in scene.mobjects], run_time=1)
+    clear_scene(scene)
     slide_number.incr()
 
     # ---------------------------
@@ -243,7 +256,7 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
     scene.wait(0.5)
     scene.next_slide()
 
-    scene.play(*[FadeOut(mob) for mob in scene.mobjects], run_time=1)
+    clear_scene(scene)
     slide_number.incr()
 
     # ---------------------------
@@ -253,7 +266,7 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
 
     scene.wait(0.5)
     scene.next_slide()
-    scene.play(*[FadeOut(mob) for mob in scene.mobjects], run_time=1)
+    clear_scene(scene)
     slide_number.incr()
 
     # ---------------------------
@@ -263,7 +276,7 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
 
     scene.wait(0.5)
     scene.next_slide()
-    scene.play(*[FadeOut(mob) for mob in scene.mobjects], run_time=1)
+    clear_scene(scene)
     slide_number.incr()
 
     # ---------------------------
@@ -272,208 +285,85 @@ def ali(scene: ThreeDSlide, slide_number: SlideNumber):
     approaches_slide(scene)
     scene.wait(0.5)
     scene.next_slide()
-    scene.play(*[FadeOut(mob) for mob in scene.mobjects], run_time=1)
+    clear_scene(scene)
     slide_number.incr()
 
-def dtree_slide(scene: ThreeDSlide):
-    title = Tex(r"\section*{Inherently Explainable Models}", font_size=48, color=BLUE)
+# The loan example from the Black Box slide as a tree in flat-array form:
+# Age > 30? -> Income > 50k? -> Approve, anything else is rejected
+LOAN_TREE = make_tree(
+    children_left=[1, -1, 3, -1, -1],
+    children_right=[2, -1, 4, -1, -1],
+    feature=[0, -2, 1, -2, -2],
+    threshold=[30, -2, 50, -2, -2],
+    value=[[3, 2], [2, 0], [1, 2], [1, 0], [0, 2]],
+    feature_names=["Age", "Income", "Credit Score", "Employment Status"],
+    class_names=["Reject", "Approve"],
+)
+LOAN_FEATURE_FORMATS = ["{:g}", "{:g}k", "{:g}", "{:g}"]
+LOAN_CLASS_COLORS = [RED, GREEN]
+LOAN_OUTCOMES = {"Reject": "Rejected", "Approve": "Approved"}
+
+def dtree_slide(scene: ThreeDSlide, tree=LOAN_TREE, example=(35, 60, 700, 1)):
+    timeline = Timeline(scene)
+
+    title = CachedTex(r"\section*{Inherently Explainable Models}", font_size=48, color=BLUE)
     title.to_edge(UP, buff=0.5)
-    scene.play(Write(title))
-    scene.wait(0.5)
-
-    # Create decision tree nodes
-    # Root node
-    root_node = RoundedRectangle(
-        width=2.5,
-        height=0.8,
-        corner_radius=0.15,
-        color=BLUE,
-        fill_opacity=0.3,
-        stroke_width=3,
-    ).shift(UP * 2)
-
-    root_label = Tex(r"Age $>$ 30?", font_size=24, color=WHITE)
-    root_label.move_to(root_node.get_center())
-
-    # Left child node (Income decision)
-    left_node = RoundedRectangle(
-        width=2.5,
-        height=0.8,
-        corner_radius=0.15,
-        color=BLUE,
-        fill_opacity=0.3,
-        stroke_width=3,
-    ).shift(LEFT * 3 + DOWN * 0.5)
-
-    left_label = Tex(r"Income $>$ 50k?", font_size=24, color=WHITE)
-    left_label.move_to(left_node.get_center())
-
-    # Right child node (Reject)
-    right_node = RoundedRectangle(
-        width=2,
-        height=0.8,
-        corner_radius=0.15,
-        color=RED,
-        fill_opacity=0.4,
-        stroke_width=3,
-    ).shift(RIGHT * 3 + DOWN * 0.5)
-
-    right_label = Tex(r"\textbf{Reject}", font_size=24, color=WHITE)
-    right_label.move_to(right_node.get_center())
-
-    # Left-left leaf (Approve)
-    left_left_node = RoundedRectangle(
-        width=2,
-        height=0.8,
-        corner_radius=0.15,
-        color=GREEN,
-        fill_opacity=0.4,
-        stroke_width=3,
-    ).shift(LEFT * 4.5 + DOWN * 3)
-
-    left_left_label = Tex(r"\textbf{Approve}", font_size=24, color=WHITE)
-    left_left_label.move_to(left_left_node.get_center())
-
-    # Left-right leaf (Reject)
-    left_right_node = RoundedRectangle(
-        width=2,
-        height=0.8,
-        corner_radius=0.15,
-        color=RED,
-        fill_opacity=0.4,
-        stroke_width=3,
-    ).shift(LEFT * 1.5 + DOWN * 3)
-
-    left_right_label = Tex(r"\textbf{Reject}", font_size=24, color=WHITE)
-    left_right_label.move_to(left_right_node.get_center())
-
-    # Create arrows
-    # Root to left child
-    arrow_root_left = Arrow(
-        start=root_node.get_bottom() + LEFT * 0.6,
-        end=left_node.get_top() + RIGHT * 0.3,
-        color=GREEN,
-        buff=0.1,
-        stroke_width=4,
-        max_tip_length_to_length_ratio=0.2,
-    )
-    yes_label_1 = Tex("Yes", font_size=20, color=GREEN)
-    yes_label_1.next_to(arrow_root_left, LEFT, buff=0.1)
-
-    # Root to right child
-    arrow_root_right = Arrow(
-        start=root_node.get_bottom() + RIGHT * 0.6,
-        end=right_node.get_top() + LEFT * 0.3,
-        color=RED,
-        buff=0.1,
-        stroke_width=4,
-        max_tip_length_to_length_ratio=0.2,
-    )
-    no_label_1 = Tex("No", font_size=20, color=RED)
-    no_label_1.next_to(arrow_root_right, RIGHT, buff=0.1)
-
-    # Left node to left-left leaf
-    arrow_left_left = Arrow(
-        start=left_node.get_bottom() + LEFT * 0.6,
-        end=left_left_node.get_top() + RIGHT * 0.3,
-        color=GREEN,
-        buff=0.1,
-        stroke_width=4,
-        max_tip_length_to_length_ratio=0.2,
-    )
-    yes_label_2 = Tex("Yes", font_size=20, color=GREEN)
-    yes_label_2.next_to(arrow_left_left, LEFT, buff=0.05)
-
-    # Left node to left-right leaf
-    arrow_left_right = Arrow(
-        start=left_node.get_bottom() + RIGHT * 0.6,
-        end=left_right_node.get_top() + LEFT * 0.3,
-        color=RED,
-        buff=0.1,
-        stroke_width=4,
-        max_tip_length_to_length_ratio=0.2,
-    )
-    no_label_2 = Tex("No", font_size=20, color=RED)
-    no_label_2.next_to(arrow_left_right, RIGHT, buff=0.05)
-
-    # Animate the tree construction
-    
-    # Start with root node
-    scene.play(DrawBorderThenFill(root_node), Write(root_label), run_time=0.5)
-
-    # Show branches from root
-    scene.play(
-        Create(arrow_root_left),
-        Write(yes_label_1),
-        Create(arrow_root_right),
-        Write(no_label_1),
-        run_time=0.5,
-    )
-
-    # Show left and right children
-    scene.play(
-        DrawBorderThenFill(left_node),
-        Write(left_label),
-        DrawBorderThenFill(right_node),
-        Write(right_label),
-        run_time=0.5,
-    )
-
-    # Show branches from left node
-    scene.play(
-        Create(arrow_left_left),
-        Write(yes_label_2),
-        Create(arrow_left_right),
-        Write(no_label_2),
-        run_time=0.5,
-    )
-
-    # Show final leaves
-    scene.play(
-        DrawBorderThenFill(left_left_node),
-        Write(left_left_label),
-        DrawBorderThenFill(left_right_node),
-        Write(left_right_label),
-        run_time=0.5,
-    )
+    timeline.add(Write(title))
+    timeline.wait(0.5)
+
+    # Lay out the whole tree from its arrays and fit it below the title
+    dtree = DecisionTreeMobject(tree, LOAN_CLASS_COLORS, LOAN_FEATURE_FORMATS)
+    if dtree.width > scene.camera.frame_width - 1:
+        dtree.scale_to_fit_width(scene.camera.frame_width - 1)
+    if dtree.height > scene.camera.frame_height - 2.5:
+        dtree.scale_to_fit_height(scene.camera.frame_height - 2.5)
+    dtree.next_to(title, DOWN, buff=0.6)
+
+    # Animate the tree construction level by level
+    for depth in range(len(dtree.nodes)):
+        if depth > 0:
+            # Show branches into this level
+            timeline.add(
+                *[Create(edges) for edges in dtree.edges[depth]],
+                *[Write(label) for label in dtree.edge_labels[depth]],
+                run_time=0.5,
+            )
+        timeline.add(
+            *[DrawBorderThenFill(nodes) for nodes in dtree.nodes[depth]],
+            *[Write(label) for label in dtree.node_labels[depth]],
+            run_time=0.5,
+        )
 
-    scene.wait(0.5)
-    scene.next_slide()
+    timeline.wait(0.5)
+    timeline.next_slide()
 
-    # Highlight a decision path (example: Age > 30 → Income > 50k → Approve)
-    path_label = Tex(r"Example Decision:", font_size=28, color=YELLOW)
-    path_label.next_to(right_node, DOWN, buff=1.5)
-    scene.play(Write(path_label), run_time=0.3)
-    scene.wait(0.2)
+    # Highlight the decision path of the example row by traversing the arrays
+    steps = dtree.highlight_path(example)
+    leaf = decision_path(tree, example)[-1]
+    outcome = LOAN_OUTCOMES[str(tree["class_names"][tree["value"][leaf].argmax()])]
 
-    # Highlight the path
-    scene.play(
-        root_node.animate.set_stroke(color=YELLOW, width=5),
-        arrow_root_left.animate.set_color(YELLOW).set_stroke(width=6),
-        run_time=0.6,
+    path_label = CachedTex(r"Example Decision:", font_size=28, color=YELLOW)
+    explanation = CachedTex(
+        outcome + " because " + " and ".join(dtree.explain(example, LOAN_FEATURE_FORMATS)),
+        font_size=24,
+        color=YELLOW,
     )
-    scene.wait(0.2)
+    VGroup(path_label, explanation).arrange(DOWN, buff=0.3, aligned_edge=LEFT).to_edge(RIGHT).align_to(dtree, UP)
 
-    scene.play(
-        left_node.animate.set_stroke(color=YELLOW, width=5),
-        arrow_left_left.animate.set_color(YELLOW).set_stroke(width=6),
-        run_time=0.6,
-    )
-    scene.wait(0.2)
+    timeline.add(Write(path_label), run_time=0.3)
+    timeline.wait(0.2)
 
-    scene.play(left_left_node.animate.set_stroke(color=YELLOW, width=5), run_time=0.6)
-    scene.wait(0.5)
+    for outline, arrow in steps:
+        timeline.add(Create(outline), *([GrowArrow(arrow)] if arrow else []), run_time=0.6)
+        timeline.wait(0.2)
+    timeline.wait(0.3)
 
     # Add explanation text
-    explanation = Tex(
-        r"Approved because Age $>$ 30 and Income $>$ 50k",
-        font_size=24,
-        color=YELLOW,
-    )
-    explanation.next_to(path_label, DOWN, buff=0.3)
-    scene.play(Write(explanation), run_time=1)
+    timeline.add(Write(explanation), run_time=1)
+    timeline.play()
 
 def xai_matters_slide(scene: ThreeDSlide):
+    timeline = Timeline(scene)
 
     # ---------------------------
     # Why XAI Matters Scene
@@ -481,27 +371,27 @@ def xai_matters_slide(scene: ThreeDSlide):
     my_template = TexTemplate()
     my_template.add_to_preamble(r"\usepackage{fontawesome5}")
 
-    title = Tex(r"\section*{Why XAI Matters}", font_size=48, color=BLUE)
+    title = CachedTex(r"\section*{Why XAI Matters}", font_size=48, color=BLUE)
     title.to_edge(UP, buff=0.5)
-    scene.play(Write(title))
-    scene.wait(0.5)
+    timeline.add(Write(title))
+    timeline.wait(0.5)
 
     # Create two-column structure
     # Left column: Decision Understanding
-    left_title = Tex(r"\textbf{Decision Understanding}", font_size=32, color=GREEN)
+    left_title = CachedTex(r"\textbf{Decision Understanding}", font_size=32, color=GREEN)
     left_title.shift(LEFT * 3.5 + UP * 1.5)
 
     # Icons and text for left column (using Text for icons and explanations)
-    understanding_icon = Tex(r"\faEye", tex_template=my_template, font_size=40).shift(LEFT * 5 + UP * 0.3)
-    understanding_text = Tex(r"Understanding", font_size=22, color=WHITE)
+    understanding_icon = CachedTex(r"\faEye", tex_template=my_template, font_size=40).shift(LEFT * 5 + UP * 0.3)
+    understanding_text = CachedTex(r"Understanding", font_size=22, color=WHITE)
     understanding_text.next_to(understanding_icon, RIGHT, buff=0.3)
 
-    debug_icon = Tex(r"\faTools", tex_template=my_template, font_size=40).shift(LEFT * 5 + DOWN * 0.8)
-    debug_text = Tex(r"Debugging", font_size=22, color=WHITE)
+    debug_icon = CachedTex(r"\faTools", tex_template=my_template, font_size=40).shift(LEFT * 5 + DOWN * 0.8)
+    debug_text = CachedTex(r"Debugging", font_size=22, color=WHITE)
     debug_text.next_to(debug_icon, RIGHT, buff=0.3)
 
-    bias_icon = Tex(r"\faBalanceScale", tex_template=my_template, font_size=40).shift(LEFT * 5 + DOWN * 1.9)
-    bias_text = Tex(r"Bias Detection", font_size=22, color=WHITE)
+    bias_icon = CachedTex(r"\faBalanceScale", tex_template=my_template, font_size=40).shift(LEFT * 5 + DOWN * 1.9)
+    bias_text = CachedTex(r"Bias Detection", font_size=22, color=WHITE)
     bias_text.next_to(bias_icon, RIGHT, buff=0.3)
 
     left_group = VGroup(
@@ -515,7 +405,7 @@ def xai_matters_slide(scene: ThreeDSlide):
     )
 
     # Right column: Model Selection
-    right_title = Tex(r"\textbf{Model Selection}", font_size=32, color=ORANGE)
+    right_title = CachedTex(r"\textbf{Model Selection}", font_size=32, color=ORANGE)
     right_title.shift(RIGHT * 3.5 + UP * 1.5)
 
     # Model A: High accuracy, no explanation (black box)
@@ -525,18 +415,18 @@ def xai_matters_slide(scene: ThreeDSlide):
     ).shift(RIGHT * 3.5 + UP * 0.3)
 
     # Label next to the box
-    model_a_title = Tex(r"\textbf{Model A}", font_size=24, color=WHITE)
+    model_a_title = CachedTex(r"\textbf{Model A}", font_size=24, color=WHITE)
     model_a_title.next_to(model_a_box, LEFT, buff=0.2)
 
     # Question marks inside the dark box
     model_a_questions = VGroup(
-        Text("?", font_size=40, color=GRAY_B),
-        Text("?", font_size=40, color=GRAY_B),
-        Text("?", font_size=40, color=GRAY_B),
+        GlyphText("?", font_size=40, color=GRAY_B),
+        GlyphText("?", font_size=40, color=GRAY_B),
+        GlyphText("?", font_size=40, color=GRAY_B),
     ).arrange(RIGHT, buff=0.3).move_to(model_a_box.get_center())
 
     # Caption below
-    model_a_caption = Tex(r"High accuracy", font_size=20, color=GREEN)
+    model_a_caption = CachedTex(r"High accuracy", font_size=20, color=GREEN)
     model_a_caption.next_to(model_a_box, DOWN, buff=0.2)
 
     # Model B: Slightly lower accuracy, explainable
@@ -546,20 +436,20 @@ def xai_matters_slide(scene: ThreeDSlide):
     ).shift(RIGHT * 3.5 + DOWN * 2)
 
     # Label above the box
-    model_b_title = Tex(r"\textbf{Model B}", font_size=24, color=WHITE)
+    model_b_title = CachedTex(r"\textbf{Model B}", font_size=24, color=WHITE)
     model_b_title.next_to(model_b_box, LEFT, buff=0.2)
 
     # Visible elements inside: feature names, rules, decision path
     model_b_contents = VGroup(
-        Tex(r"\textbf{Features:}", font_size=14, color=WHITE),
-        Tex(r"Age, Income, Credit", font_size=12, color=BLUE_B),
-        Tex(r"\textbf{Rules:}", font_size=14, color=WHITE),
-        Tex(r"If Age $>$ 30 $\land$ Income $>$ 50k", font_size=10, color=BLUE_B),
-        Tex(r"\textbf{Decision Path}", font_size=14, color=WHITE),
+        CachedTex(r"\textbf{Features:}", font_size=14, color=WHITE),
+        CachedTex(r"Age, Income, Credit", font_size=12, color=BLUE_B),
+        CachedTex(r"\textbf{Rules:}", font_size=14, color=WHITE),
+        CachedTex(r"If Age $>$ 30 $\land$ Income $>$ 50k", font_size=10, color=BLUE_B),
+        CachedTex(r"\textbf{Decision Path}", font_size=14, color=WHITE),
     ).arrange(DOWN, buff=0.1).move_to(model_b_box.get_center())
 
     # Caption below
-    model_b_caption = Tex(r"Slightly lower accuracy", font_size=20, color=YELLOW)
+    model_b_caption = CachedTex(r"Slightly lower accuracy", font_size=20, color=YELLOW)
     model_b_caption.next_to(model_b_box, DOWN, buff=0.2)
 
     # Arrow pointing to Model B
@@ -571,7 +461,7 @@ def xai_matters_slide(scene: ThreeDSlide):
         stroke_width=6,
     )
 
-    chosen_label = Tex(r"Chosen\\Model", font_size=20, color=YELLOW)
+    chosen_label = CachedTex(r"Chosen\\Model", font_size=20, color=YELLOW)
     chosen_label.next_to(chosen_arrow, RIGHT, buff=0.2)
 
     right_group = VGroup(
@@ -581,142 +471,178 @@ def xai_matters_slide(scene: ThreeDSlide):
     )
 
     # Animate left column
-    scene.play(Write(left_title), run_time=0.8)
-    scene.wait(0.3)
+    timeline.add(Write(left_title), run_time=0.8)
+    timeline.wait(0.3)
 
-    scene.play(FadeIn(understanding_icon), Write(understanding_text), run_time=0.8)
-    scene.wait(0.2)
+    timeline.add(FadeIn(understanding_icon), Write(understanding_text), run_time=0.8)
+    timeline.wait(0.2)
 
-    scene.play(FadeIn(debug_icon), Write(debug_text), run_time=0.8)
-    scene.wait(0.2)
+    timeline.add(FadeIn(debug_icon), Write(debug_text), run_time=0.8)
+    timeline.wait(0.2)
 
-    scene.play(FadeIn(bias_icon), Write(bias_text), run_time=0.8)
-    scene.wait(0.5)
+    timeline.add(FadeIn(bias_icon), Write(bias_text), run_time=0.8)
+    timeline.wait(0.5)
 
     # Animate right column
-    scene.play(Write(right_title), run_time=0.8)
-    scene.wait(0.3)
+    timeline.add(Write(right_title), run_time=0.8)
+    timeline.wait(0.3)
 
     # Animate Model A (black box)
-    scene.play(
+    timeline.add(
         DrawBorderThenFill(model_a_box),
         Write(model_a_title),
         run_time=1.2
     )
-    scene.wait(0.3)
+    timeline.wait(0.3)
     
-    scene.play(
+    timeline.add(
         *[FadeIn(q) for q in model_a_questions],
         run_time=0.8
     )
-    scene.wait(0.2)
+    timeline.wait(0.2)
     
-    scene.play(Write(model_a_caption), run_time=0.6)
-    scene.wait(0.3)
+    timeline.add(Write(model_a_caption), run_time=0.6)
+    timeline.wait(0.3)
 
     # Animate Model B (explainable)
-    scene.play(
+    timeline.add(
         DrawBorderThenFill(model_b_box),
         Write(model_b_title),
         run_time=1.2
     )
-    scene.wait(0.3)
+    timeline.wait(0.3)
     
-    scene.play(
+    timeline.add(
         *[Write(content) for content in model_b_contents],
         lag_ratio=0.2,
         run_time=1.5
     )
-    scene.wait(0.2)
+    timeline.wait(0.2)
     
-    scene.play(Write(model_b_caption), run_time=0.6)
-    scene.wait(0.5)
+    timeline.add(Write(model_b_caption), run_time=0.6)
+    timeline.wait(0.5)
 
     # Show the choice
-    scene.play(Create(chosen_arrow), Write(chosen_label), run_time=1)
-    scene.wait(0.3)
+    timeline.add(Create(chosen_arrow), Write(chosen_label), run_time=1)
+    timeline.wait(0.3)
 
     # Highlight Model B with a pulse effect
-    scene.play(model_b_box.animate.set_stroke(color=YELLOW, width=5), run_time=0.8)
-    scene.wait(0.3)
+    timeline.add(model_b_box.animate.set_stroke(color=YELLOW, width=5), run_time=0.8)
+    timeline.wait(0.3)
 
-    scene.play(model_b_box.animate.set_stroke(color=GREEN, width=3), run_time=0.8)
+    timeline.add(model_b_box.animate.set_stroke(color=GREEN, width=3), run_time=0.8)
+    timeline.play()
 
 
-def explain_predictive_slide(scene: ThreeDSlide):
+def explain_predictive_slide(scene: ThreeDSlide, data_path=None):
+    """
+    Explainability against predictive power: the measured benchmark in
+    cache/model_benchmark.csv when it exists, else the hand-made scores.
+    """
+    if data_path is None:
+        data_path = MODEL_BENCHMARK_PATH if os.path.exists(MODEL_BENCHMARK_PATH) else "assets/model_tradeoff.csv"
+    # Model positions (x: explainability, y: predictive power), one row per model
+    data = load_points(data_path)
+    measured = "test_accuracy" in data
 
-    title = Tex(
+    title = CachedTex(
         r"\section*{Explainability vs Predictive Power}", font_size=48, color=BLUE
     )
     title.to_edge(UP, buff=0.5)
     scene.play(Write(title))
     scene.wait(0.5)
 
+    # Measured accuracies are real percentages a few points apart, so the
+    # y axis spans their range and is numbered; the scores use 0-10 unlabelled
+    if measured:
+        low = max(0, 5 * np.floor(data["accuracy"].min() / 5 - 0.5))
+        high = min(100, 5 * np.ceil(data["accuracy"].max() / 5 + 0.5))
+        y_range = [low, high, 5 if high - low <= 40 else 10]
+    else:
+        y_range = [0, 10, 2]
+
     # Create axes
     axes = Axes(
         x_range=[0, 10, 2],
-        y_range=[0, 10, 2],
+        y_range=y_range,
         x_length=8,
         y_length=6,
         axis_config={"color": WHITE, "include_numbers": False},
+        y_axis_config={"include_numbers": measured, "font_size": 20},
         tips=True,
     ).shift(DOWN * 0.3)
 
     # Axis labels
-    x_label = Tex(r"Explainability", font_size=28, color=GREEN)
+    x_label = CachedTex(r"Explainability", font_size=28, color=GREEN)
     x_label.next_to(axes.x_axis, DOWN, buff=0.3)
 
-    y_label = Tex(r"Predictive Power / Accuracy", font_size=28, color=RED)
+    y_label = CachedTex(r"Test accuracy (\%)" if measured else r"Predictive Power / Accuracy", font_size=28, color=RED)
     y_label.rotate(90 * DEGREES).next_to(axes.y_axis, LEFT, buff=0.3)
 
     # Draw axes
     scene.play(Create(axes), Write(x_label), Write(y_label), run_time=1.5)
     scene.wait(0.5)
 
-    # Define model positions (x: explainability, y: predictive power)
-    # Scale: 0-10 where higher is better
-    models_data = [
-        ("Linear Regression", 8.5, 1, GREEN),
-        ("Logistic Regression", 7.5, 1.5, GREEN),
-        ("Decision Tree", 6.5, 2.5, GREEN),
-        ("KNN", 5.5, 3.5, GREEN),
-        ("Random Forest", 2.5, 6, ORANGE),
-        ("Boosting / Ensemble", 3.0, 6.5, ORANGE),
-        ("SVM", 2, 7, RED),
-        ("Deep Learning", 1, 8, RED),
-    ]
+    # Linear axes: map every point with one vectorized affine transform
+    origin = axes.c2p(0, y_range[0])
+    x_unit = axes.c2p(1, y_range[0]) - origin
+    y_unit = axes.c2p(0, y_range[0] + 1) - origin
+    centers = origin + data["explainability"][:, None] * x_unit + (data["accuracy"] - y_range[0])[:, None] * y_unit
 
-    # Create dots and labels for each model
-    model_dots = VGroup()
-    model_labels = VGroup()
+    model_dots = DotCloud(centers, data["color"], data["radius"])
 
-    for name, x, y, color in models_data:
-        point = axes.c2p(x, y)
-        dot = Dot(point=point, radius=0.12, color=color, fill_opacity=0.9)
-        label = Tex(name, font_size=16, color=color)
-        label.next_to(dot, RIGHT, buff=0.15)
-        model_dots.add(dot)
+    # Only the selected runs get a label
+    model_labels = VGroup()
+    for i in np.flatnonzero(data["label"]):
+        label = label_geometry(str(data["name"][i]), str(data["color"][i])).copy()
+        label.next_to(centers[i], RIGHT, buff=0.15 + data["radius"][i])
         model_labels.add(label)
 
-    # Animate models appearing one by one
+    # Animate models appearing
     scene.play(
-        *[GrowFromCenter(dot) for dot in model_dots],
+        GrowDots(model_dots),
         *[Write(label) for label in model_labels],
         run_time=2
     )
 
 
-def approaches_slide(scene: ThreeDSlide):
-    title = Text("Approaches to Explainability", font_size=40).to_edge(UP)
+@lru_cache(maxsize=None)
+def label_geometry(name, color):
+    """Builds a chart label once; callers place copies of it."""
+    return CachedTex(name, font_size=16, color=color)
+
+
+# Input of the attribution demo: a bright diagonal, the pattern grid_model detects
+ATTRIBUTION_EXAMPLE = np.array([
+    [0.8, 0.2, 0.3],
+    [0.4, 0.7, 0.2],
+    [0.1, 0.6, 0.8],
+])
+
+def heatmap_colors(scores):
+    """Maps attribution scores to BLUE (least important) .. RED (most important)."""
+    scores = np.asarray(scores, dtype=float).ravel()
+    span = max(scores.max() - scores.min(), 1e-9)
+    return [interpolate_color(BLUE, RED, (s - scores.min()) / span) for s in scores]
+
+def approaches_slide(scene: ThreeDSlide, x=ATTRIBUTION_EXAMPLE):
+    title = CachedText("Approaches to Explainability", font_size=40).to_edge(UP)
     scene.play(Write(title))
 
+    model = grid_model()
+    lime_result = lime(model, x, n_samples=5000)
+    occlusion_map, score = occlusion(model, x)
+    cam = grad_cam(model, x[None])[0]
+
     # --- PART 1: FEATURE ATTRIBUTION (LIME/GRADCAM) ---
     # Create an 'Input Grid' (represents an image or text tokens)
     grid_group = VGroup()
     squares = VGroup()
+    # Brighter cells of the input are drawn more opaque
+    input_opacity = 0.1 + 0.5 * x.ravel()
     for i in range(3):
         for j in range(3):
-            sq = Square(side_length=0.6, fill_opacity=0.2, color=WHITE)
+            sq = Square(side_length=0.6, fill_opacity=input_opacity[3 * i + j], color=WHITE)
             sq.move_to(np.array([j * 0.7, -i * 0.7, 0]))
             squares.add(sq)
 
@@ -725,14 +651,17 @@ def approaches_slide(scene: ThreeDSlide):
 
     # Create a "Prediction Score" bar next to it
     bar_bg = Rectangle(height=2.5, width=0.3, color=GREY)
+    def bar_height(p):
+        return max(2.5 * p, 0.05)
+
     bar_fill = Rectangle(
-        height=1.5, width=0.3, fill_color=GREEN, fill_opacity=1, stroke_width=0
+        height=bar_height(score), width=0.3, fill_color=GREEN, fill_opacity=1, stroke_width=0
     )
     bar_fill.align_to(bar_bg, DOWN)
     bar_group = VGroup(bar_bg, bar_fill).next_to(grid_group, RIGHT, buff=0.5)
 
     group_feature = VGroup(grid_group, bar_group)
-    label_feature = Text("Feature Attribution", font_size=24).next_to(
+    label_feature = CachedText("Feature Attribution", font_size=24).next_to(
         group_feature, DOWN
     )
 
@@ -740,46 +669,81 @@ def approaches_slide(scene: ThreeDSlide):
     
     scene.wait(0.5)
     scene.next_slide()
-    # Animation A: LIME (Occlusion Sensitivity)
-    # Blink random squares to black and move the bar
-    lime_label = Text("(e.g., LIME, Occlusion)", font_size=20, color=YELLOW).next_to(
+    # Animation A: LIME
+    # Blink a few of the real LIME perturbations and move the bar to the model's score on them
+    lime_label = CachedText("(e.g., LIME)", font_size=20, color=YELLOW).next_to(
         label_feature, DOWN
     )
     scene.play(FadeIn(lime_label))
 
-    for _ in range(3):
-        # Pick random squares to "mask"
-        indices = np.random.choice(9, 3, replace=False)
-        target_squares = [squares[i] for i in indices]
+    for k in range(1, 4):
+        hidden = np.flatnonzero(~lime_result["masks"][k].ravel())
+        target_squares = [squares[i] for i in hidden]
 
         scene.play(
             *[sq.animate.set_fill(BLACK, opacity=1) for sq in target_squares],
             bar_fill.animate.stretch_to_fit_height(
-                np.random.uniform(0.5, 2.0), about_edge=DOWN
+                bar_height(lime_result["scores"][k]), about_edge=DOWN
             ),
             run_time=0.3
         )
         scene.play(
-            *[sq.animate.set_fill(WHITE, opacity=0.2) for sq in target_squares],
+            *[squares[i].animate.set_fill(WHITE, opacity=input_opacity[i]) for i in hidden],
             run_time=0.3
         )
 
+    # The surrogate's weights, one per cell
+    scene.play(
+        *[
+            squares[i].animate.set_fill(color, opacity=0.8)
+            for i, color in enumerate(heatmap_colors(lime_result["weights"]))
+        ],
+        bar_fill.animate.stretch_to_fit_height(bar_height(score), about_edge=DOWN),
+        run_time=1
+    )
     scene.play(FadeOut(lime_label))
 
-    # Animation B: GradCAM (Heatmap)
-    grad_label = Text("(e.g., GradCAM)", font_size=20, color=TEAL).next_to(
+    # Animation B: Occlusion
+    # Hide one cell at a time; the score drop is that cell's attribution
+    occlusion_label = CachedText("(e.g., Occlusion)", font_size=20, color=ORANGE).next_to(
+        label_feature, DOWN
+    )
+    scene.play(
+        FadeIn(occlusion_label),
+        *[sq.animate.set_fill(WHITE, opacity=input_opacity[i]) for i, sq in enumerate(squares)],
+    )
+    for i, sq in enumerate(squares):
+        scene.play(
+            sq.animate.set_fill(BLACK, opacity=1),
+            bar_fill.animate.stretch_to_fit_height(
+                bar_height(score - occlusion_map.flat[i]), about_edge=DOWN
+            ),
+            run_time=0.2
+        )
+        scene.play(sq.animate.set_fill(WHITE, opacity=input_opacity[i]), run_time=0.1)
+
+    scene.play(
+        *[
+            squares[i].animate.set_fill(color, opacity=0.8)
+            for i, color in enumerate(heatmap_colors(occlusion_map))
+        ],
+        bar_fill.animate.stretch_to_fit_height(bar_height(score), about_edge=DOWN),
+        run_time=1
+    )
+    scene.play(FadeOut(occlusion_label))
+
+    # Animation C: GradCAM (Heatmap)
+    grad_label = CachedText("(e.g., GradCAM)", font_size=20, color=TEAL).next_to(
         label_feature, DOWN
     )
     scene.play(FadeIn(grad_label))
 
-    # Turn squares into a heatmap colors
-    heatmap_colors = [RED, ORANGE, YELLOW, GREEN, BLUE, BLUE, RED, YELLOW, GREEN]
+    # Turn squares into a heatmap of the Grad-CAM scores
     scene.play(
         *[
-            squares[i].animate.set_fill(heatmap_colors[i], opacity=0.8)
-            for i in range(9)
+            squares[i].animate.set_fill(color, opacity=0.8)
+            for i, color in enumerate(heatmap_colors(cam))
         ],
-        bar_fill.animate.stretch_to_fit_height(2.3, about_edge=DOWN),
         run_time=1.5
     )
 
@@ -804,7 +768,7 @@ def approaches_slide(scene: ThreeDSlide):
         VGroup(layer_1, layer_2, layer_3).arrange(UP, buff=0.2)
     )
 
-    stack_label = Text("Internal Structure", font_size=24).next_to(
+    stack_label = CachedText("Internal Structure", font_size=24).next_to(
         transformer_stack, DOWN
     )
 
@@ -840,7 +804,7 @@ def approaches_slide(scene: ThreeDSlide):
     scene.play(FadeIn(nodes))
 
     # Final Text: The name of the approach
-    mech_label = Text(
+    mech_label = CachedText(
         "Mechanistic Interpretability", font_size=28, color=YELLOW
     ).next_to(title, DOWN)
     scene.play(Write(mech_label))
@@ -1,8 +1,16 @@
 from manim import *
+import json
+import os
 import random
 import numpy as np
 from manim_slides.slide import ThreeDSlide
 
+from util.bracket_trainer import BRACKET_MODEL_PATH
+from util.circuit_layout import load_layout, node_size
+from util.code_block import CodeBlock
+from util.patching import BRACKET_CIRCUIT_PATH
+from util.toy_transformer import cached_activations, load_model, tokenize
+
 random.seed(42)
 np.random.seed(42)
 
@@ -13,150 +21,238 @@ TEXT_COLOR = WHITE
 POS_COLOR = BLUE
 NEG_COLOR = RED
 PATH_COLOR = YELLOW
+ATTENTION_COLOR = "#4FA3E0"
 CODE_COLOR = "#A0A0A0"     # Light gray for comments
 TOKEN_BOX_COLOR = "#C59942" # Gold/Brownish
 
+EDGE_COLORS = {
+    "residual": WHITE,
+    "wire": TOKEN_BOX_COLOR,
+    "qk": WHITE,
+    "value": TOKEN_BOX_COLOR,
+}
+
+# The Double Bracket Circuit: an open bracket detector in layer 2 feeding a
+# nesting-depth attention head in layer 4. Positions come from the layout engine.
+BRACKET_CIRCUIT = {
+    "nodes": [
+        {"id": "input", "kind": "tokens", "label": "values = ", "tokens": ["[", "[", "5", "3"]},
+        {"id": "l2.branch", "kind": "branch"},
+        {"id": "l2.norm", "kind": "box", "label": "rmsnorm", "width": 1.0, "height": 0.4, "font_size": 12, "side": "left"},
+        {"id": "l2.attn", "kind": "box", "label": "2.attn", "width": 1.2, "height": 0.8, "side": "left"},
+        {"id": "l2.add", "kind": "add", "symbol": "+"},
+        {"id": "l4.branch", "kind": "branch"},
+        {"id": "l4.k", "kind": "op", "label": "K", "side": "left"},
+        {"id": "l4.q", "kind": "op", "label": "Q", "side": "left"},
+        {"id": "l4.qk", "kind": "op", "symbol": r"\times", "side": "left"},
+        {"id": "l4.softmax", "kind": "box", "label": "softmax", "width": 1.2, "height": 0.4, "side": "left"},
+        {"id": "l4.v", "kind": "op", "symbol": r"\times", "label": "V", "side": "left"},
+        {"id": "l4.add", "kind": "add", "symbol": "+"},
+        {"id": "output", "kind": "tokens", "tokens": ["]", "]"]},
+    ],
+    "edges": [
+        {"source": "input", "target": "l2.branch", "kind": "residual"},
+        {"source": "l2.branch", "target": "l2.add", "kind": "residual"},
+        {"source": "l2.branch", "target": "l2.norm", "kind": "wire"},
+        {"source": "l2.norm", "target": "l2.attn", "kind": "wire"},
+        {"source": "l2.attn", "target": "l2.add", "kind": "wire"},
+        {"source": "l2.add", "target": "l4.branch", "kind": "residual"},
+        {"source": "l4.branch", "target": "l4.add", "kind": "residual"},
+        {"source": "l4.branch", "target": "l4.k", "kind": "qk"},
+        {"source": "l4.branch", "target": "l4.q", "kind": "qk"},
+        {"source": "l4.k", "target": "l4.qk", "kind": "qk"},
+        {"source": "l4.q", "target": "l4.qk", "kind": "qk"},
+        {"source": "l4.qk", "target": "l4.softmax", "kind": "qk"},
+        {"source": "l4.softmax", "target": "l4.v", "kind": "qk"},
+        {"source": "l4.branch", "target": "l4.v", "kind": "value"},
+        {"source": "l4.v", "target": "l4.add", "kind": "wire"},
+        {"source": "l4.add", "target": "output", "kind": "residual"},
+    ],
+    "annotations": [
+        {"kind": "divider", "node": "l2.norm", "label": "2.attn"},
+        {"kind": "code", "node": "l2.attn", "side": "left", "lines": [
+            "# Open bracket detector",
+            "values = [[7, 2, 2, 10...",
+        ]},
+        {"kind": "divider", "node": "l4.k", "label": "4.attn"},
+        {"kind": "code", "node": "l4.softmax", "side": "left", "lines": [
+            "# Nesting depth",
+            "values = [[1, 9, 3...",
+            "",
+            "# Nested list",
+            "values = [[5, 3, 11...",
+        ]},
+        {"kind": "code", "node": "l4.q", "side": "right", "font_size": 14, "lines": [
+            "# Don't get distracted: [",
+            "values = [5, 3, 11, 3, 12]]",
+        ]},
+        {"kind": "bars", "node": "l4.v", "side": "right", "values": [1.0, 0.3]},
+    ],
+}
+
+def load_circuit(path=BRACKET_CIRCUIT_PATH):
+    """The circuit found by patching the trained model if it was run, else the hand-drawn one."""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return BRACKET_CIRCUIT
+
 class ModelCircuitSlides:
     def __init__(self, scene: ThreeDSlide):
         self.scene = scene
-
-    def show_circuit_from_pdf(self):
-        bracket_detector_circuit = ImageMobject("assets/bracket_detector_circuit.png").scale_to_fit_height(self.scene.camera.frame_height - 2).to_edge(DOWN)
-        self.scene.play(FadeIn(bracket_detector_circuit))
-        self.scene.next_slide()
-        self.scene.play(FadeOut(bracket_detector_circuit))
+        self.model = None
 
     def create_token(self, char, color=WHITE):
         """Creates a visual token box used in the diagram."""
-        box = RoundedRectangle(corner_radius=0.1, height=0.6, width=0.5, color=TOKEN_BOX_COLOR, stroke_width=2)
         lbl = Text(str(char), font_size=24, color=color)
+        box = RoundedRectangle(corner_radius=0.1, height=0.6, width=max(0.5, lbl.width + 0.2), color=TOKEN_BOX_COLOR, stroke_width=2)
+        lbl.move_to(box)
         return VGroup(box, lbl)
 
     def create_code_block(self, lines_text, font_size=18):
         """Creates syntax-highlighted code blocks."""
-        code_group = VGroup()
-        for line in lines_text:
-            if line.strip().startswith("#"):
-                color = GRAY
-            elif "values" in line:
-                color = WHITE
-            elif "print" in line:
-                color = BLUE
-            else:
-                color = WHITE
-            text = Text(line, font="Monospace", font_size=font_size, color=color)
-            code_group.add(text)
-        code_group.arrange(DOWN, aligned_edge=LEFT, buff=0.1)
-        return code_group
-
-    def construct_circuit(self):
-        """Recreates the Double Bracket Circuit diagram."""
-        
-        # 1. Top Section: Input Tokens
-        top_text = Text("values = ", font="Monospace", font_size=24)
-        t_br1 = self.create_token("[")
-        t_br2 = self.create_token("[")
-        t_5 = self.create_token("5")
-        t_3 = self.create_token("3")
-        
-        input_group = VGroup(top_text, t_br1, t_br2, t_5, t_3).arrange(RIGHT, buff=0.2)
-        input_group.to_edge(UP, buff=1.0)
-        
-        # 2. Residual Stream (Central Dashed Line)
-        stream_line = DashedLine(
-            start=input_group.get_bottom() + DOWN*0.2,
-            end=input_group.get_bottom() + DOWN*6.0,
-            color=WHITE
-        )
-
-        # 3. Layer 2: Open Bracket Detector
-        # Branch point from stream
-        y_l2 = stream_line.get_start()[1] - 1.0
-        branch_l2 = np.array([stream_line.get_center()[0], y_l2, 0])
-        
-        # RMSNorm boxes
-        rms1 = Rectangle(height=0.4, width=1.0, color=WHITE).move_to(branch_l2 + LEFT*1.5)
-        rms1_lbl = Text("rmsnorm", font_size=12).move_to(rms1)
-        
-        # Attention Head Box
-        attn_box = Rectangle(height=0.8, width=1.2, color=WHITE).next_to(rms1, DOWN, buff=0.5)
-        attn_lbl = Text("2.attn", font_size=16).move_to(attn_box)
-        
-        # Wiring L2
-        wire_l2_in = Line(branch_l2, rms1.get_right(), color=TOKEN_BOX_COLOR)
-        wire_l2_mid = Line(rms1.get_bottom(), attn_box.get_top(), color=TOKEN_BOX_COLOR)
-        
-        # Add Operation (+)
-        plus_circle = Circle(radius=0.15, color=WHITE).move_to([branch_l2[0], attn_box.get_center()[1], 0])
-        plus_txt = Text("+", font_size=20).move_to(plus_circle)
-        wire_l2_out = Line(attn_box.get_right(), plus_circle.get_left(), color=TOKEN_BOX_COLOR)
-
-        # Annotations L2
-        code_l2 = self.create_code_block([
-            "# Open bracket detector",
-            "values = [[7, 2, 2, 10..."
-        ]).next_to(attn_box, LEFT, buff=0.5)
-        
-        dashed_l2 = DashedLine(LEFT*3, RIGHT*3, color=WHITE).next_to(input_group, DOWN, buff=0.5)
-        dashed_l2_lbl = Text("2.attn", font="Monospace", font_size=16).next_to(dashed_l2, RIGHT)
-
-        group_l2 = VGroup(rms1, rms1_lbl, attn_box, attn_lbl, plus_circle, plus_txt, 
-                          wire_l2_in, wire_l2_mid, wire_l2_out, code_l2, dashed_l2, dashed_l2_lbl)
-
-        # 4. Layer 4: Mechanism (Q, K, Softmax)
-        y_l4 = y_l2 - 3.0
-        branch_l4 = np.array([stream_line.get_center()[0], y_l4, 0])
-        
-        # Q K Cross
-        q_node = Circle(radius=0.2, color=WHITE).move_to(branch_l4 + DOWN*0.5 + RIGHT*0.4)
-        q_lbl = Text("Q", font_size=14).next_to(q_node, UP, buff=0.05)
-        k_node = Circle(radius=0.2, color=WHITE).move_to(branch_l4 + DOWN*0.5 + LEFT*0.4)
-        k_lbl = Text("K", font_size=14).next_to(k_node, UP, buff=0.05)
-        
-        cross_qk = Circle(radius=0.2, color=WHITE).move_to(branch_l4 + DOWN*0.5)
-        cross_txt = MathTex(r"\times", font_size=20).move_to(cross_qk)
-        
-        # Softmax
-        soft_box = Rectangle(height=0.4, width=1.2, color=WHITE).next_to(cross_qk, DOWN, buff=0.3)
-        soft_lbl = Text("softmax", font_size=16).move_to(soft_box)
-        
-        # V Cross
-        v_cross = Circle(radius=0.2, color=WHITE).next_to(soft_box, DOWN, buff=0.3)
-        v_txt = MathTex(r"\times", font_size=20).move_to(v_cross)
-        v_lbl = Text("V", font_size=14).next_to(v_cross, LEFT, buff=0.1)
-
-        # Output Bars (Orange bars from PDF)
-        bar1 = Rectangle(height=0.2, width=1.0, color=TOKEN_BOX_COLOR, fill_opacity=1).next_to(v_cross, RIGHT, buff=0.5)
-        bar2 = Rectangle(height=0.2, width=0.3, color=TOKEN_BOX_COLOR, fill_opacity=1).next_to(bar1, DOWN, buff=0.1, aligned_edge=LEFT)
-        out_token1 = self.create_token("]").next_to(v_cross, DOWN, buff=0.3)
-        out_token2 = self.create_token("]").next_to(out_token1, DOWN, buff=0.1)
-
-        # Annotations L4
-        dashed_l4 = DashedLine(LEFT*3, RIGHT*3, color=WHITE).move_to(branch_l4 + UP*0.8)
-        dashed_l4_lbl = Text("4.attn", font="Monospace", font_size=16).next_to(dashed_l4, RIGHT)
-        
-        code_l4 = self.create_code_block([
-            "# Nesting depth",
-            "values = [[1, 9, 3...",
-            "",
-            "# Nested list",
-            "values = [[5, 3, 11..."
-        ]).to_edge(LEFT).match_y(soft_box)
-        
-        note_right = self.create_code_block([
-            "# Don't get distracted: [",
-            "values = [5, 3, 11, 3, 12]]"
-        ], font_size=14).to_edge(RIGHT).match_y(dashed_l4)
+        return CodeBlock(lines_text, font="Monospace", font_size=font_size)
+
+    def create_node(self, node):
+        """Creates the mobject for a circuit node. Its first submobject is the anchor."""
+        kind = node["kind"]
+        width, height = node_size(node)
+        if kind == "tokens":
+            group = VGroup(*[self.create_token(token) for token in node["tokens"]])
+            if node.get("label"):
+                group.add_to_back(Text(node["label"], font="Monospace", font_size=24))
+            group.arrange(RIGHT, buff=0.2)
+            # Hide the wires running into the row behind an opaque backdrop
+            return VGroup(BackgroundRectangle(group, fill_opacity=1, buff=0.1), group)
+        if kind == "box":
+            box = Rectangle(height=height, width=width, color=WHITE, fill_color=BLACK, fill_opacity=1)
+            lbl = Text(node["label"], font_size=node.get("font_size", 16)).move_to(box)
+            return VGroup(box, lbl)
+        if kind in ("op", "add"):
+            circle = Circle(radius=width / 2, color=WHITE, fill_color=BLACK, fill_opacity=1)
+            group = VGroup(circle)
+            if node.get("symbol"):
+                group.add(MathTex(node["symbol"], font_size=20).move_to(circle))
+            if node.get("label"):
+                group.add(Text(node["label"], font_size=14).next_to(circle, UP, buff=0.05))
+            return group
+        return VGroup(Dot(radius=width / 2, color=WHITE))
+
+    def create_edge(self, edge):
+        """Creates a wire along the routed points of a laid-out edge."""
+        points = [np.array([x, y, 0]) for x, y in edge["points"]]
+        wire = VMobject(color=EDGE_COLORS[edge["kind"]], stroke_width=2).set_points_as_corners(points)
+        if edge["kind"] == "residual":
+            return DashedVMobject(wire, num_dashes=max(2, int(wire.get_arc_length() * 4)))
+        return wire
+
+    def create_annotation(self, annotation, target, circuit):
+        """Creates a code note, layer divider or output bars next to a node."""
+        kind = annotation["kind"]
+        side = LEFT if annotation.get("side") == "left" else RIGHT
+        if kind == "code":
+            code = self.create_code_block(annotation["lines"], font_size=annotation.get("font_size", 18))
+            return code.next_to(target, side, buff=0.5)
+        if kind == "divider":
+            line = DashedLine(circuit.get_left(), circuit.get_right(), color=WHITE)
+            line.set_y(target.get_top()[1] + 0.3)
+            lbl = Text(annotation["label"], font="Monospace", font_size=16).next_to(line, RIGHT)
+            return VGroup(line, lbl)
+        if kind == "bars":
+            bars = VGroup(*[
+                Rectangle(height=0.2, width=value, color=TOKEN_BOX_COLOR, fill_opacity=1)
+                for value in annotation["values"]
+            ]).arrange(DOWN, buff=0.1, aligned_edge=LEFT)
+            return bars.next_to(target, side, buff=0.5)
+        raise ValueError(f"Unknown annotation kind: {kind}")
+
+    def build_circuit(self, description):
+        """
+        Builds a circuit from its description using the cached layered layout.
+        Returns the node mobjects by id, the wires and the annotations.
+        """
+        layout = load_layout(description)
+
+        nodes = {}
+        for node in description["nodes"]:
+            mob = self.create_node(node)
+            x, y = layout["nodes"][node["id"]]
+            mob.shift(np.array([x, y, 0]) - mob[0].get_center())
+            nodes[node["id"]] = mob
+
+        edges = VGroup(*[self.create_edge(edge) for edge in layout["edges"]])
+        circuit = VGroup(edges, *nodes.values())
+
+        annotations = VGroup(*[
+            self.create_annotation(annotation, nodes[annotation["node"]], circuit)
+            for annotation in description.get("annotations", [])
+        ])
+        return nodes, edges, annotations
 
-        group_l4 = VGroup(
-            q_node, q_lbl, k_node, k_lbl, cross_qk, cross_txt, 
-            soft_box, soft_lbl, v_cross, v_txt, v_lbl, 
-            bar1, bar2, out_token1, out_token2,
-            dashed_l4, dashed_l4_lbl, code_l4, note_right
-        )
+    def construct_circuit(self, description=None):
+        """
+        Draws a circuit description as vector graphics, layer by layer; by
+        default the one load_circuit finds.
+        """
+        nodes, edges, annotations = self.build_circuit(description or load_circuit())
+
+        # Fit everything below the title
+        circuit = VGroup(edges, *nodes.values(), annotations)
+        circuit.scale_to_fit_height(min(circuit.height, self.scene.camera.frame_height - 2))
+        if circuit.width > self.scene.camera.frame_width - 1:
+            circuit.scale_to_fit_width(self.scene.camera.frame_width - 1)
+        circuit.to_edge(DOWN)
+
+        # Reveal nodes from the input tokens down to the output
+        ordered = sorted(nodes.values(), key=lambda mob: -mob[0].get_y())
 
         # Animation Sequence
-        self.scene.play(FadeIn(input_group), Create(stream_line))
-        self.scene.play(FadeIn(group_l2))
-        self.scene.play(FadeIn(group_l4))
-        self.scene.wait(2)
\ No newline at end of file
+        self.scene.play(Create(edges), LaggedStart(*[FadeIn(mob) for mob in ordered], lag_ratio=0.1), run_time=2)
+        self.scene.play(FadeIn(annotations))
+        self.scene.next_slide()
+        self.scene.play(FadeOut(circuit))
+
+    def play_attention_pattern(self, text="values = [5, [3, 7", layer=None, head=None):
+        """
+        Reveals a snippet token by token and draws where one attention head of
+        the toy transformer looks from each new token: by default the head
+        patching ranked highest, else head 0 of layer 2. Activations come from
+        the on-disk cache, so re-rendering never repeats the forward pass.
+        """
+        if self.model is None:
+            self.model = load_model(BRACKET_MODEL_PATH)
+        if layer is None or head is None:
+            heads = [node["id"] for node in load_circuit().get("ranking", []) if ".attn.h" in node["id"]]
+            layer, head = (int(part) for part in heads[0].split(".attn.h")) if heads else (2, 0)
+        name = f"blocks.{layer}.attn.hook_pattern"
+        # Position 0 of the pattern is <bos>, token i sits at position i + 1
+        pattern = cached_activations(self.model, [text], [name])[name][0, head].astype(float)
+
+        tokens = VGroup(*[self.create_token(token) for token in tokenize(text)]).arrange(RIGHT, buff=0.2)
+        label = Text(f"{layer}.attn head {head}", font="Monospace", font_size=20).next_to(tokens, UP, buff=1.5)
+        self.scene.play(FadeIn(label))
+
+        arcs = VGroup()
+        for t, token in enumerate(tokens):
+            new_arcs = VGroup(*[
+                ArcBetweenPoints(
+                    token.get_bottom(), tokens[k].get_bottom(),
+                    angle=-PI / 2,
+                    color=ATTENTION_COLOR,
+                    stroke_width=1 + 6 * pattern[t + 1, k + 1],
+                    stroke_opacity=pattern[t + 1, k + 1],
+                )
+                for k in range(t)
+            ])
+            # How much the token attends to itself shows as the box fill
+            token[0].set_fill(ATTENTION_COLOR, opacity=pattern[t + 1, t + 1])
+            anims = [FadeIn(token, shift=DOWN * 0.2)]
+            if len(arcs) > 0:
+                anims.append(FadeOut(arcs))
+            if len(new_arcs) > 0:
+                anims.append(Create(new_arcs))
+            self.scene.play(*anims, run_time=0.5)
+            arcs = new_arcs
+
+        self.scene.next_slide()
+        self.scene.play(FadeOut(tokens), FadeOut(arcs), FadeOut(label))
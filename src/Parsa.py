@@ -1,6 +1,7 @@
 from manim import *
 from manim_slides.slide import ThreeDSlide
 
+from util.geometry_cache import CachedTex
 from util.slide_number import SlideNumber
 from src.Transformer import TransformerSlides
 from src.SparseModel import SparseModelSlides
@@ -12,7 +13,7 @@ class TitleUtil:
         self.title = None
 
     def show(self, text):
-        title = Tex(text, font_size=48, color=BLUE).to_edge(UP)
+        title = CachedTex(text, font_size=48, color=BLUE).to_edge(UP)
 
         if self.title is None:
             self.scene.play(Write(title))
@@ -31,7 +32,21 @@ def parsa(scene: ThreeDSlide, slide_number: SlideNumber):
     title_util = TitleUtil(scene)
     title_util.show(r"\section*{What is Attention?}")
     t = TransformerSlides(scene)
-    t.play_slide_one(title_util.title)
+    t.play_slide_one(title_util.title, autoregressive=True)
+    title_util.end()
+
+def parsa_projector(scene: ThreeDSlide):
+    """The embedding projector, the one section that needs the 3D camera."""
+    title_util = TitleUtil(scene)
+    title_util.show(r"\section*{Embedding space}")
+    TransformerSlides(scene).play_embedding_projector(title_util.title)
+    title_util.end()
+
+def parsa_sparsity(scene: ThreeDSlide, slide_number: SlideNumber):
+    title_util = TitleUtil(scene)
+    t = TransformerSlides(scene)
+    title_util.show(r"\section*{Sparse attention}")
+    t.play_attention_scaling(title_util.title)
 
     slide_number.incr()
     # transformer_title = Tex(r"\section*{Simplified Transformer}", font_size=48, color=BLUE).to_edge(UP)
@@ -58,6 +73,10 @@ def parsa(scene: ThreeDSlide, slide_number: SlideNumber):
     # scene.play(ReplacementTransform(how_to_sparse_title, extracting_circuit_title))
     s.play_slide_three()
 
+    slide_number.incr()
+    title_util.show(r"\section*{What sparsity buys at inference}")
+    s.play_inference_table()
+
     slide_number.incr()
     title_util.show(r"\section*{Extracting circuit}")
     s.play_slide_four()
@@ -66,6 +85,7 @@ def parsa(scene: ThreeDSlide, slide_number: SlideNumber):
     title_util.show(r"\section*{From circuit to explanation example}")
 
     m = ModelCircuitSlides(scene)
-    m.show_circuit_from_pdf()
+    m.construct_circuit()
+    m.play_attention_pattern()
 
     title_util.end()
\ No newline at end of file
@@ -2,6 +2,11 @@ from manim import *
 from manim_slides.slide import ThreeDSlide
 import random
 
+from util.l0_sparsity import read_gate_log, train_l0
+from util.network_morph import NetworkMorph
+from util.sparse_inference import CSR_KERNEL, cached_inference_benchmark
+from util.superposition import feature_neurons, neuron_metrics, train_superposition
+
 random.seed(42)
 
 random.seed(42)
@@ -15,6 +20,20 @@ POS_COLOR = BLUE
 NEG_COLOR = RED
 PATH_COLOR = YELLOW
 
+# The sparse features of the superposition toy model, in feature order
+CONCEPTS = [
+    (r"\faCat Cat", BLUE),
+    (r"\faCar Car", RED),
+    (r"\faBook Book", GREEN),
+    (r"\faDog Dog", ORANGE),
+    (r"\faTree Tree", TEAL),
+    (r"\faMusic Music", PURPLE),
+]
+# Toy models behind slide one: too few hidden neurons (superposition) vs. a
+# wide hidden layer with an activation penalty (one feature per neuron)
+DENSE_TOY_MODEL = dict(n_features=len(CONCEPTS), n_hidden=3, seed=1)
+SPARSE_TOY_MODEL = dict(n_features=len(CONCEPTS), n_hidden=10, l1=0.01, seed=1)
+
 def get_opacity(p_sparsity):
     """
     Returns a continuous opacity value.
@@ -43,13 +62,18 @@ def create_mlp(layer_dims, p_sparsity):
     vertical_buff = min(0.8, 6.0 / max_neurons)
     
     # 1. Create Layers (Neurons)
-    for dim in layer_dims:
-        layer = VGroup(*[
-            Dot(
+    for i, dim in enumerate(layer_dims):
+        layer = VGroup()
+        for j in range(dim):
+            dot = Dot(
                 color=NEURON_COLOR, 
                 fill_opacity=get_opacity(p_sparsity)
-            ) for _ in range(dim)
-        ]).arrange(DOWN, buff=vertical_buff)
+            )
+            # Attach indices so the network can be morphed by topology
+            dot.layer_index = i
+            dot.node_index = j
+            layer.add(dot)
+        layer.arrange(DOWN, buff=vertical_buff)
         layers.add(layer)
     
     layers.arrange(RIGHT, buff=4)
@@ -62,18 +86,34 @@ def create_mlp(layer_dims, p_sparsity):
         
         for u in current_layer:
             for v in next_layer:
-                lines.add(
-                    Line(
-                        u.get_center(), 
-                        v.get_center(), 
-                        stroke_width=2, 
-                        stroke_opacity=get_opacity(p_sparsity), 
-                        color=CONNECTION_COLOR
-                    )
+                line = Line(
+                    u.get_center(), 
+                    v.get_center(), 
+                    stroke_width=2, 
+                    stroke_opacity=get_opacity(p_sparsity), 
+                    color=CONNECTION_COLOR
                 )
+                line.start_node = u
+                line.end_node = v
+                lines.add(line)
                 
     return layers, lines
 
+def create_mlp_from_weights(weights):
+    """
+    Same drawing as create_mlp, but each connection's opacity follows the
+    magnitude of its trained weight. weights[i] has shape (dims[i], dims[i+1]).
+    """
+    layer_dims = [weights[0].shape[0]] + [w.shape[1] for w in weights]
+    layers, lines = create_mlp(layer_dims, p_sparsity=0.0)
+    for layer in layers:
+        layer.set_fill(opacity=1)
+    for line in lines:
+        w = np.abs(weights[line.start_node.layer_index])
+        strength = w[line.start_node.node_index, line.end_node.node_index] / w.max()
+        line.set_stroke(opacity=0.05 + 0.95 * strength)
+    return layers, lines
+
 class SparseModelSlides:
     def __init__(self, scene: ThreeDSlide):
         self.scene = scene
@@ -85,10 +125,9 @@ class SparseModelSlides:
         """
 
         # --- Phase 1: Dense Model (Polysemantic) ---
-        # User requested dimensions [3, 5, 3] for the generic MLP function
-        dense_dims = [3, 5, 3]
-        # Low sparsity (p=0.1) means most connections/neurons are visible
-        dense_layers, dense_lines = create_mlp(dense_dims, p_sparsity=0.1)
+        # Six sparse features squeezed through three hidden neurons
+        dense_params, _ = train_superposition(**DENSE_TOY_MODEL)
+        dense_layers, dense_lines = create_mlp_from_weights([dense_params["W1"].T, dense_params["W2"].T])
         
         # Group them for easy animation
         dense_model = VGroup(dense_lines, dense_layers)
@@ -103,20 +142,18 @@ class SparseModelSlides:
         self.scene.next_slide()
 
         # --- Phase 2: Demonstrate Polysemanticity ---
-        # Pick the middle neuron in the hidden layer (layer index 1)
-        # In a layer of 5, index 2 is the exact middle
+        # Pick the hidden neuron that mixes the most features
+        participation, neuron_features = neuron_metrics(dense_params["W1"])
+        target_index = int(np.argmax(participation))
         hidden_layer = dense_layers[1]
-        target_neuron = hidden_layer[2]
+        target_neuron = hidden_layer[target_index]
 
         my_template = TexTemplate()
         my_template.add_to_preamble(r"\usepackage{fontawesome5}")
 
-        # Concepts
-        concepts = [
-            (r"\faCat Cat", BLUE),
-            (r"\faCar Car", RED),
-            (r"\faBook Book", GREEN)
-        ]
+        # Concepts it responds to, strongest first
+        shown_features = neuron_features[target_index][:3]
+        concepts = [CONCEPTS[f] for f in shown_features]
 
         # Create a stack of labels: "Below each other, on top of that neuron"
         # We create them all, arrange vertically, and place the group above the neuron
@@ -155,9 +192,9 @@ class SparseModelSlides:
         # --- Phase 3: Transform to Sparse Model ---
         
         # Create Sparse MLP
-        # Expand hidden layer to 10 neurons, High sparsity (p=0.7)
-        sparse_dims = [3, 10, 3] 
-        sparse_layers, sparse_lines = create_mlp(sparse_dims, p_sparsity=0.7)
+        # Expand hidden layer to 10 neurons, trained with an activation penalty
+        sparse_params, _ = train_superposition(**SPARSE_TOY_MODEL)
+        sparse_layers, sparse_lines = create_mlp_from_weights([sparse_params["W1"].T, sparse_params["W2"].T])
         
         # Align the sparse model to the dense model's position to ensure smooth transform
         sparse_layers.move_to(dense_layers)
@@ -168,12 +205,11 @@ class SparseModelSlides:
 
         self.scene.play(
             FadeOut(concept_texts), # Remove the stack
-            Transform(dense_model, sparse_model), # Morph the network
+            NetworkMorph(dense_model, sparse_model), # Morph the network by (layer, index)
             Transform(footer_dense, footer_sparse)
         )
         
-        # Update references after transform
-        # dense_model now looks like sparse_model, but we can use sparse_layers for reference
+        # The morph replaces dense_model with sparse_model on screen
         current_hidden_layer = sparse_layers[1]
 
         self.scene.next_slide()
@@ -181,15 +217,11 @@ class SparseModelSlides:
         # --- Phase 4: Monosemanticity ---
         # "Concepts shown on top of the neurons" (One per neuron)
         
-        # Pick 3 distinct neurons from the larger hidden layer (size 10)
-        neuron_cat = current_hidden_layer[1] # Top
-        neuron_car = current_hidden_layer[5] # Middle
-        neuron_book = current_hidden_layer[8] # Bottom
-
+        # The neuron of the larger hidden layer (size 10) that reads each concept most exclusively
+        dedicated = feature_neurons(sparse_params["W1"])
         mapping = [
-            (r"\faCat Cat", BLUE, neuron_cat),
-            (r"\faCar Car", RED, neuron_car),
-            (r"\faBook Book", GREEN, neuron_book)
+            (text, color, current_hidden_layer[dedicated[f]])
+            for f, (text, color) in zip(shown_features, concepts)
         ]
         labels = []
         for text, color, neuron in mapping:
@@ -208,15 +240,20 @@ class SparseModelSlides:
 
         self.scene.next_slide()
 
-        self.scene.play(Unwrite(dense_model), Unwrite(sparse_model), Unwrite(footer_dense), Unwrite(footer_sparse), *[Unwrite(label) for label in labels])
+        self.scene.play(Unwrite(sparse_model), Unwrite(footer_dense), Unwrite(footer_sparse), *[Unwrite(label) for label in labels])
 
     def play_slide_two(self):
         """
         Slide 2: Weight Matrix Sparsification (L0 Norm)
         """
-        # 1. Create a Matrix of random weights
+        # 1. Show a block of the first weight matrix of the L0-trained network
+        params, log_path = train_l0()
+        steps, _, masks = read_gate_log(log_path)
         rows, cols = 6, 6
-        values = np.random.normal(0, 1, (rows, cols)).round(1)
+        # The hidden units that keep the most inputs, so the block isn't all zeros
+        columns = np.argsort(-masks[0][-1][:rows].sum(axis=0), kind="stable")[:cols]
+        values = params["W0"][:rows, columns].round(1)
+        block_masks = masks[0][:, :rows, columns]
         
         # Create DecimalMatrix
         matrix = DecimalMatrix(
@@ -230,33 +267,32 @@ class SparseModelSlides:
         self.scene.play(Write(matrix), Write(footer))
         self.scene.next_slide()
 
-        # 2. Prune: Set small values to 0
-        threshold = 0.8
-        new_values = values.copy()
-        
-        # Identify indices to zero out
-        mask = np.abs(values) < threshold
-        new_values[mask] = 0.0
-        
-        # Create target matrix
-        target_matrix = DecimalMatrix(
-            new_values,
-            element_to_mobject_config={"font_size": 24},
-            h_buff=0.8, v_buff=0.5
-        )
-        
-        # Dim the zeros in the target matrix to emphasize sparsity
-        for i in range(rows):
-            for j in range(cols):
-                if mask[i, j]:
-                    # Find the mobject in the target matrix and dim it
-                    mob = target_matrix.get_entries()[i * cols + j]
-                    mob.set_opacity(0.3)
+        # 2. Prune: replay the learned gates at each logged step where the block changes
+        changes = [k for k in range(1, len(steps)) if (block_masks[k] != block_masks[k - 1]).any()]
+        for k in changes:
+            mask = ~block_masks[k]
+            new_values = values.copy()
+            new_values[mask] = 0.0
+
+            # Create target matrix
+            target_matrix = DecimalMatrix(
+                new_values,
+                element_to_mobject_config={"font_size": 24},
+                h_buff=0.8, v_buff=0.5
+            )
 
-        self.scene.play(
-            Transform(matrix, target_matrix),
-            run_time=2
-        )
+            # Dim the zeros in the target matrix to emphasize sparsity
+            for i in range(rows):
+                for j in range(cols):
+                    if mask[i, j]:
+                        # Find the mobject in the target matrix and dim it
+                        mob = target_matrix.get_entries()[i * cols + j]
+                        mob.set_opacity(0.3)
+
+            self.scene.play(
+                Transform(matrix, target_matrix),
+                run_time=2 / len(changes)
+            )
         self.scene.next_slide()
         self.scene.play(FadeOut(matrix), FadeOut(footer))
 
@@ -295,6 +331,43 @@ class SparseModelSlides:
         # Clean up
         self.scene.play(FadeOut(mlp_group), FadeOut(footer))
 
+    def play_inference_table(self, batch_sizes=(1, 64, 1024)):
+        """
+        Extra slide after the pruning one: what sparsity buys at inference.
+        Dense vs. CSR forward passes of the pruned L0 network (see
+        util.sparse_inference), one row per sparsity level: weight memory and
+        the CSR speedup at each batch size, measured on the rendering machine.
+        """
+        results = cached_inference_benchmark(batch_sizes=tuple(batch_sizes))
+        levels = list(dict.fromkeys(r["sparsity"] for r in results))
+        rows = []
+        for level in levels:
+            runs = {r["batch"]: r for r in results if r["sparsity"] == level}
+            first = runs[batch_sizes[0]]
+            rows.append(
+                ["L0 gates" if level == "L0" else f"{float(level):.0%}", f"{first['density']:.1%}", f"{first['dense_kb']:.0f} → {first['csr_kb']:.0f}"]
+                + [f"×{runs[b]['speedup']:.2f}" for b in batch_sizes]
+            )
+        table = Table(
+            rows,
+            col_labels=[Text(label, font_size=24) for label in ["Sparsity", "Density", "Weights (KB)"] + [f"Batch {b}" for b in batch_sizes]],
+            element_to_mobject=Text,
+            element_to_mobject_config={"font_size": 24},
+            include_outer_lines=True,
+        )
+        table.scale_to_fit_width(min(table.width, config.frame_width - 1)).move_to(ORIGIN)
+
+        # Speedups above 1 mean the sparse kernel wins
+        for i, level in enumerate(levels):
+            for j, b in enumerate(batch_sizes):
+                speedup = next(r["speedup"] for r in results if r["sparsity"] == level and r["batch"] == b)
+                table.get_entries((i + 2, j + 4)).set_color(GREEN if speedup > 1 else RED)
+
+        footer = Text(f"Dense matmul vs. CSR sparse matmul, {CSR_KERNEL} kernel (speedup of CSR)", font_size=24).to_edge(DOWN)
+        self.scene.play(Create(table), Write(footer), run_time=2)
+        self.scene.next_slide()
+        self.scene.play(FadeOut(table), FadeOut(footer))
+
     def play_slide_four(self):
         """
         Slide 4: Subnetwork Extraction (The "Ticket")
@@ -1,14 +1,26 @@
 from manim import *
+import os
 import numpy as np
 import random
 from manim_slides.slide import ThreeDSlide
 
+from util.camera import orbit, pin_to_frame, zoom_camera
+from util.kv_cache import IncrementalAttention
+from util.point_cloud import ProjectionCloud
+from util.scaling_chart import ScalingChart
+from util.sparse_attention import ATTENTION_KERNELS, cached_benchmark
+from util.projector import PROJECTOR_MATRIX_PATH, load_labels, load_matrix, make_cluster_embeddings, project
+
 # Define some consistent colors we might use across slides
 EMBEDDING_COLOR = BLUE
 FINAL_EMBEDDING_COLOR = GREEN
 FLASH_COLOR = YELLOW
 ATTENTION_COLOR = PURPLE
 MLP_COLOR = MAROON
+ATTENTION_KERNEL_COLORS = {"Dense": RED, "Sliding window": BLUE, "Block sparse": GREEN}
+
+# The sentence of the attention slide, including the word it predicts
+GENERATED_WORDS = ["Parsa", "and", "Ali", "have", "data", "mining", "presentation"]
 
 random.seed(42)
 np.random.seed(42)
@@ -21,13 +33,19 @@ class TransformerSlides:
     def __init__(self, scene: ThreeDSlide):
         self.scene = scene
 
-    def play_slide_one(self, title, n_dims=8, num_flashes=20, anim_run_time=3):
+    def play_slide_one(self, title, n_dims=8, num_flashes=20, anim_run_time=3, autoregressive=False, words=None):
         """
         Plays a visual-only animation of self-attention.
         1. Shows words and their initial embeddings.
         2. Animates an abstract "talking" process.
         3. Shows the embeddings transforming into their final, context-aware state.
+
+        With autoregressive=True the sentence (or the given words) is generated
+        token by token instead, see play_generation.
         """
+        if autoregressive:
+            return self.play_generation(title, words or GENERATED_WORDS, n_dims=n_dims)
+
         # 1. Set up the sentence and position it at the top
         self.words_list = ["Parsa", "and", "Ali", "have", "data", "mining"]
         self.sentence = VGroup(*[Text(word, font_size=48) for word in self.words_list])
@@ -118,6 +136,141 @@ class TransformerSlides:
         self.scene.next_slide()
         self.scene.play(Unwrite(self.sentence_and_underline), Unwrite(attention_formulas), FadeOut(self.final_embeddings, self.initial_embeddings))
     
+    def play_generation(self, title, words, n_dims=8, step_run_time=0.6, max_vectors=8):
+        """
+        Autoregressive version of slide one: tokens appear one at a time and
+        each new token attends back over the prefix with arcs whose opacity is
+        its attention weight. Attention is decoded with a key/value cache, so
+        step t costs O(t); the words, embeddings, layout and arcs of earlier
+        tokens are built once and stay on screen, so each step only adds the
+        new token's arcs and dims the previous token's. Long sentences switch
+        to compact strips but stay on one row, so arcs never cross rows.
+        """
+        # 1. Decode every token incrementally
+        steps = self.decode(words, n_dims)
+
+        # 2. Lay out all cells (word above its embedding) once, then reveal them;
+        # beyond max_vectors tokens the embeddings are drawn as compact strips
+        compact = len(words) > max_vectors
+        font_size = 24 if compact else 48
+        cells = VGroup()
+        for word, (embedding, _, _) in zip(words, steps):
+            text = Text(word, font_size=font_size)
+            vector = self.create_embedding_strip(embedding, EMBEDDING_COLOR) if compact else self.create_embedding_vector(n_dims, EMBEDDING_COLOR, values=embedding)
+            cells.add(VGroup(text, vector).arrange(DOWN, buff=0.5))
+        cells.arrange(RIGHT, buff=0.1 if compact else 0.25, aligned_edge=UP)
+        available_height = title.get_bottom()[1] + config.frame_height / 2 - 0.75
+        if cells.width > config.frame_width - 1 or cells.height > available_height:
+            cells.scale(min((config.frame_width - 1) / cells.width, available_height / cells.height))
+        cells.next_to(title, DOWN, buff=0.4)
+
+        self.sentence = VGroup(*[cell[0] for cell in cells])
+        self.initial_embeddings = VGroup(*[cell[1] for cell in cells])
+        self.underline = Underline(self.sentence[0], color=YELLOW, stroke_width=5)
+        self.sentence_and_underline = VGroup(self.sentence, self.underline)
+
+        arcs = VGroup()
+        previous = VGroup()
+        for t, (_, pattern, _) in enumerate(steps):
+            text, vector = self.sentence[t], self.initial_embeddings[t]
+            strongest = pattern[:t].max() if t else 1
+            new_arcs = VGroup(*[
+                ArcBetweenPoints(
+                    vector.get_bottom(), self.initial_embeddings[j].get_bottom(),
+                    angle=-PI / 2, color=FLASH_COLOR,
+                    stroke_width=1 + 3 * pattern[j] / strongest, stroke_opacity=pattern[j] / strongest,
+                )
+                for j in range(t)
+            ])
+            anims = [Write(text), FadeIn(vector, shift=DOWN)]
+            if t == 0:
+                anims.append(Create(self.underline))
+            else:
+                anims.append(self.underline.animate.become(Underline(text, color=YELLOW, stroke_width=5)))
+                anims.append(LaggedStart(*[Create(arc) for arc in new_arcs], lag_ratio=0.05))
+            # Earlier arcs stay; only the previous token's are dimmed
+            anims += [arc.animate.set_stroke(opacity=0.25 * arc.get_stroke_opacity()) for arc in previous]
+            self.scene.play(*anims, run_time=step_run_time)
+            arcs.add(*new_arcs)
+            previous = new_arcs
+        self.scene.next_slide()
+
+        # 3. Every embedding becomes its context-aware output
+        final = VGroup(*[
+            (self.create_embedding_strip(out, FINAL_EMBEDDING_COLOR) if compact else self.create_embedding_vector(n_dims, FINAL_EMBEDDING_COLOR, values=out))
+            .replace(vector, stretch=True)
+            for vector, (_, _, out) in zip(self.initial_embeddings, steps)
+        ])
+        anims = [Transform(self.initial_embeddings, final)]
+        if len(arcs):
+            anims.append(FadeOut(arcs))
+        self.scene.play(*anims, run_time=2)
+        self.final_embeddings = self.initial_embeddings
+        self.scene.next_slide()
+        self.scene.play(Unwrite(self.sentence_and_underline), FadeOut(self.initial_embeddings))
+
+    def decode(self, words, n_dims=8):
+        """(embedding, attention pattern, output) of every token, decoded with a KV cache; deterministic."""
+        attention = IncrementalAttention(d_model=n_dims)
+        return [attention.step(word) for word in words]
+
+    def play_embedding_projector(self, title, matrix_path=PROJECTOR_MATRIX_PATH, n_components=3, rotation_time=8):
+        """
+        Shows a whole embedding matrix instead of single vectors: its rows are
+        projected to 2D/3D with chunked randomized PCA (cached by matrix hash)
+        and drawn as one point cloud, colored by the labels stored next to
+        the matrix, while the view orbits it. Without a matrix, synthetic
+        clustered embeddings (100k x 64) are written first.
+        """
+        if not os.path.exists(matrix_path):
+            make_cluster_embeddings(matrix_path)
+        X = load_matrix(matrix_path)
+        projections, _ = project(X, n_components)
+        cloud = ProjectionCloud(projections, load_labels(matrix_path))
+
+        caption = Text(f"{X.shape[0]:,} embeddings, {X.shape[1]}D → {n_components}D (randomized PCA)", font_size=24).to_edge(DOWN)
+        pin_to_frame(self.scene, title)
+        pin_to_frame(self.scene, caption)
+        self.scene.play(FadeIn(cloud), Write(caption))
+        if n_components == 3:
+            orbit(self.scene, cloud, run_time=rotation_time)
+        self.scene.next_slide()
+
+        self.scene.play(FadeOut(cloud), Unwrite(caption))
+
+    def play_attention_scaling(self, title, seq_lens=(256, 512, 1024, 2048, 4096)):
+        """
+        Dense vs. sparse attention: the masked formula, then the time and
+        memory of the NumPy kernels in util.sparse_attention, measured on the
+        machine rendering the deck (cached per machine) and plotted log-log.
+        """
+        # Same parts as the sparse formula, so the transform only writes in + M
+        dense = MathTex(r"\text{softmax}\left(\frac{QK^\top}{\sqrt{d_k}}", r"\right)V")
+        sparse = MathTex(r"\text{softmax}\left(\frac{QK^\top}{\sqrt{d_k}}", r"+ M", r"\right)V")
+        sparse[1].set_color(YELLOW)
+        note = Text("M = -inf outside a sliding window or a block pattern", font_size=24)
+        formulas = VGroup(dense, sparse, note).arrange(DOWN, buff=0.4).next_to(title, DOWN, buff=0.5)
+        self.scene.play(Write(dense))
+        self.scene.play(TransformMatchingTex(dense.copy(), sparse), Write(note))
+        self.scene.next_slide()
+
+        results = cached_benchmark(seq_lens=tuple(seq_lens))
+        series = lambda metric: {
+            name: ([r["seq_len"] for r in results if r["kernel"] == name], [r[metric] for r in results if r["kernel"] == name])
+            for name in ATTENTION_KERNELS
+        }
+        charts = VGroup(
+            ScalingChart(series("time_ms"), ATTENTION_KERNEL_COLORS, "sequence length", "time (ms)"),
+            ScalingChart(series("memory_mb"), ATTENTION_KERNEL_COLORS, "sequence length", "peak memory (MB)"),
+        ).arrange(RIGHT, buff=1)
+        charts.scale_to_fit_width(config.frame_width - 1).next_to(title, DOWN, buff=0.4)
+
+        self.scene.play(FadeOut(formulas))
+        self.scene.play(*[Create(VGroup(*chart[:4])) for chart in charts])
+        self.scene.play(*[Create(curve) for chart in charts for curve in chart.curves], run_time=2)
+        self.scene.next_slide()
+        self.scene.play(FadeOut(charts))
+
     def play_slide_two(self):
         """
         Plays the animation for the third slide, showing the
@@ -125,6 +278,11 @@ class TransformerSlides:
         """
 
         # 2. Define the components of our diagram
+        # The attention slide leaves its outputs behind. When it played in an
+        # earlier scene, its first output is decoded again: it is deterministic
+        if not hasattr(self, "final_embeddings"):
+            _, _, out = self.decode(GENERATED_WORDS)[0]
+            self.final_embeddings = VGroup(self.create_embedding_vector(8, FINAL_EMBEDDING_COLOR, values=out))
         self.input_vec = self.final_embeddings[0].copy().scale(0.8).to_edge(LEFT, buff=1)
         
         # Attention Block
@@ -240,8 +398,9 @@ class TransformerSlides:
         shift_vector = -total_network.get_center()
 
         # Animate: Reveal new layers AND Zoom out simultaneously
-        self.scene.move_camera(
-            zoom=new_zoom,
+        zoom_camera(
+            self.scene,
+            new_zoom,
             added_anims=[
                 FadeIn(new_layers),
                 total_network.animate.shift(shift_vector) # Centers the objects
@@ -279,8 +438,9 @@ class TransformerSlides:
         #     *[Unwrite(m) if isinstance(m, (Text, Tex)) else FadeOut(m) for m in objects_to_remove],
         #     self.scene.camera.frame.animate.set_width(config.frame_width).move_to(ORIGIN) # Reset to default view
         # )
-        self.scene.move_camera(
-            zoom=1, # Resets zoom to default (100%)
+        zoom_camera(
+            self.scene,
+            1, # Resets zoom to default (100%)
             added_anims=[
                 # Your cleanup animations go here
                 *[Unwrite(m) if isinstance(m, (Text, Tex)) else FadeOut(m) for m in objects_to_remove]
@@ -306,15 +466,17 @@ class TransformerSlides:
         return VGroup(box, lines, layers, label)
 
 
-    def create_embedding_vector(self, n_dims, color):
+    def create_embedding_vector(self, n_dims, color, values=None):
         """Helper function to create a single embedding vector visual."""
-        # Create a column of random decimal numbers
+        # Create a column of decimal numbers, random unless given
+        if values is None:
+            values = np.random.uniform(-0.99, 0.99, n_dims)
         numbers = VGroup(*[
             DecimalNumber(
-                np.random.uniform(-0.99, 0.99),
+                value,
                 num_decimal_places=2,
                 font_size=24,
-            ) for _ in range(n_dims)
+            ) for value in values[:n_dims]
         ])
         numbers.arrange(DOWN, buff=0.15)
         
@@ -323,6 +485,14 @@ class TransformerSlides:
         
         return VGroup(box, numbers)
 
+    def create_embedding_strip(self, values, color, size=0.2):
+        """Compact embedding for long sequences: a column of cells shaded by |value|."""
+        scale = max(np.abs(values).max(), 1e-9)
+        return VGroup(*[
+            Square(side_length=size, stroke_width=1, stroke_color=color, fill_color=color, fill_opacity=abs(value) / scale)
+            for value in values
+        ]).arrange(DOWN, buff=0)
+
 
 # --- Example of how to use the TransformerSlides class ---
 
@@ -0,0 +1,121 @@
+import functools
+
+import numpy as np
+
+from util.cache import digest
+
+# Gradient attributions already computed, by method, model, inputs and options
+_MEMO = {}
+
+def evaluate(model, inputs, target=0, batch_size=4096):
+    """Runs a batched model callable over inputs in chunks and returns one score per input."""
+    scores = np.empty(len(inputs))
+    for start in range(0, len(inputs), batch_size):
+        chunk = inputs[start:start + batch_size]
+        scores[start:start + len(chunk)] = np.asarray(model(chunk)).reshape(len(chunk), -1)[:, target]
+    return scores
+
+def occlusion_masks(shape, window=1, stride=1):
+    """
+    Every window x window patch of a 2D grid as one boolean array of shape
+    (n_patches, *shape), True where the patch hides the input.
+    """
+    rows, cols = shape
+    starts = [(i, j) for i in range(0, rows - window + 1, stride) for j in range(0, cols - window + 1, stride)]
+    masks = np.zeros((len(starts),) + tuple(shape), dtype=bool)
+    for k, (i, j) in enumerate(starts):
+        masks[k, i:i + window, j:j + window] = True
+    return masks
+
+def occlusion(model, x, window=1, stride=1, baseline=0.0, target=0, batch_size=4096):
+    """
+    Score drop when each patch is replaced by the baseline, spread back onto
+    the cells it covers. Returns (attribution grid, score of the intact input).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    masks = occlusion_masks(x.shape, window, stride)
+    inputs = np.where(masks, baseline, x[None])
+    score = evaluate(model, x[None], target)[0]
+    drops = score - evaluate(model, inputs, target, batch_size)
+    coverage = masks.sum(axis=0)
+    attribution = np.tensordot(drops, masks, axes=1) / np.maximum(coverage, 1)
+    return attribution, score
+
+def lime(model, x, n_samples=5000, keep=0.5, kernel_width=0.25, alpha=1.0, baseline=0.0, target=0, batch_size=4096, seed=0):
+    """
+    LIME with every cell as an interpretable feature: n_samples random on/off
+    masks are built as one array, the model is evaluated on them in chunks,
+    and a ridge-regularized linear surrogate weighted by an exponential kernel
+    on the cosine distance is fitted with a single solve.
+
+    Returns a dict with the per-cell weights, the intercept, the masks (True =
+    cell kept) and the model's scores on them.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    kept = rng.random((n_samples,) + x.shape) < keep
+    kept[0] = True  # the original input is always one of the samples
+    scores = evaluate(model, np.where(kept, x[None], baseline), target, batch_size)
+
+    z = kept.reshape(n_samples, -1).astype(np.float64)
+    # Cosine distance between each mask and the all-on mask
+    distance = 1 - z.sum(axis=1) / np.sqrt(np.maximum(z.sum(axis=1), 1) * z.shape[1])
+    weight = np.exp(-distance ** 2 / kernel_width ** 2)
+
+    # Weighted ridge regression on [z, 1]; the intercept is not penalized
+    design = np.hstack([z, np.ones((n_samples, 1))])
+    penalty = alpha * np.eye(design.shape[1])
+    penalty[-1, -1] = 0
+    coef = np.linalg.solve(design.T @ (design * weight[:, None]) + penalty, design.T @ (weight * scores))
+    return {
+        "weights": coef[:-1].reshape(x.shape),
+        "intercept": coef[-1],
+        "masks": kept,
+        "scores": scores,
+    }
+
+def memoized(method):
+    """Caches a gradient attribution by model weights, input batch and keyword options."""
+    @functools.wraps(method)
+    def wrapper(model, X, **kwargs):
+        X = np.asarray(X, dtype=np.float64)
+        key = digest(method.__name__, model.digest(), X, kwargs)
+        if key not in _MEMO:
+            _MEMO[key] = method(model, X, **kwargs)
+        return _MEMO[key]
+    return wrapper
+
+@memoized
+def saliency(model, X, target=0):
+    """Absolute input gradient of the target logit, for a batch of inputs."""
+    return np.abs(model.gradients(X, target)[0])
+
+@memoized
+def integrated_gradients(model, X, baseline=0.0, steps=32, target=0, batch_size=4096):
+    """
+    Integrated gradients along the straight path from the baseline, with every
+    interpolation step of every input evaluated as one batch (in chunks).
+    The attributions of each input sum to roughly logit(x) - logit(baseline).
+    """
+    alphas = (np.arange(steps) + 0.5) / steps  # midpoint rule
+    delta = X - baseline
+    path = (baseline + alphas[None, :, None] * delta.reshape(len(X), 1, -1)).reshape(len(X) * steps, *X.shape[1:])
+    grads = np.empty_like(path)
+    for start in range(0, len(path), batch_size):
+        grads[start:start + batch_size] = model.gradients(path[start:start + batch_size], target)[0]
+    return grads.reshape(len(X), steps, *X.shape[1:]).mean(axis=1) * delta
+
+@memoized
+def grad_cam(model, X, target=0):
+    """
+    Grad-CAM adapted to an MLP: the units of the first hidden layer play the
+    role of channels, weighted by the gradient of the target logit wrt them,
+    and a unit's "feature map" over the input is each cell's contribution
+    to it (x * W, zero when the unit is inactive). Returns relu of the
+    weighted sum, shaped like X.
+    """
+    _, hidden, hidden_grads = model.gradients(X, target)
+    x = X.reshape(len(X), -1)
+    maps = x[:, :, None] * model.weights[0][None] * (hidden[0] > 0)[:, None, :]
+    cam = np.einsum("nck,nk->nc", maps, hidden_grads[0])
+    return np.maximum(cam, 0).reshape(X.shape)
@@ -0,0 +1,218 @@
+import argparse
+import csv
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from util.cache import cache_path, digest
+from util.decision_tree import predict_proba
+from util.toy_mlp import ToyMLP, sigmoid
+from util.tree_trainer import fit_tree, make_loan_data
+
+# Bump when a model's training code changes, so cached fits are not reused
+BENCHMARK_VERSION = 1
+
+# Measured counterpart of assets/model_tradeoff.csv, plotted by the chart when present
+MODEL_BENCHMARK_PATH = "cache/model_benchmark.csv"
+
+def standardize(X, stats):
+    mean, std = stats
+    return (X - mean) / std
+
+def with_bias(X):
+    return np.hstack([X, np.ones((len(X), 1))])
+
+def fit_linear(X, y, seed):
+    stats = X.mean(axis=0), X.std(axis=0)
+    coef = np.linalg.lstsq(with_bias(standardize(X, stats)), y, rcond=None)[0]
+    return stats, coef
+
+def predict_linear(model, X):
+    stats, coef = model
+    return np.clip(with_bias(standardize(X, stats)) @ coef, 0, 1)
+
+def fit_logistic(X, y, seed, steps=15, l2=1e-3):
+    """Newton's method (IRLS) with a small ridge penalty."""
+    stats = X.mean(axis=0), X.std(axis=0)
+    A = with_bias(standardize(X, stats))
+    coef = np.zeros(A.shape[1])
+    for _ in range(steps):
+        p = sigmoid(A @ coef)
+        hessian = A.T @ (A * (p * (1 - p))[:, None]) / len(A) + l2 * np.eye(A.shape[1])
+        coef -= np.linalg.solve(hessian, A.T @ (p - y) / len(A) + l2 * coef)
+    return stats, coef
+
+def predict_logistic(model, X):
+    stats, coef = model
+    return sigmoid(with_bias(standardize(X, stats)) @ coef)
+
+def fit_tree_model(X, y, seed):
+    return fit_tree(X, y, max_depth=4)
+
+def predict_tree(model, X):
+    return predict_proba(model, X)[:, 1]
+
+def fit_knn(X, y, seed, k=15):
+    stats = X.mean(axis=0), X.std(axis=0)
+    return stats, standardize(X, stats), y, k
+
+def predict_knn(model, X, batch_size=512):
+    stats, train, labels, k = model
+    X = standardize(X, stats)
+    out = np.empty(len(X))
+    train_sq = (train ** 2).sum(axis=1)
+    for start in range(0, len(X), batch_size):
+        x = X[start:start + batch_size]
+        # Squared distances up to a per-row constant, which does not change the ranking
+        distance = train_sq[None] - 2 * x @ train.T
+        nearest = np.argpartition(distance, k, axis=1)[:, :k]
+        out[start:start + len(x)] = labels[nearest].mean(axis=1)
+    return out
+
+def fit_forest(X, y, seed, n_trees=30, max_depth=10):
+    """Bagging: every tree sees a bootstrap sample, given as integer sample weights."""
+    rng = np.random.default_rng(seed)
+    trees = []
+    for _ in range(n_trees):
+        counts = np.bincount(rng.integers(0, len(X), len(X)), minlength=len(X)).astype(np.float64)
+        trees.append(fit_tree(X, y, max_depth=max_depth, min_samples_leaf=5, sample_weight=counts))
+    return trees
+
+def predict_forest(model, X):
+    return np.mean([predict_tree(tree, X) for tree in model], axis=0)
+
+def fit_boosting(X, y, seed, n_rounds=50, max_depth=2):
+    """Discrete AdaBoost on shallow trees, reweighting rows through sample weights."""
+    weight = np.full(len(X), 1.0)
+    sign = 2 * y - 1
+    stages = []
+    for _ in range(n_rounds):
+        tree = fit_tree(X, y, max_depth=max_depth, min_samples_leaf=1, sample_weight=weight)
+        vote = np.where(predict_tree(tree, X) > 0.5, 1, -1)
+        error = np.clip(weight[vote != sign].sum() / weight.sum(), 1e-10, 1 - 1e-10)
+        alpha = 0.5 * np.log((1 - error) / error)
+        weight *= np.exp(-alpha * sign * vote)
+        # Weights sum to the row count, so min_samples_leaf keeps meaning rows
+        weight *= len(X) / weight.sum()
+        stages.append((alpha, tree))
+    return stages
+
+def predict_boosting(model, X):
+    score = sum(alpha * np.where(predict_tree(tree, X) > 0.5, 1, -1) for alpha, tree in model)
+    return sigmoid(2 * score)
+
+def fit_mlp(X, y, seed):
+    stats = X.mean(axis=0), X.std(axis=0)
+    return stats, ToyMLP.from_seed([X.shape[1], 32, 32, 1], seed).fit(standardize(X, stats), y, steps=300, lr=0.03)
+
+def predict_mlp(model, X):
+    stats, mlp = model
+    return mlp(standardize(X, stats))[:, 0]
+
+# name: (fit, predict, explainability on the chart's 0-10 scale, color). Explainability
+# is a judgement call, not something the benchmark can measure.
+MODELS = {
+    "Linear Regression": (fit_linear, predict_linear, 8.5, "#83C167"),
+    "Logistic Regression": (fit_logistic, predict_logistic, 7.5, "#83C167"),
+    "Decision Tree": (fit_tree_model, predict_tree, 6.5, "#83C167"),
+    "KNN": (fit_knn, predict_knn, 5.5, "#83C167"),
+    "Bagged Forest": (fit_forest, predict_forest, 2.5, "#FF862F"),
+    "Boosting": (fit_boosting, predict_boosting, 3.0, "#FF862F"),
+    "MLP": (fit_mlp, predict_mlp, 1.0, "#FC6255"),
+}
+
+def _fit_job(name, X, y, seed):
+    start = time.perf_counter()
+    model = MODELS[name][0](X, y, seed)
+    return model, time.perf_counter() - start
+
+def fit_models(X, y, names=None, seed=0, n_jobs=1):
+    """
+    Fits every model, one process per fit when n_jobs > 1 (-1 for all cores).
+    Fits are pickled under cache/benchmark keyed by model, data and seed, and
+    reused on reruns along with their original fit time.
+    Returns {name: (model, fit seconds)}.
+    """
+    names = names or list(MODELS)
+    data_key = digest(X, y)
+    paths = {name: cache_path("benchmark", digest(BENCHMARK_VERSION, name, data_key, seed), ".pkl") for name in names}
+
+    fits = {}
+    for name in names:
+        if os.path.exists(paths[name]):
+            with open(paths[name], "rb") as f:
+                fits[name] = pickle.load(f)
+    missing = [name for name in names if name not in fits]
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if n_jobs > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(min(n_jobs, len(missing))) as executor:
+            futures = {name: executor.submit(_fit_job, name, X, y, seed) for name in missing}
+            results = {name: future.result() for name, future in futures.items()}
+    else:
+        results = {name: _fit_job(name, X, y, seed) for name in missing}
+
+    for name, fit in results.items():
+        with open(paths[name], "wb") as f:
+            pickle.dump(fit, f)
+        fits[name] = fit
+    return {name: fits[name] for name in names}
+
+def benchmark(n_train=20_000, n_test=20_000, seed=0, n_jobs=1):
+    """
+    Trains every model on synthetic loan data and measures test accuracy, fit
+    time and predict throughput (rows per second). Returns one dict per model.
+    """
+    X, y = make_loan_data(n_train + n_test, seed)
+    X_train, y_train, X_test, y_test = X[:n_train], y[:n_train], X[n_train:], y[n_train:]
+    fits = fit_models(X_train, y_train, seed=seed, n_jobs=n_jobs)
+
+    results = []
+    for name, (model, fit_time) in fits.items():
+        predict = MODELS[name][1]
+        start = time.perf_counter()
+        p = predict(model, X_test)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "name": name,
+            "test_accuracy": ((p > 0.5) == y_test).mean(),
+            "fit_time": fit_time,
+            "throughput": len(X_test) / elapsed,
+        })
+    return results
+
+def write_results(results, path):
+    """
+    Writes the columns of assets/model_tradeoff.csv plus the raw measurements.
+    Unlike the hand-made 0-10 scores there, accuracy is the measured test
+    accuracy in percent.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "explainability", "accuracy", "color", "radius", "label", "test_accuracy", "fit_time", "throughput"])
+        for r in results:
+            _, _, explainability, color = MODELS[r["name"]]
+            writer.writerow([
+                r["name"], explainability, f"{100 * r['test_accuracy']:.2f}", color, 0.12, 1,
+                f"{r['test_accuracy']:.4f}", f"{r['fit_time']:.3f}", f"{r['throughput']:.0f}",
+            ])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the model families of the explainability-vs-accuracy chart.")
+    parser.add_argument("--train", type=int, default=20_000)
+    parser.add_argument("--test", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1, help="-1 uses all cores")
+    parser.add_argument("--out", default=MODEL_BENCHMARK_PATH)
+    args = parser.parse_args()
+
+    results = benchmark(args.train, args.test, args.seed, args.jobs)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    write_results(results, args.out)
+    for r in results:
+        print(f"{r['name']:<20} accuracy {r['test_accuracy']:.3f}  fit {r['fit_time']:7.2f}s  {r['throughput']:12.0f} rows/s")
+    print(f"-> {args.out}")
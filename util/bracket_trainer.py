@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from util.cache import cache_path, digest
+from util.toy_transformer import DEFAULT_CONFIG, PAD, TOKEN_IDS, ToyTransformer, softmax
+
+# Checkpoint of the toy transformer behind the circuit slides (random weights until trained)
+BRACKET_MODEL_PATH = "cache/toy_transformer/bracket.npz"
+
+# Matrices under the top-k constraint; norms and biases stay dense
+SPARSE_PARAMS = ("embed", "unembed", "attn.W_Q", "attn.W_K", "attn.W_V", "attn.W_O", "mlp.W_in", "mlp.W_out")
+
+# Bump when bracket_example changes so checkpoints of the old task are retrained
+BRACKET_TASK_VERSION = 2
+
+def bracket_example(rng, n_ctx):
+    """
+    One snippet like `values = [5, [3, 7` and its closing token. The list
+    opens at depth 1 (`[`) or 2 (`[[`), and between items an inner list may
+    open (depth 1 -> 2) or close (`], ` depth 2 -> 1). The answer (`]` or
+    `]]`) is the depth after the last item, so both depths share every
+    prefix and only tracking the brackets opened and closed mid-list solves it.
+    """
+    ids = TOKEN_IDS
+    while True:
+        depth = int(rng.integers(1, 3))
+        row = [ids["<bos>"], ids["values"], ids["="], ids["[[" if depth == 2 else "["]]
+        for item in range(int(rng.integers(1, 7))):
+            if item:
+                if depth == 2 and rng.random() < 0.4:
+                    row.append(ids["]"])
+                    depth = 1
+                row.append(ids[","])
+                if depth == 1 and rng.random() < 0.4:
+                    row.append(ids["["])
+                    depth = 2
+            row.append(ids[str(rng.integers(16))])
+        if len(row) <= n_ctx:
+            return row, ids["]]" if depth == 2 else "]"]
+
+def bracket_batches(batch_size, n_ctx, seed=0):
+    """
+    Endless stream of (tokens, position of the last token, target) batches.
+    seed may also be a Generator, which is then drawn from directly.
+    """
+    rng = np.random.default_rng(seed)
+    while True:
+        rows, targets = zip(*(bracket_example(rng, n_ctx) for _ in range(batch_size)))
+        tokens = np.full((batch_size, max(map(len, rows))), TOKEN_IDS[PAD], dtype=np.int64)
+        for i, row in enumerate(rows):
+            tokens[i, :len(row)] = row
+        yield tokens, np.array([len(row) - 1 for row in rows]), np.array(targets)
+
+def rms_norm_forward(x, w, eps=1e-6):
+    r = 1 / np.sqrt((x * x).mean(-1, keepdims=True) + eps)
+    return x * r * w, r
+
+def rms_norm_backward(dy, x, r, w):
+    g = dy * w
+    dx = r * g - x * r ** 3 * (g * x).mean(-1, keepdims=True)
+    return dx, (dy * x * r).reshape(-1, x.shape[-1]).sum(axis=0)
+
+def loss_and_grads(params, config, tokens, positions, targets):
+    """
+    Cross-entropy of the token predicted at each row's last position, and
+    its gradient wrt every parameter (a hand-written backward pass that
+    mirrors ToyTransformer.forward).
+    """
+    p = params
+    batch, seq = tokens.shape
+    n_layers, d_head = config["n_layers"], config["d_head"]
+    causal = np.tril(np.ones((seq, seq), dtype=bool))
+    mask = causal[None, None] & (tokens != TOKEN_IDS[PAD])[:, None, None, :]
+
+    x = p["embed"][tokens] + p["pos"][:seq]
+    saved = []
+    for l in range(n_layers):
+        b = f"blocks.{l}."
+        h1, r1 = rms_norm_forward(x, p[b + "ln1.w"])
+        q = np.einsum("btd,hde->bhte", h1, p[b + "attn.W_Q"], optimize=True)
+        k = np.einsum("btd,hde->bhte", h1, p[b + "attn.W_K"], optimize=True)
+        v = np.einsum("btd,hde->bhte", h1, p[b + "attn.W_V"], optimize=True)
+        pattern = softmax(np.where(mask, q @ k.transpose(0, 1, 3, 2) / np.sqrt(d_head), -1e9))
+        z = pattern @ v
+        x_mid = x + np.einsum("bhqe,hed->bqd", z, p[b + "attn.W_O"], optimize=True)
+        h2, r2 = rms_norm_forward(x_mid, p[b + "ln2.w"])
+        pre = h2 @ p[b + "mlp.W_in"] + p[b + "mlp.b_in"]
+        post = np.maximum(pre, 0)
+        saved.append((x, h1, r1, q, k, v, pattern, z, x_mid, h2, r2, pre, post))
+        x = x_mid + post @ p[b + "mlp.W_out"] + p[b + "mlp.b_out"]
+
+    rows = np.arange(batch)
+    x_last = x[rows, positions]
+    h_final, r_final = rms_norm_forward(x_last, p["ln_final.w"])
+    probs = softmax(h_final @ p["unembed"])
+    loss = -np.log(probs[rows, targets] + 1e-12).mean()
+
+    grads = {}
+    dlogits = probs.copy()
+    dlogits[rows, targets] -= 1
+    dlogits /= batch
+    grads["unembed"] = h_final.T @ dlogits
+    dx_last, grads["ln_final.w"] = rms_norm_backward(dlogits @ p["unembed"].T, x_last, r_final, p["ln_final.w"])
+    dx = np.zeros_like(x)
+    dx[rows, positions] = dx_last
+
+    for l in reversed(range(n_layers)):
+        b = f"blocks.{l}."
+        x_in, h1, r1, q, k, v, pattern, z, x_mid, h2, r2, pre, post = saved[l]
+
+        # MLP
+        grads[b + "mlp.W_out"] = np.einsum("btm,btd->md", post, dx, optimize=True)
+        grads[b + "mlp.b_out"] = dx.sum(axis=(0, 1))
+        dpre = (dx @ p[b + "mlp.W_out"].T) * (pre > 0)
+        grads[b + "mlp.W_in"] = np.einsum("btd,btm->dm", h2, dpre, optimize=True)
+        grads[b + "mlp.b_in"] = dpre.sum(axis=(0, 1))
+        dh2 = dpre @ p[b + "mlp.W_in"].T
+        dmid, grads[b + "ln2.w"] = rms_norm_backward(dh2, x_mid, r2, p[b + "ln2.w"])
+        dx = dx + dmid
+
+        # Attention
+        grads[b + "attn.W_O"] = np.einsum("bhqe,bqd->hed", z, dx, optimize=True)
+        dz = np.einsum("bqd,hed->bhqe", dx, p[b + "attn.W_O"], optimize=True)
+        dpattern = dz @ v.transpose(0, 1, 3, 2)
+        dv = pattern.transpose(0, 1, 3, 2) @ dz
+        dscores = pattern * (dpattern - (dpattern * pattern).sum(-1, keepdims=True)) / np.sqrt(d_head)
+        dq = dscores @ k
+        dk = dscores.transpose(0, 1, 3, 2) @ q
+        dh1 = 0
+        for name, d in (("W_Q", dq), ("W_K", dk), ("W_V", dv)):
+            grads[b + "attn." + name] = np.einsum("btd,bhte->hde", h1, d, optimize=True)
+            dh1 = dh1 + np.einsum("bhte,hde->btd", d, p[b + "attn." + name], optimize=True)
+        din, grads[b + "ln1.w"] = rms_norm_backward(dh1, x_in, r1, p[b + "ln1.w"])
+        dx = dx + din
+
+    grads["embed"] = np.zeros_like(p["embed"])
+    np.add.at(grads["embed"], tokens, dx)
+    grads["pos"] = np.zeros_like(p["pos"])
+    grads["pos"][:seq] = dx.sum(axis=0)
+    return loss, grads
+
+def is_sparse(name):
+    return name.endswith(SPARSE_PARAMS)
+
+def apply_top_k(params, keep):
+    """Keeps the keep-fraction of largest-magnitude entries of every sparse matrix."""
+    for name, param in params.items():
+        if is_sparse(name) and keep < 1:
+            k = max(1, int(round(keep * param.size)))
+            flat = np.abs(param).ravel()
+            drop = np.argpartition(flat, param.size - k)[:param.size - k]
+            param.flat[drop] = 0
+
+def evaluate(model, batches, n_batches=8):
+    """Accuracy of the closing token over a few fresh batches."""
+    correct = total = 0
+    for _, (tokens, positions, targets) in zip(range(n_batches), batches):
+        logits = model.forward(tokens)
+        correct += (logits[np.arange(len(tokens)), positions].argmax(-1) == targets).sum()
+        total += len(tokens)
+    return correct / total
+
+def train_bracket(keep=0.1, steps=1000, batch_size=64, lr=3e-3, seed=0, config=None, checkpoint_every=500):
+    """
+    Trains the toy transformer on streamed bracket snippets with Adam, keeping
+    only the top keep-fraction of every weight matrix after each step (the
+    weight-sparsity constraint). Mid-run checkpoints under cache/toy_transformer
+    hold the step, the weights, the optimizer state and the batch stream's
+    generator state, and an interrupted run resumes from there; a finished
+    run is saved compactly and loaded instead of retrained.
+    Returns (model, closing-token accuracy, checkpoint path).
+    """
+    config = dict(config or DEFAULT_CONFIG)
+    run = dict(task=BRACKET_TASK_VERSION, keep=float(keep), steps=steps, batch_size=batch_size, lr=float(lr), seed=seed, config=config)
+    path = cache_path("toy_transformer", "bracket-" + digest(run)[:16], ".npz")
+    state_path = path[:-len(".npz")] + ".state.npz"
+    test_batches = bracket_batches(256, config["n_ctx"], seed=seed + 1_000_000)
+    if os.path.exists(path) and os.path.exists(path + ".done"):
+        model = ToyTransformer.load(path)
+        return model, evaluate(model, test_batches), path
+
+    model = ToyTransformer.init(config, seed)
+    params = model.params
+    apply_top_k(params, keep)
+    m = {name: np.zeros_like(param) for name, param in params.items()}
+    v = {name: np.zeros_like(param) for name, param in params.items()}
+    rng = np.random.default_rng(seed)
+    step = 0
+    if os.path.exists(state_path):
+        with np.load(state_path) as data:
+            step = int(data["step"])
+            rng.bit_generator.state = json.loads(str(data["rng"]))
+            for name in params:
+                params[name], m[name], v[name] = data[name], data["m." + name], data["v." + name]
+
+    def save():
+        np.savez(
+            state_path, step=step, rng=json.dumps(rng.bit_generator.state), **params,
+            **{"m." + k: a for k, a in m.items()}, **{"v." + k: a for k, a in v.items()},
+        )
+
+    batches = bracket_batches(batch_size, config["n_ctx"], seed=rng)
+    while step < steps:
+        step += 1
+        _, grads = loss_and_grads(params, config, *next(batches))
+        for name, g in grads.items():
+            m[name] = 0.9 * m[name] + 0.1 * g
+            v[name] = 0.999 * v[name] + 0.001 * g * g
+            params[name] -= (lr * (m[name] / (1 - 0.9 ** step)) / (np.sqrt(v[name] / (1 - 0.999 ** step)) + 1e-8)).astype(np.float32)
+        apply_top_k(params, keep)
+        if step % checkpoint_every == 0 and step < steps:
+            save()
+
+    model.save(path, compact=True)
+    open(path + ".done", "w").close()
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return model, evaluate(model, test_batches), path
+
+def _train_job(keep, steps, seed):
+    _, accuracy, path = train_bracket(keep, steps=steps, seed=seed)
+    return keep, accuracy, path
+
+def sweep(keeps=(1.0, 0.25, 0.1, 0.05), steps=1000, seed=0, n_jobs=1):
+    """
+    Trains one model per sparsity level, in parallel processes when
+    n_jobs > 1 (-1 for all cores). Returns [(keep, accuracy, path)].
+    """
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if n_jobs > 1:
+        with ProcessPoolExecutor(min(n_jobs, len(keeps))) as executor:
+            return list(executor.map(_train_job, keeps, [steps] * len(keeps), [seed] * len(keeps)))
+    return [_train_job(keep, steps, seed) for keep in keeps]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train weight-sparse toy transformers on the bracket-nesting task.")
+    parser.add_argument("--keep", type=float, nargs="+", default=[1.0, 0.25, 0.1, 0.05], help="fractions of each weight matrix kept")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1, help="-1 uses all cores")
+    parser.add_argument("--min-accuracy", type=float, default=0.95, help="the sparsest model above this is kept for the slides")
+    parser.add_argument("--out", default=BRACKET_MODEL_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = sweep(args.keep, args.steps, args.seed, args.jobs)
+    for keep, accuracy, path in results:
+        print(f"keep {keep:<5g} accuracy {accuracy:.3f}  {path}")
+
+    good = [r for r in results if r[1] >= args.min_accuracy] or [max(results, key=lambda r: r[1])]
+    keep, accuracy, path = min(good, key=lambda r: r[0])
+    ToyTransformer.load(path).save(args.out, compact=True)
+    print(f"{time.perf_counter() - start:.1f}s, keep {keep:g} (accuracy {accuracy:.3f}) -> {args.out}")
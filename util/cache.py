@@ -0,0 +1,36 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Everything derived from the deck (layouts, activations, ...)
+# lives here, next to manim's media/ folder. Deleting it is always safe.
+CACHE_DIR = "cache"
+
+def digest(*parts):
+    """
+    Returns a stable sha256 hex digest of strings, bytes, numpy arrays and
+    JSON-serialisable values.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(str(part.dtype).encode())
+            h.update(str(part.shape).encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, bytes):
+            h.update(part)
+        elif isinstance(part, str):
+            h.update(part.encode())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        # Separator so ("ab", "c") and ("a", "bc") hash differently
+        h.update(b"\x00")
+    return h.hexdigest()
+
+def cache_path(namespace, key, suffix=""):
+    """Returns the path for a cache entry, creating its folder if needed."""
+    folder = os.path.join(CACHE_DIR, namespace)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, key + suffix)
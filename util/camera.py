@@ -0,0 +1,52 @@
+from manim import *
+
+# Camera helpers that work on both render paths of the deck: the default 2D
+# moving camera (scene.camera.frame) and the 3D camera of ThreeDSlide.
+
+def pin_to_frame(scene, mobject):
+    """
+    Keeps a mobject at its place on screen: fixed in frame under the 3D
+    camera, following (and scaling with) camera.frame under a moving camera.
+    """
+    if hasattr(scene, "add_fixed_in_frame_mobjects"):
+        scene.add_fixed_in_frame_mobjects(mobject)
+        return
+    frame = getattr(scene.camera, "frame", None)
+    if frame is None:
+        return
+    width = frame.width
+    offset = mobject.get_center() - frame.get_center()
+    height = mobject.height
+
+    def follow(mob):
+        ratio = frame.width / width
+        mob.scale_to_fit_height(height * ratio).move_to(frame.get_center() + offset * ratio)
+    mobject.add_updater(follow)
+
+def zoom_camera(scene, zoom, added_anims=(), run_time=1):
+    """Zooms around the origin with camera.frame, or with move_camera under the 3D camera."""
+    frame = getattr(scene.camera, "frame", None)
+    if frame is None:
+        scene.move_camera(zoom=zoom, added_anims=list(added_anims), run_time=run_time)
+        return
+    scene.play(frame.animate.set(width=config.frame_width / zoom).move_to(ORIGIN), *added_anims, run_time=run_time)
+
+def orbit(scene, mobject, run_time=8, tilt=70 * DEGREES):
+    """
+    One turn around a 3D mobject. The 3D camera tilts and rotates around it;
+    the 2D camera projects orthographically, so tilting and spinning the
+    mobject itself gives the same picture. Returns to the initial view.
+    """
+    if hasattr(scene, "begin_ambient_camera_rotation"):
+        scene.move_camera(phi=tilt, theta=-45 * DEGREES, run_time=2)
+        scene.begin_ambient_camera_rotation(rate=2 * PI / run_time)
+        scene.wait(run_time)
+        scene.stop_ambient_camera_rotation()
+        scene.move_camera(phi=0, theta=-90 * DEGREES)
+        return
+    center = mobject.get_center()
+    scene.play(Rotate(mobject, -tilt, axis=RIGHT, about_point=center), run_time=2)
+    # Spin around the tilted vertical axis of the mobject
+    axis = rotate_vector(OUT, -tilt, RIGHT)
+    scene.play(Rotate(mobject, 2 * PI, axis=axis, about_point=center), run_time=run_time, rate_func=linear)
+    scene.play(Rotate(mobject, tilt, axis=RIGHT, about_point=center))
@@ -0,0 +1,195 @@
+import json
+import os
+
+from util.cache import cache_path, digest
+
+# Bump when the algorithm changes so stale layouts on disk are ignored
+LAYOUT_VERSION = 2
+
+# Nodes of these kinds sit on the residual stream and are pinned to x = 0
+STREAM_KINDS = {"tokens", "branch", "add"}
+EDGE_KINDS = {"residual", "wire", "qk", "value"}
+SIDE_RANK = {"left": -1, None: 0, "right": 1}
+
+def node_size(node):
+    """Returns the (width, height) a node occupies, in scene units."""
+    kind = node["kind"]
+    if kind == "tokens":
+        return 0.25 * len(node.get("label", "")) + 0.7 * len(node.get("tokens", [])), 0.6
+    if kind == "box":
+        return node.get("width", 1.2), node.get("height", 0.5)
+    if kind in ("op", "add"):
+        return 0.4, 0.4
+    if kind == "branch":
+        return 0.1, 0.1
+    raise ValueError(f"Unknown node kind: {kind}")
+
+def validate(description):
+    """Checks ids, kinds and edge endpoints of a circuit description."""
+    ids = set()
+    for node in description["nodes"]:
+        if node["id"] in ids:
+            raise ValueError(f"Duplicate node id: {node['id']}")
+        node_size(node)
+        ids.add(node["id"])
+    for edge in description["edges"]:
+        if edge["source"] not in ids or edge["target"] not in ids:
+            raise ValueError(f"Edge refers to an unknown node: {edge}")
+        if edge.get("kind", "wire") not in EDGE_KINDS:
+            raise ValueError(f"Unknown edge kind: {edge['kind']}")
+    for annotation in description.get("annotations", []):
+        if annotation["node"] not in ids:
+            raise ValueError(f"Annotation refers to an unknown node: {annotation}")
+
+def assign_layers(description):
+    """Longest-path layering in topological order (Kahn's algorithm)."""
+    ids = [node["id"] for node in description["nodes"]]
+    successors = {i: [] for i in ids}
+    in_degree = {i: 0 for i in ids}
+    for edge in description["edges"]:
+        successors[edge["source"]].append(edge["target"])
+        in_degree[edge["target"]] += 1
+
+    layer = {i: 0 for i in ids}
+    queue = [i for i in ids if in_degree[i] == 0]
+    visited = 0
+    while queue:
+        u = queue.pop()
+        visited += 1
+        for v in successors[u]:
+            layer[v] = max(layer[v], layer[u] + 1)
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                queue.append(v)
+
+    if visited != len(ids):
+        raise ValueError("Circuit description contains a cycle")
+    return layer
+
+def place_layer(order, desired, info, h_gap):
+    """
+    Sorts a layer by desired x and pushes nodes apart until they no longer
+    overlap. Pinned (stream) nodes all sit exactly at x = 0; the others are
+    pushed outwards from them, to the side their desired x puts them on.
+    """
+    order = sorted(order, key=lambda n: (desired[n], SIDE_RANK[info[n]["side"]]))
+    pinned = [n for n in order if info[n]["pinned"]]
+    x = {}
+    if not pinned:
+        for k, n in enumerate(order):
+            x[n] = desired[n]
+            if k > 0:
+                prev = order[k - 1]
+                gap = (info[prev]["width"] + info[n]["width"]) / 2 + h_gap
+                x[n] = max(x[n], x[prev] + gap)
+        offset = sum(x[n] - desired[n] for n in order) / len(order)
+        for n in order:
+            x[n] -= offset
+        return order, x
+
+    # Pinned nodes have desired x = 0, so the sort puts the free nodes on
+    # either side of them (ties broken by the side they prefer)
+    last = order.index(pinned[-1])
+    left = [n for n in order[:last] if not info[n]["pinned"]]
+    right = order[last + 1:]
+    stream_width = max(info[n]["width"] for n in pinned)
+    for n in pinned:
+        x[n] = 0.0
+    for nodes, sign in ((reversed(left), -1), (right, 1)):
+        edge, prev_width = 0.0, stream_width
+        for n in nodes:
+            gap = (prev_width + info[n]["width"]) / 2 + h_gap
+            x[n] = sign * max(sign * desired[n], sign * edge + gap)
+            edge, prev_width = x[n], info[n]["width"]
+    return left + pinned + right, x
+
+def compute_layout(description, layer_gap=1.0, h_gap=0.6, sweeps=4):
+    """
+    Layered (Sugiyama-style) layout of a circuit description:
+    longest-path layering, dummy nodes for edges spanning several layers,
+    barycentric sweeps to reduce crossings and residual-stream nodes pinned
+    to a vertical line at x = 0.
+    """
+    validate(description)
+    layer = assign_layers(description)
+
+    info = {}
+    for node in description["nodes"]:
+        width, _ = node_size(node)
+        info[node["id"]] = {
+            "width": width,
+            "side": node.get("side"),
+            "pinned": node["kind"] in STREAM_KINDS,
+        }
+
+    # Split long edges into unit-length segments through dummy nodes
+    predecessors = {n: [] for n in info}
+    successors = {n: [] for n in info}
+    chains = []
+    for k, edge in enumerate(description["edges"]):
+        kind = edge.get("kind", "wire")
+        chain = [edge["source"]]
+        for depth in range(layer[edge["source"]] + 1, layer[edge["target"]]):
+            dummy = f"__dummy_{k}_{depth}"
+            info[dummy] = {"width": 0.1, "side": None, "pinned": kind == "residual"}
+            layer[dummy] = depth
+            predecessors[dummy], successors[dummy] = [], []
+            chain.append(dummy)
+        chain.append(edge["target"])
+        for u, v in zip(chain, chain[1:]):
+            successors[u].append(v)
+            predecessors[v].append(u)
+        chains.append(chain)
+
+    n_layers = max(layer.values()) + 1
+    layers = [[] for _ in range(n_layers)]
+    for n in info:
+        layers[layer[n]].append(n)
+
+    x = {}
+    for i in range(n_layers):
+        layers[i], placed = place_layer(layers[i], {n: 0.0 for n in layers[i]}, info, h_gap)
+        x.update(placed)
+
+    def barycenter(n, neighbours):
+        if info[n]["pinned"] or not neighbours[n]:
+            return 0.0 if info[n]["pinned"] else x[n]
+        return sum(x[m] for m in neighbours[n]) / len(neighbours[n])
+
+    for sweep in range(sweeps):
+        down = sweep % 2 == 0
+        indices = range(1, n_layers) if down else range(n_layers - 2, -1, -1)
+        neighbours = predecessors if down else successors
+        for i in indices:
+            desired = {n: barycenter(n, neighbours) for n in layers[i]}
+            layers[i], placed = place_layer(layers[i], desired, info, h_gap)
+            x.update(placed)
+
+    def point(n):
+        return [round(x[n], 4), round(-layer[n] * layer_gap, 4)]
+
+    return {
+        "nodes": {node["id"]: point(node["id"]) for node in description["nodes"]},
+        "edges": [
+            {
+                "source": edge["source"],
+                "target": edge["target"],
+                "kind": edge.get("kind", "wire"),
+                "points": [point(n) for n in chain],
+            }
+            for edge, chain in zip(description["edges"], chains)
+        ],
+    }
+
+def load_layout(description, **params):
+    """Returns the layout of a description, computing it once and caching it on disk."""
+    key = digest("circuit-layout", LAYOUT_VERSION, description, params)
+    path = cache_path("circuit_layout", key, ".json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    layout = compute_layout(description, **params)
+    with open(path, "w") as f:
+        json.dump(layout, f)
+    return layout
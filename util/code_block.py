@@ -0,0 +1,84 @@
+import builtins
+import keyword
+import os
+import re
+
+from manim import *
+
+from util.cache import cache_path, digest
+from util.geometry_cache import GEOMETRY_VERSION, load_geometry, save_geometry
+
+PYTHON_PALETTE = {
+    "comment": GRAY,
+    "keyword": BLUE,
+    "builtin": BLUE,
+    "string": GREEN,
+    "number": WHITE,
+    "name": WHITE,
+    "punctuation": WHITE,
+}
+
+TOKEN_PATTERN = re.compile(
+    r"(?P<comment>#.*)"
+    r"|(?P<string>'[^'\n]*'?|\"[^\"\n]*\"?)"
+    r"|(?P<number>\d+(?:\.\d+)?)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<punctuation>[^\s\w])"
+)
+
+BUILTINS = set(dir(builtins))
+
+def tokenize(source):
+    """Yields (start, end, token kind) for the highlighted tokens of a snippet."""
+    for match in TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind == "name" and keyword.iskeyword(match.group()):
+            kind = "keyword"
+        elif kind == "name" and match.group() in BUILTINS:
+            kind = "builtin"
+        yield match.start(), match.end(), kind
+
+def shape_snippet(source, font, font_size, palette):
+    """Shapes a whole snippet with one Text and colors it token by token."""
+    text = Text(source, font=font, font_size=font_size, color=palette["name"], disable_ligatures=True)
+
+    colors = [None] * len(source)
+    for start, end, kind in tokenize(source):
+        colors[start:end] = [palette[kind]] * (end - start)
+
+    # Depending on the manim version whitespace may or may not get a placeholder glyph
+    glyphs = text.submobjects
+    if len(glyphs) != len(source):
+        colors = [color for char, color in zip(source, colors) if not char.isspace()]
+
+    by_color = {}
+    for glyph, color in zip(glyphs, colors):
+        if color is not None:
+            by_color.setdefault(color, []).append(glyph)
+    for color, group in by_color.items():
+        VGroup(*group).set_color(color)
+    return text
+
+def load_snippet(source, font, font_size, palette):
+    """
+    Glyphs of a shaped and colored snippet. They are stored under
+    cache/geometry, keyed by text, font, size and palette, so later runs
+    neither call Pango nor color the tokens again.
+    """
+    colors = sorted((kind, ManimColor(color).to_hex()) for kind, color in palette.items())
+    key = digest("code-block", GEOMETRY_VERSION, source, font, font_size, colors, str(config.renderer))[:32]
+    path = cache_path("geometry", key)
+    if not os.path.exists(path + ".npy"):
+        save_geometry(shape_snippet(source, font, font_size, palette).submobjects, path)
+    return VGroup(*load_geometry(path))
+
+class CodeBlock(VGroup):
+    """
+    A syntax-highlighted code snippet shaped in one pass. The colored glyphs
+    are cached on disk, so an annotation is only shaped on the first run.
+    """
+    def __init__(self, lines, font="Monospace", font_size=18, palette=None, **kwargs):
+        palette = palette or PYTHON_PALETTE
+        source = "\n".join(lines)
+        super().__init__(load_snippet(source, font, font_size, palette), **kwargs)
+        self.lines = lines
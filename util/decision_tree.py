@@ -0,0 +1,86 @@
+import numpy as np
+
+# Same conventions as fitted (scikit-learn style) trees
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+def make_tree(children_left, children_right, feature, threshold, value, feature_names, class_names):
+    """
+    Bundles a tree in flat-array form. Node i sends a row left when
+    row[feature[i]] <= threshold[i]; leaves have children_left == -1.
+    value[i] holds the class counts (or probabilities) reaching node i.
+    """
+    return {
+        "children_left": np.asarray(children_left, dtype=np.int64),
+        "children_right": np.asarray(children_right, dtype=np.int64),
+        "feature": np.asarray(feature, dtype=np.int64),
+        "threshold": np.asarray(threshold, dtype=np.float64),
+        "value": np.asarray(value, dtype=np.float64),
+        "feature_names": np.asarray(feature_names),
+        "class_names": np.asarray(class_names),
+    }
+
+def save_tree(tree, path):
+    np.savez_compressed(path, **tree)
+
+def load_tree(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+def tidy_layout(children_left, children_right):
+    """
+    Layered layout in linear time: leaves take consecutive slots from left to
+    right and every internal node is centered over its two children.
+    Returns (x slot, depth) per node.
+    """
+    n = len(children_left)
+    depth = np.zeros(n, dtype=np.int64)
+    x = np.zeros(n)
+
+    # Pre-order walk, left subtree first
+    order = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if children_left[node] != TREE_LEAF:
+            for child in (children_right[node], children_left[node]):
+                depth[child] = depth[node] + 1
+                stack.append(child)
+
+    order = np.array(order)
+    is_leaf = children_left[order] == TREE_LEAF
+    x[order[is_leaf]] = np.arange(is_leaf.sum())
+    # Children come after their parent in pre-order, so a reverse walk is bottom-up
+    for node in order[::-1][~is_leaf[::-1]]:
+        x[node] = (x[children_left[node]] + x[children_right[node]]) / 2
+    return x, depth
+
+def decision_path(tree, row):
+    """Follows one row from the root to its leaf and returns the visited nodes."""
+    node = 0
+    path = [node]
+    while tree["children_left"][node] != TREE_LEAF:
+        if row[tree["feature"][node]] <= tree["threshold"][node]:
+            node = tree["children_left"][node]
+        else:
+            node = tree["children_right"][node]
+        path.append(int(node))
+    return path
+
+def apply(tree, X):
+    """Returns the leaf reached by every row of X, moving all rows one level at a time."""
+    left, right = tree["children_left"], tree["children_right"]
+    node = np.zeros(len(X), dtype=np.int64)
+    active = np.flatnonzero(left[node] != TREE_LEAF)
+    while len(active):
+        current = node[active]
+        go_left = X[active, tree["feature"][current]] <= tree["threshold"][current]
+        node[active] = np.where(go_left, left[current], right[current])
+        active = active[left[node[active]] != TREE_LEAF]
+    return node
+
+def predict_proba(tree, X):
+    """Class probabilities of the leaves reached by X."""
+    value = tree["value"][apply(tree, X)]
+    return value / value.sum(axis=1, keepdims=True)
@@ -0,0 +1,108 @@
+import os
+from functools import lru_cache
+
+import manimpango
+from manim import *
+
+from util.geometry_cache import CachedText
+
+# Fonts in here are registered with Pango when the requested family is missing
+BUNDLED_FONT_DIR = "assets/fonts"
+
+# Tried in order when the requested family is neither installed nor bundled
+FALLBACK_FONTS = ("DejaVu Sans Mono", "Liberation Mono", "Noto Sans Mono", "Courier New")
+
+# Family used by GlyphText when none is given; set by setup_fonts
+FONT = None
+
+# Glyph outlines and advances, keyed by (character, font, size)
+_GLYPHS = {}
+
+@lru_cache(maxsize=None)
+def resolve_font(family, fallbacks=FALLBACK_FONTS, bundled_dir=BUNDLED_FONT_DIR):
+    """
+    Returns the family Pango will actually use for `family`: the family
+    itself if installed, else after registering the fonts in bundled_dir,
+    else the first installed fallback. Logs the choice once.
+    """
+    available = set(manimpango.list_fonts())
+    if family not in available and os.path.isdir(bundled_dir):
+        for name in sorted(os.listdir(bundled_dir)):
+            if name.lower().endswith((".ttf", ".otf")):
+                manimpango.register_font(os.path.join(bundled_dir, name))
+        available = set(manimpango.list_fonts())
+
+    for candidate in (family,) + tuple(fallbacks):
+        if candidate in available:
+            if candidate == family:
+                logger.info(f"Using font {family!r}")
+            else:
+                logger.warning(f"Font {family!r} is not installed, using {candidate!r}")
+            return candidate
+    logger.warning(f"Neither {family!r} nor any fallback font is installed, Pango picks a substitute")
+    return family
+
+def setup_fonts(family):
+    """Resolves the deck font once and makes it the default of Text and GlyphText."""
+    global FONT
+    FONT = resolve_font(family)
+    Text.set_default(font=FONT)
+    return FONT
+
+@lru_cache(maxsize=None)
+def font_metrics(font, font_size):
+    """
+    Advance of an H and the line height Pango uses, shaped once per (font,
+    size): the distance between the baselines of a two-line Text.
+    """
+    pair = CachedText("HH", font=font, font_size=font_size)
+    lines = CachedText("H\nH", font=font, font_size=font_size)
+    return pair[1].get_left()[0] - pair[0].get_left()[0], lines[0].get_bottom()[1] - lines[1].get_bottom()[1]
+
+def glyph(char, font, font_size):
+    """
+    Outline and advance of one character, shaped once per (character, font,
+    size). The character is shaped between two H's: the first fixes the pen
+    position and the baseline, the second the advance. Returns (outline
+    relative to the pen on the baseline, or None for whitespace; advance).
+    """
+    key = (char, font, font_size)
+    if key not in _GLYPHS:
+        h_advance, _ = font_metrics(font, font_size)
+        shaped = CachedText(f"H{char}H", font=font, font_size=font_size)
+        origin = np.array([shaped[0].get_left()[0] + h_advance, shaped[0].get_bottom()[1], 0])
+        outline = None if char.isspace() else shaped[1].copy().shift(-origin)
+        _GLYPHS[key] = (outline, shaped[-1].get_left()[0] - origin[0])
+    return _GLYPHS[key]
+
+class GlyphText(VGroup):
+    """
+    Text assembled from cached glyph outlines instead of shaping the whole
+    string with Pango: each character is shaped once per font and size,
+    later strings only copy outlines along a pen. No kerning or ligatures,
+    which the deck's monospace font doesn't use. Like Text, the submobjects
+    are the visible glyphs; t2c colors every occurrence of a substring.
+    """
+    def __init__(self, text, font=None, font_size=DEFAULT_FONT_SIZE, color=WHITE, t2c=None, line_spacing=1.0, **kwargs):
+        super().__init__(**kwargs)
+        font = font or FONT or resolve_font("Consolas")
+        self.text = text
+
+        colors = [color] * len(text)
+        for substring, substring_color in (t2c or {}).items():
+            start = text.find(substring)
+            while start != -1:
+                colors[start:start + len(substring)] = [substring_color] * len(substring)
+                start = text.find(substring, start + 1)
+
+        line_height = line_spacing * font_metrics(font, font_size)[1]
+        pen = baseline = 0.0
+        for char, char_color in zip(text, colors):
+            if char == "\n":
+                pen, baseline = 0.0, baseline - line_height
+                continue
+            outline, advance = glyph(char, font, font_size)
+            if outline is not None:
+                self.add(outline.copy().set_color(char_color).shift([pen, baseline, 0]))
+            pen += advance
+        self.center()
@@ -0,0 +1,178 @@
+import json
+import os
+
+import manim
+import numpy as np
+from manim import *
+
+from util.cache import cache_path, digest
+
+# Bump when the record layout changes
+GEOMETRY_VERSION = 3
+
+# Since manim 0.20 MathTex cuts its parts out of the SVG's named groups
+# instead of compiling every tex_string again
+MATHTEX_PARTS_FROM_SVG = tuple(int(part) for part in manim.__version__.split(".")[:2]) >= (0, 20)
+
+# One record per path of an SVG mobject; its points are rows start:stop of
+# the sibling .points.npy and its colors are row ranges of .colors.npy, so
+# gradients keep every color. Paths sharing a group id are one submobject.
+GEOMETRY_DTYPE = np.dtype([
+    ("start", "<i8"),
+    ("stop", "<i8"),
+    ("group", "<i4"),
+    ("fill", "<i8", (2,)),
+    ("stroke", "<i8", (2,)),
+    ("background_stroke", "<i8", (2,)),
+    ("stroke_width", "<f8"),
+    ("background_stroke_width", "<f8"),
+    ("sheen_factor", "<f8"),
+    ("sheen_direction", "<f8", (3,)),
+])
+
+def save_geometry(mobjects, path):
+    """Writes the paths of mobjects (and of their families) as points, colors and a record array."""
+    records, points, colors = [], [], []
+    count, color_count = 0, 0
+
+    def add_colors(rgbas):
+        nonlocal color_count
+        rgbas = np.asarray(rgbas, dtype=float).reshape(-1, 4)
+        colors.append(rgbas)
+        color_count += len(rgbas)
+        return (color_count - len(rgbas), color_count)
+
+    for group, mob in enumerate(mobjects):
+        for path_mob in mob.family_members_with_points():
+            n = len(path_mob.points)
+            records.append((
+                count, count + n, group,
+                add_colors(path_mob.fill_rgbas),
+                add_colors(path_mob.stroke_rgbas),
+                add_colors(path_mob.background_stroke_rgbas),
+                path_mob.stroke_width,
+                path_mob.background_stroke_width,
+                path_mob.sheen_factor,
+                path_mob.sheen_direction,
+            ))
+            points.append(path_mob.points)
+            count += n
+    # The record file marks a complete entry, so it is written last
+    np.save(path + ".points.npy", np.concatenate(points) if points else np.zeros((0, 3)))
+    np.save(path + ".colors.npy", np.concatenate(colors) if colors else np.zeros((0, 4)))
+    tmp = path + ".tmp.npy"
+    np.save(tmp, np.array(records, dtype=GEOMETRY_DTYPE))
+    os.replace(tmp, path + ".npy")
+
+def load_geometry(path):
+    """
+    Rebuilds the mobjects saved by save_geometry. Points are views into a
+    copy-on-write memory map: nothing is parsed or copied until a mobject
+    is actually transformed.
+    """
+    records = np.load(path + ".npy")
+    points = np.load(path + ".points.npy", mmap_mode="c")
+    colors = np.load(path + ".colors.npy")
+    groups = {}
+    for record in records:
+        mob = VMobject()
+        mob.points = points[record["start"]:record["stop"]]
+        mob.fill_rgbas = colors[slice(*record["fill"])].copy()
+        mob.stroke_rgbas = colors[slice(*record["stroke"])].copy()
+        mob.background_stroke_rgbas = colors[slice(*record["background_stroke"])].copy()
+        mob.stroke_width = float(record["stroke_width"])
+        mob.background_stroke_width = float(record["background_stroke_width"])
+        mob.sheen_factor = float(record["sheen_factor"])
+        mob.sheen_direction = record["sheen_direction"].copy()
+        groups.setdefault(int(record["group"]), []).append(mob)
+    return [paths[0] if len(paths) == 1 else VGroup(*paths) for _, paths in sorted(groups.items())]
+
+def save_groups(mobjects, id_to_vgroup_dict, path):
+    """Writes which of mobjects each named SVG group holds, by index."""
+    index = {id(mob): i for i, mob in enumerate(mobjects)}
+    groups = {
+        name: [index[id(mob)] for mob in group.submobjects if id(mob) in index]
+        for name, group in id_to_vgroup_dict.items()
+    }
+    with open(path + ".groups.json", "w") as f:
+        json.dump(groups, f)
+
+def load_groups(mobjects, path):
+    """Rebuilds the named SVG groups saved by save_groups from the loaded mobjects."""
+    with open(path + ".groups.json") as f:
+        return {name: VGroup(*[mobjects[i] for i in indices]) for name, indices in json.load(f).items()}
+
+class CachedGeometry:
+    """
+    Mixin for SVG-based mobjects: the parsed geometry is stored on disk under
+    cache/geometry, keyed by manim's own hash seed (string, template, font,
+    size and style), and reloaded on later runs instead of re-parsing the SVG.
+    The SVG's named groups are kept too, as MathTex splits its parts by them.
+    """
+    def init_svg_mobject(self, use_svg_cache):
+        path = cache_path("geometry", digest("svg-geometry", GEOMETRY_VERSION, repr(self.hash_seed))[:32])
+        if os.path.exists(path + ".npy"):
+            self.add(*load_geometry(path))
+            self.id_to_vgroup_dict = load_groups(self.submobjects, path)
+            return
+        super().init_svg_mobject(use_svg_cache)
+        save_groups(self.submobjects, getattr(self, "id_to_vgroup_dict", {}), path)
+        save_geometry(self.submobjects, path)
+
+class TexPart(VMobject):
+    """One tex_string of a cached MathTex, standing in for the SingleStringMathTex manim would build."""
+    def __init__(self, tex_string, **kwargs):
+        super().__init__(**kwargs)
+        self.tex_string = tex_string
+
+    def get_tex_string(self):
+        return self.tex_string
+
+def substring_size(tex_string, tex_environment, tex_template):
+    """
+    Number of submobjects tex_string compiles to on its own, compiled and
+    parsed once and then read from cache/geometry.
+    """
+    key = digest("tex-substring", GEOMETRY_VERSION, tex_string, tex_environment, tex_template.body)[:32]
+    path = cache_path("geometry", key, ".json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    size = len(SingleStringMathTex(tex_string, tex_environment=tex_environment, tex_template=tex_template).submobjects)
+    with open(path, "w") as f:
+        json.dump(size, f)
+    return size
+
+class CachedMathTexParts:
+    """
+    Mixin for MathTex and Tex. Since manim 0.20 the parts are cut out of the
+    SVG's named groups, which CachedGeometry restores. Older versions compile
+    and parse every tex_string again as a SingleStringMathTex just to count
+    its submobjects; here those counts are cached and the parts are light
+    TexPart groups over the already loaded submobjects.
+    """
+    def _break_up_by_substrings(self):
+        if MATHTEX_PARTS_FROM_SVG:
+            return super()._break_up_by_substrings()
+        separator = len("".join(self.arg_separator.split()))
+        parts, start = [], 0
+        for tex_string in self.tex_strings:
+            size = substring_size(tex_string, self.tex_environment, self.tex_template)
+            part = TexPart(tex_string)
+            if size == 0:
+                part.move_to(self.submobjects[min(start, len(self.submobjects) - 1)], RIGHT)
+            else:
+                part.add(*self.submobjects[start:start + size + separator])
+            parts.append(part)
+            start += size + separator
+        self.submobjects = parts
+        return self
+
+class CachedTex(CachedGeometry, CachedMathTexParts, Tex):
+    pass
+
+class CachedMathTex(CachedGeometry, CachedMathTexParts, MathTex):
+    pass
+
+class CachedText(CachedGeometry, Text):
+    pass
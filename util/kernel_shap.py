@@ -0,0 +1,127 @@
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+import numpy as np
+
+from util.decision_tree import predict_proba
+from util.tree_trainer import LOAN_FEATURES, fit_tree, make_loan_data
+
+def shapley_kernel(n_features, sizes):
+    """Kernel SHAP weight of a coalition with the given number of present features."""
+    sizes = np.asarray(sizes)
+    return (n_features - 1) / (np.array([comb(n_features, s) for s in sizes]) * sizes * (n_features - sizes))
+
+def coalitions(n_features, n_samples=2048, seed=0):
+    """
+    Coalition masks (True = feature present) and their regression weights.
+    Every coalition is enumerated (exact Shapley values) when there are at
+    most n_samples of them; otherwise sizes are drawn in proportion to their
+    total kernel weight and members uniformly, each sample weighted equally.
+    The empty and full coalitions are handled by the constraint instead.
+    """
+    if 2 ** n_features - 2 <= n_samples:
+        codes = np.arange(1, 2 ** n_features - 1)
+        masks = (codes[:, None] >> np.arange(n_features)) & 1 == 1
+        return masks, shapley_kernel(n_features, masks.sum(axis=1))
+
+    rng = np.random.default_rng(seed)
+    sizes = np.arange(1, n_features)
+    size_weight = (n_features - 1) / (sizes * (n_features - sizes))
+    drawn = rng.choice(sizes, n_samples, p=size_weight / size_weight.sum())
+    # A random permutation per sample, keeping its first `size` features
+    order = np.argsort(rng.random((n_samples, n_features)), axis=1)
+    masks = np.zeros((n_samples, n_features), dtype=bool)
+    np.put_along_axis(masks, order, np.arange(n_features)[None] < drawn[:, None], axis=1)
+    return masks, np.full(n_samples, 1 / n_samples)
+
+def _explain_chunk(predict, X, background, masks, weights, batch_size):
+    """Shapley values of a block of rows; all rows share the coalitions, hence one solve."""
+    n_rows, n_features = X.shape
+    n_coalitions, n_background = len(masks), len(background)
+
+    # v(S) = mean model output with the absent features taken from the background
+    values = np.empty((n_rows, n_coalitions))
+    rows_per_batch = max(1, batch_size // (n_coalitions * n_background))
+    for start in range(0, n_rows, rows_per_batch):
+        x = X[start:start + rows_per_batch]
+        mixed = np.where(masks[None, :, None, :], x[:, None, None, :], background[None, None, :, :])
+        out = predict(mixed.reshape(-1, n_features)).reshape(len(x), n_coalitions, n_background)
+        values[start:start + len(x)] = out.mean(axis=2)
+
+    base = predict(background).mean()
+    full = predict(X)
+
+    # Weighted least squares with sum(phi) = f(x) - base, eliminating the last feature
+    z = masks.astype(np.float64)
+    design = z[:, :-1] - z[:, -1:]
+    target = (values - base) - z[None, :, -1] * (full - base)[:, None]
+    gram = design.T @ (design * weights[:, None])
+    phi = np.linalg.solve(gram, design.T @ (weights[:, None] * target.T)).T
+    return np.hstack([phi, (full - base - phi.sum(axis=1))[:, None]])
+
+def kernel_shap(predict, X, background, n_coalitions=2048, n_jobs=1, chunk_size=512, batch_size=1_000_000, seed=0):
+    """
+    Kernel SHAP values of every row of X for a batched, picklable predict
+    callable (n, features) -> (n,). Coalitions are drawn once from the seed
+    and shared by all rows, so the output does not depend on n_jobs. Chunks
+    of rows are spread across n_jobs processes (-1 for all cores).
+    Returns (values of shape (n_rows, n_features), base value).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    background = np.asarray(background, dtype=np.float64)
+    masks, weights = coalitions(X.shape[1], n_coalitions, seed)
+    explain = functools.partial(
+        _explain_chunk, predict, background=background, masks=masks, weights=weights, batch_size=batch_size
+    )
+    chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if n_jobs > 1:
+        with ProcessPoolExecutor(n_jobs) as executor:
+            values = list(executor.map(explain, chunks))
+    else:
+        values = [explain(chunk) for chunk in chunks]
+    return np.concatenate(values), predict(background).mean()
+
+def save_attributions(path, values, base_value, X, feature_names):
+    """Writes Shapley values with their rows; mean |value| per feature is the usual bar chart."""
+    np.savez_compressed(
+        path, values=values, base_value=base_value, X=X,
+        feature_names=np.asarray(feature_names), mean_abs=np.abs(values).mean(axis=0),
+    )
+
+def approval_probability(tree, X):
+    """The loan model as a black box: probability of the Approve class."""
+    return predict_proba(tree, X)[:, 1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kernel SHAP values of the black-box loan model.")
+    parser.add_argument("--rows", type=int, default=10_000, help="rows to explain")
+    parser.add_argument("--background", type=int, default=100, help="background rows standing in for absent features")
+    parser.add_argument("--depth", type=int, default=8, help="depth of the black-box tree")
+    parser.add_argument("--jobs", type=int, default=1, help="-1 uses all cores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="cache/loan_shap.npz")
+    args = parser.parse_args()
+
+    X_train, y_train = make_loan_data(200_000, seed=args.seed)
+    tree = fit_tree(X_train, y_train, max_depth=args.depth)
+    rng = np.random.default_rng(args.seed)
+    background = X_train[rng.choice(len(X_train), args.background, replace=False)]
+    X, _ = make_loan_data(args.rows, seed=args.seed + 1)
+
+    start = time.perf_counter()
+    values, base_value = kernel_shap(
+        functools.partial(approval_probability, tree), X, background, n_jobs=args.jobs, seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    save_attributions(args.out, values, base_value, X, LOAN_FEATURES)
+    summary = ", ".join(f"{name} {v:.3f}" for name, v in zip(LOAN_FEATURES, np.abs(values).mean(axis=0)))
+    print(f"{len(X)} rows in {elapsed:.2f}s, base {base_value:.3f}, mean |SHAP|: {summary} -> {args.out}")
@@ -0,0 +1,67 @@
+import numpy as np
+
+from util.cache import digest
+from util.toy_transformer import softmax
+
+class KVCache:
+    """
+    Keys and values of every token decoded so far, one row per position.
+    The buffers double when full, so appending is amortized O(1) and
+    attending from a new query costs O(t) for t cached tokens.
+    """
+    def __init__(self, n_heads, d_head, capacity=64):
+        self.keys = np.empty((n_heads, capacity, d_head))
+        self.values = np.empty((n_heads, capacity, d_head))
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, k, v):
+        """Adds one position; k and v are (n_heads, d_head)."""
+        if self.length == self.keys.shape[1]:
+            grow = lambda buffer: np.concatenate([buffer, np.empty_like(buffer)], axis=1)
+            self.keys, self.values = grow(self.keys), grow(self.values)
+        self.keys[:, self.length] = k
+        self.values[:, self.length] = v
+        self.length += 1
+
+    def attend(self, q):
+        """
+        Attention of one query (n_heads, d_head) over the cached positions.
+        Returns the pattern (n_heads, t) and the mixed values (n_heads, d_head).
+        """
+        keys, values = self.keys[:, :self.length], self.values[:, :self.length]
+        pattern = softmax(np.einsum("hte,he->ht", keys, q) / np.sqrt(q.shape[-1]))
+        return pattern, np.einsum("ht,hte->he", pattern, values)
+
+class IncrementalAttention:
+    """
+    A single causal attention layer over words, decoded one token at a time
+    with a KVCache. Words get fixed pseudo-random embeddings (the same word
+    always maps to the same vector) plus a position signal, so the patterns
+    are deterministic without a trained model.
+    """
+    def __init__(self, d_model=8, n_heads=2, d_head=4, seed=42):
+        rng = np.random.default_rng(seed)
+        self.d_model, self.seed = d_model, seed
+        self.W_Q, self.W_K, self.W_V = (rng.standard_normal((3, n_heads, d_model, d_head)) / np.sqrt(d_model))
+        self.W_O = rng.standard_normal((n_heads, d_head, d_model)) / np.sqrt(n_heads * d_head)
+        self.cache = KVCache(n_heads, d_head)
+
+    def embed(self, word, position):
+        rng = np.random.default_rng(int(digest(word, self.seed)[:8], 16))
+        x = rng.uniform(-1, 1, self.d_model)
+        return x + 0.1 * np.sin(position / 10000 ** (np.arange(self.d_model) / self.d_model))
+
+    def step(self, word):
+        """
+        Decodes the next word: caches its key and value, then attends over
+        the prefix including itself. Returns its embedding, the head-averaged
+        attention pattern over all positions so far and its context-aware output.
+        """
+        x = self.embed(word, len(self.cache))
+        q, k, v = (np.einsum("d,hde->he", x, W) for W in (self.W_Q, self.W_K, self.W_V))
+        self.cache.append(k, v)
+        pattern, mixed = self.cache.attend(q)
+        return x, pattern.mean(axis=0), x + np.einsum("he,hed->d", mixed, self.W_O)
@@ -0,0 +1,153 @@
+import json
+import os
+
+import numpy as np
+
+from util.cache import cache_path, digest
+from util.toy_mlp import make_grid_data, relu, sigmoid
+
+# Hard concrete stretch and temperature (Louizos et al., 2018)
+BETA, GAMMA, ZETA = 2 / 3, -0.1, 1.1
+
+def sample_gates(log_alpha, u):
+    """
+    Reparameterized hard concrete gates for uniform noise u. Returns the gates
+    in [0, 1], the underlying concrete sample and where the clip is inactive.
+    """
+    s = sigmoid((np.log(u) - np.log1p(-u) + log_alpha) / BETA)
+    stretched = s * (ZETA - GAMMA) + GAMMA
+    return np.clip(stretched, 0, 1), s, (stretched > 0) & (stretched < 1)
+
+def gate_probability(log_alpha):
+    """Probability that a gate is non-zero, each weight's share of the expected L0 norm."""
+    return sigmoid(log_alpha - BETA * np.log(-GAMMA / ZETA))
+
+def test_gates(log_alpha):
+    """The deterministic gates used after training."""
+    return np.clip(sigmoid(log_alpha) * (ZETA - GAMMA) + GAMMA, 0, 1)
+
+class GateLog:
+    """
+    Append-only log of gate probabilities (float16) and test-time masks
+    (bit-packed), one fixed-size record per logged step. The layout lives in
+    a JSON sidecar so the records can be memory-mapped back.
+    """
+    def __init__(self, path, shapes):
+        self.path = path
+        self.shapes = [tuple(shape) for shape in shapes]
+        self.dtype = gate_record_dtype(sum(int(np.prod(shape)) for shape in self.shapes))
+        with open(path + ".json", "w") as f:
+            json.dump({"shapes": self.shapes}, f)
+        open(path, "wb").close()
+
+    def append(self, step, log_alphas):
+        record = np.zeros(1, dtype=self.dtype)
+        record["step"] = step
+        record["probs"] = np.concatenate([gate_probability(a).ravel() for a in log_alphas])
+        record["mask"] = np.packbits(np.concatenate([test_gates(a).ravel() > 0 for a in log_alphas]))
+        with open(self.path, "ab") as f:
+            record.tofile(f)
+
+def gate_record_dtype(n_gates):
+    return np.dtype([("step", "<i8"), ("probs", "<f2", (n_gates,)), ("mask", "u1", ((n_gates + 7) // 8,))])
+
+def read_gate_log(path):
+    """
+    Returns (steps, probabilities, masks), with probabilities and masks as one
+    list per weight matrix of arrays shaped (n_records, *matrix shape).
+    """
+    with open(path + ".json") as f:
+        shapes = [tuple(shape) for shape in json.load(f)["shapes"]]
+    sizes = [int(np.prod(shape)) for shape in shapes]
+    records = np.memmap(path, dtype=gate_record_dtype(sum(sizes)), mode="r")
+    masks = np.unpackbits(records["mask"], axis=1, count=sum(sizes)).astype(bool)
+    bounds = np.cumsum([0] + sizes)
+    split = lambda table: [table[:, a:b].reshape(-1, *shape) for a, b, shape in zip(bounds, bounds[1:], shapes)]
+    return np.array(records["step"]), split(records["probs"]), split(masks)
+
+def train_l0(
+    sizes=(9, 48, 48, 1), l0=2e-3, steps=2000, batch_size=256, n_samples=4, lr=1e-2,
+    init_keep=0.8, log_steps=(0, 100, 250, 500, 1000, 2000), seed=0,
+):
+    """
+    Trains an MLP on the grid data of util.toy_mlp with hard concrete L0 gates
+    on every weight matrix. Each step draws n_samples independent gate masks,
+    each applied to its own slice of the batch, so all samples run as one
+    batched matmul. Gate probabilities and masks at log_steps go to an
+    append-only GateLog.
+
+    Results are cached under cache/l0 by configuration. Returns (parameters,
+    path of the gate log); parameters hold W{i}, b{i} and log_alpha{i}.
+    """
+    config = dict(
+        sizes=list(sizes), l0=float(l0), steps=steps, batch_size=batch_size, n_samples=n_samples,
+        lr=float(lr), init_keep=float(init_keep), log_steps=list(log_steps), seed=seed,
+    )
+    key = digest(config)
+    params_path, log_path = cache_path("l0", key, ".npz"), cache_path("l0", key, ".gates")
+    if os.path.exists(params_path):
+        with np.load(params_path) as data:
+            return {name: data[name] for name in data.files}, log_path
+
+    rng = np.random.default_rng(seed)
+    n_layers = len(sizes) - 1
+    params = {}
+    for i, (a, b) in enumerate(zip(sizes, sizes[1:])):
+        params[f"W{i}"] = rng.standard_normal((a, b)) * np.sqrt(2 / a)
+        params[f"b{i}"] = np.zeros(b)
+        params[f"log_alpha{i}"] = np.full((a, b), np.log(init_keep / (1 - init_keep))) + rng.normal(0, 0.01, (a, b))
+    m = {name: np.zeros_like(p) for name, p in params.items()}
+    v = {name: np.zeros_like(p) for name, p in params.items()}
+
+    log = GateLog(log_path, [params[f"W{i}"].shape for i in range(n_layers)])
+    log_alphas = lambda: [params[f"log_alpha{i}"] for i in range(n_layers)]
+    if 0 in log_steps:
+        log.append(0, log_alphas())
+
+    for step in range(1, steps + 1):
+        grids, labels = make_grid_data(n_samples * batch_size, seed=rng.integers(2 ** 32))
+        x = grids.reshape(n_samples, batch_size, -1)
+        y = labels.reshape(n_samples, batch_size, 1)
+
+        # One gate sample per slice of the batch: weights are (samples, in, out)
+        gates = [sample_gates(params[f"log_alpha{i}"], rng.uniform(1e-6, 1 - 1e-6, (n_samples,) + params[f"W{i}"].shape)) for i in range(n_layers)]
+        weights = [params[f"W{i}"][None] * gates[i][0] for i in range(n_layers)]
+        activations = [x]
+        for i in range(n_layers):
+            pre = activations[-1] @ weights[i] + params[f"b{i}"]
+            activations.append(relu(pre) if i < n_layers - 1 else sigmoid(pre))
+
+        # Cross-entropy through the sigmoid output: gradient wrt the logits is out - y
+        grads = {}
+        delta = (activations[-1] - y) / (n_samples * batch_size)
+        for i in reversed(range(n_layers)):
+            grad_weights = activations[i].transpose(0, 2, 1) @ delta
+            z, s, inside = gates[i]
+            grads[f"W{i}"] = (grad_weights * z).sum(axis=0)
+            grads[f"b{i}"] = delta.sum(axis=(0, 1))
+            dz = grad_weights * params[f"W{i}"][None]
+            grads[f"log_alpha{i}"] = (dz * inside * (ZETA - GAMMA) * s * (1 - s) / BETA).sum(axis=0)
+            # Expected L0 penalty: l0 * sum of gate probabilities
+            p = gate_probability(params[f"log_alpha{i}"])
+            grads[f"log_alpha{i}"] += l0 * p * (1 - p)
+            if i > 0:
+                delta = (delta @ weights[i].transpose(0, 2, 1)) * (activations[i] > 0)
+
+        for name, g in grads.items():
+            m[name] = 0.9 * m[name] + 0.1 * g
+            v[name] = 0.999 * v[name] + 0.001 * g * g
+            params[name] -= lr * (m[name] / (1 - 0.9 ** step)) / (np.sqrt(v[name] / (1 - 0.999 ** step)) + 1e-8)
+        if step in log_steps:
+            log.append(step, log_alphas())
+
+    np.savez(params_path, **params)
+    return params, log_path
+
+def gated_forward(params, X):
+    """Predictions of the trained network with the deterministic test-time gates."""
+    x = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+    n_layers = sum(name.startswith("W") for name in params)
+    for i in range(n_layers):
+        x = x @ (params[f"W{i}"] * test_gates(params[f"log_alpha{i}"])) + params[f"b{i}"]
+        x = relu(x) if i < n_layers - 1 else sigmoid(x)
+    return x
@@ -0,0 +1,68 @@
+from manim import *
+
+def network_elements(model):
+    """
+    Indexes the neurons and edges of a (lines, layers) network by topology.
+    Neurons are keyed by (layer, index), edges by (layer, start index, end index).
+    """
+    lines, layers = model
+    elements = {}
+    for layer in layers:
+        for dot in layer:
+            elements[("node", dot.layer_index, dot.node_index)] = dot
+    for line in lines:
+        start, end = line.start_node, line.end_node
+        elements[("edge", start.layer_index, start.node_index, end.node_index)] = line
+    return elements
+
+class NetworkMorph(Animation):
+    """
+    Morphs one MLP drawing into another by matching neurons and edges on
+    (layer, index) instead of letting Transform align two unrelated VGroups.
+
+    Shared elements interpolate directly between their two states, elements
+    that only exist in the target fade in and elements that only exist in the
+    source fade out. The source model is removed from the scene and the target
+    model is left in its place, like ReplacementTransform.
+    """
+    def __init__(self, source, target, **kwargs):
+        kwargs.setdefault("introducer", True)
+        self.source = source
+        self.source_elements = network_elements(source)
+        self.target_elements = network_elements(target)
+        self.vanishing = VGroup(*[
+            mob.copy() for key, mob in self.source_elements.items()
+            if key not in self.target_elements
+        ])
+        super().__init__(target, **kwargs)
+
+    def begin(self):
+        # Every element gets its own (start, end) pair with matching point counts,
+        # so each frame is a plain point/style interpolation with no alignment.
+        self.pairs = []
+        for key, mob in self.target_elements.items():
+            end = mob.copy()
+            if key in self.source_elements:
+                start = self.source_elements[key].copy()
+            else:
+                start = mob.copy().set_opacity(0)
+            self.pairs.append((mob, start, end))
+        for mob in self.vanishing:
+            self.pairs.append((mob, mob.copy(), mob.copy().set_opacity(0)))
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        alpha = self.rate_func(alpha)
+        for mob, start, end in self.pairs:
+            mob.interpolate(start, end, alpha)
+
+    def _setup_scene(self, scene):
+        super()._setup_scene(scene)
+        if scene is None:
+            return
+        scene.remove(self.source)
+        scene.add(self.vanishing)
+
+    def clean_up_from_scene(self, scene):
+        super().clean_up_from_scene(scene)
+        scene.remove(self.vanishing)
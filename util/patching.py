@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from util.bracket_trainer import BRACKET_MODEL_PATH
+from util.toy_transformer import TOKEN_IDS, VOCAB, encode, load_model
+
+# Circuit found by the CLI below, drawn by the circuit slide when present
+BRACKET_CIRCUIT_PATH = "cache/bracket_circuit.json"
+
+def bracket_pairs(n_pairs, n_items=4, seed=0):
+    """
+    Clean/corrupted snippets of equal length with the same numbers at the
+    same positions. The clean list opens at depth 1 and an inner list opens
+    mid-list, `values = [5, [3, 7` (closes with ]]); the corrupted one opens
+    at depth 2 and the inner list closes there instead, `values = [[5], 3, 7`
+    (closes with ]). The opening token points the wrong way in both, so only
+    the mid-list brackets explain the answer. The inner list starts
+    halfway through in every pair, so positions line up across the batch.
+    """
+    rng = np.random.default_rng(seed)
+    split = max(1, n_items // 2)
+    clean, corrupt = [], []
+    for _ in range(n_pairs):
+        numbers = [str(n) for n in rng.integers(16, size=n_items)]
+        head, tail = ", ".join(numbers[:split]), ", ".join(numbers[split:])
+        clean.append(f"values = [{head}, [{tail}")
+        corrupt.append(f"values = [[{head}], {tail}")
+    return encode(clean), encode(corrupt), TOKEN_IDS["]]"], TOKEN_IDS["]"]
+
+def candidate_nodes(config, seq, kinds=("head", "neuron", "resid")):
+    """
+    Every patchable node as a dict with an id, its hook point and the index of
+    its slice of one example's activation.
+    """
+    nodes = []
+    for l in range(config["n_layers"]):
+        if "resid" in kinds:
+            nodes += [
+                {"id": f"{l}.resid.{t}", "kind": "resid", "layer": l, "hook": f"blocks.{l}.hook_resid_pre", "index": (t,)}
+                for t in range(seq)
+            ]
+        if "head" in kinds:
+            nodes += [
+                {"id": f"{l}.attn.h{h}", "kind": "head", "layer": l, "hook": f"blocks.{l}.attn.hook_z", "index": (slice(None), h)}
+                for h in range(config["n_heads"])
+            ]
+        if "neuron" in kinds:
+            nodes += [
+                {"id": f"{l}.mlp.{j}", "kind": "neuron", "layer": l, "hook": f"blocks.{l}.mlp.hook_post", "index": (slice(None), j)}
+                for j in range(config["d_mlp"])
+            ]
+    return nodes
+
+class Patcher:
+    """
+    Activation and path patching on the toy transformer. Clean and corrupted
+    activations are cached once; each patching run then tiles the clean batch
+    once per node of a chunk and patches every replica's own node in a single
+    forward pass, so the cost grows with the number of chunks, not of nodes.
+
+    The metric is the logit difference between the clean and corrupted
+    answers at the last position. Effects are normalized so 0 means no change
+    and 1 means the clean run behaves like the corrupted one.
+    """
+    def __init__(self, model, clean, corrupt, clean_answer, corrupt_answer, chunk_size=64):
+        self.model = model
+        self.clean_tokens = clean
+        self.answers = clean_answer, corrupt_answer
+        self.chunk_size = chunk_size
+        clean_logits, self.clean = model.run_with_cache(clean)
+        corrupt_logits, self.corrupt = model.run_with_cache(corrupt)
+        self.clean_metric = self.metric(clean_logits).mean()
+        self.corrupt_metric = self.metric(corrupt_logits).mean()
+
+    def metric(self, logits):
+        last = logits[:, -1]
+        return last[:, self.answers[0]] - last[:, self.answers[1]]
+
+    def run_patched(self, patches, record=()):
+        """
+        One forward pass with len(patches) replicas of the clean batch.
+        patches[k] is (node, source) and replaces node's slice in replica k by
+        the same slice of source, a full activation of the node's hook.
+        Returns the normalized effect per replica and the recorded
+        activations, shaped (replicas, batch, ...).
+        """
+        k, n = len(patches), len(self.clean_tokens)
+        masks, sources = {}, {}
+        for i, (node, source) in enumerate(patches):
+            hook = node["hook"]
+            if hook not in masks:
+                shape = self.clean[hook].shape
+                masks[hook] = np.zeros((k,) + shape[1:], dtype=bool)
+                sources[hook] = np.broadcast_to(self.clean[hook], (k,) + shape).copy()
+            masks[hook][(i,) + node["index"]] = True
+            sources[hook][i] = source
+
+        def patch(hook):
+            def fn(act):
+                act = act.reshape((k, n) + act.shape[1:])
+                return np.where(masks[hook][:, None], sources[hook], act).reshape((k * n,) + act.shape[2:])
+            return fn
+
+        logits, cache = self.model.run_with_cache(
+            np.tile(self.clean_tokens, (k, 1)), names=list(record), hooks={hook: patch(hook) for hook in masks}
+        )
+        metric = self.metric(logits).reshape(k, n).mean(axis=1)
+        effect = (metric - self.clean_metric) / (self.corrupt_metric - self.clean_metric)
+        return effect, {name: act.reshape((k, n) + act.shape[1:]) for name, act in cache.items()}
+
+    def node_effects(self, nodes, record=()):
+        """Effect of patching each node with its corrupted activation, a chunk of nodes per forward pass."""
+        effects, recorded = [], {name: [] for name in record}
+        for start in range(0, len(nodes), self.chunk_size):
+            chunk = nodes[start:start + self.chunk_size]
+            effect, cache = self.run_patched([(node, self.corrupt[node["hook"]]) for node in chunk], record)
+            effects.append(effect)
+            for name in record:
+                recorded[name].append(cache[name])
+        return np.concatenate(effects), {name: np.concatenate(acts) for name, acts in recorded.items()}
+
+    def path_effects(self, senders, receivers):
+        """
+        Path patching: the effect of sender -> receiver is measured by patching
+        only the receiver, with the value it takes when the sender alone is
+        corrupted. Returns an array of shape (senders, receivers); pairs where
+        the receiver does not come after the sender are NaN.
+        """
+        hooks = sorted({node["hook"] for node in receivers})
+        _, recorded = self.node_effects(senders, record=hooks)
+
+        pairs = [
+            (i, j) for i, s in enumerate(senders) for j, r in enumerate(receivers)
+            if (r["layer"], r["kind"] == "neuron") > (s["layer"], s["kind"] == "neuron")
+        ]
+        scores = np.full((len(senders), len(receivers)), np.nan)
+        for start in range(0, len(pairs), self.chunk_size):
+            chunk = pairs[start:start + self.chunk_size]
+            effect, _ = self.run_patched([(receivers[j], recorded[receivers[j]["hook"]][i]) for i, j in chunk])
+            for (i, j), e in zip(chunk, effect):
+                scores[i, j] = e
+        return scores
+
+def circuit_description(model, patcher, top_nodes=6, min_edge=0.1):
+    """
+    Ranks heads and MLP neurons by their patching effect, path-patches the
+    top ones against each other and returns a circuit description for the
+    layout engine: the residual stream with one branch/add pair per
+    sublayer involved, each component boxed on its sublayer, and the path
+    edges scoring at least min_edge times the strongest as ranked edges.
+    """
+    seq = patcher.clean_tokens.shape[1]
+    nodes = candidate_nodes(model.config, seq)
+    effects, _ = patcher.node_effects(nodes)
+    ranking = sorted(zip(nodes, effects), key=lambda pair: -abs(pair[1]))
+
+    components = [node for node, _ in ranking if node["kind"] != "resid"][:top_nodes]
+    components.sort(key=lambda node: (node["layer"], node["kind"] == "neuron"))
+    scores = patcher.path_effects(components, components)
+
+    tokens = [VOCAB[t] for t in patcher.clean_tokens[0, 3:]]
+    description = {
+        "nodes": [{"id": "input", "kind": "tokens", "label": "values = ", "tokens": tokens}],
+        "edges": [],
+    }
+    previous = "input"
+    sublayers = sorted({(node["layer"], node["kind"]) for node in components}, key=lambda s: (s[0], s[1] == "neuron"))
+    for layer, kind in sublayers:
+        name = f"l{layer}.{'attn' if kind == 'head' else 'mlp'}"
+        description["nodes"] += [{"id": name + ".branch", "kind": "branch"}, {"id": name + ".add", "kind": "add", "symbol": "+"}]
+        description["edges"] += [
+            {"source": previous, "target": name + ".branch", "kind": "residual"},
+            {"source": name + ".branch", "target": name + ".add", "kind": "residual"},
+        ]
+        for node in components:
+            if (node["layer"], node["kind"]) == (layer, kind):
+                description["nodes"].append({
+                    "id": node["id"], "kind": "box", "label": node["id"],
+                    "side": "left" if kind == "head" else "right",
+                })
+                description["edges"] += [
+                    {"source": name + ".branch", "target": node["id"], "kind": "wire"},
+                    {"source": node["id"], "target": name + ".add", "kind": "wire"},
+                ]
+        previous = name + ".add"
+    description["nodes"].append({"id": "output", "kind": "tokens", "tokens": [VOCAB[patcher.answers[0]]]})
+    description["edges"].append({"source": previous, "target": "output", "kind": "residual"})
+
+    strongest = np.nanmax(np.abs(scores)) if np.isfinite(scores).any() else 0
+    ranked = sorted(
+        [
+            {"source": s["id"], "target": r["id"], "kind": "value", "score": float(scores[i, j])}
+            for i, s in enumerate(components) for j, r in enumerate(components)
+            if np.isfinite(scores[i, j]) and abs(scores[i, j]) >= min_edge * strongest
+        ],
+        key=lambda edge: -abs(edge["score"]),
+    )
+    description["edges"] += ranked
+    description["ranking"] = [{"id": node["id"], "effect": float(effect)} for node, effect in ranking]
+    return description
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the bracket circuit of the toy transformer by activation and path patching.")
+    parser.add_argument("--model", default=BRACKET_MODEL_PATH)
+    parser.add_argument("--pairs", type=int, default=32)
+    parser.add_argument("--top", type=int, default=6, help="components kept in the circuit")
+    parser.add_argument("--chunk", type=int, default=64, help="nodes patched per forward pass")
+    parser.add_argument("--out", default=BRACKET_CIRCUIT_PATH)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    start = time.perf_counter()
+    patcher = Patcher(model, *bracket_pairs(args.pairs), chunk_size=args.chunk)
+    description = circuit_description(model, patcher, top_nodes=args.top)
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(description, f, indent=1)
+    print(f"{len(description['ranking'])} nodes patched in {elapsed:.2f}s -> {args.out}")
+    for node in description["ranking"][:10]:
+        print(f"  {node['id']:<14} {node['effect']:+.3f}")
@@ -0,0 +1,72 @@
+from manim import *
+
+def load_points(path):
+    """
+    Loads scatter data as a dict of column arrays, either from a CSV with a
+    header row or from an NPZ with one array per column.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    # comments=None because colors are written as #RRGGBB
+    table = np.genfromtxt(path, delimiter=",", names=True, dtype=None, encoding="utf-8", comments=None)
+    return {name: np.atleast_1d(table[name]) for name in table.dtype.names}
+
+class DotCloud(VGroup):
+    """
+    Draws many dots with per-point colors and radii as one VMobject per
+    distinct color, each holding every dot of that color as a subpath.
+    Geometry is built with a single vectorized operation per color.
+    """
+    def __init__(self, centers, colors, radii, fill_opacity=0.9, **kwargs):
+        super().__init__(**kwargs)
+        centers = np.asarray(centers, dtype=float)
+        radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+        colors = np.array([ManimColor(color).to_hex() for color in colors])
+
+        # One closed cubic Bezier circle, reused for every dot
+        template = Circle(radius=1).points
+        self.points_per_dot = len(template)
+        for color in np.unique(colors):
+            index = np.flatnonzero(colors == color)
+            geometry = template[None] * radii[index, None, None] + centers[index, None, :]
+            dots = VMobject(fill_color=color, fill_opacity=fill_opacity, stroke_width=0)
+            dots.set_points(geometry.reshape(-1, 3))
+            self.add(dots)
+
+class GrowDots(Animation):
+    """Grows every dot of a DotCloud from its own center, like GrowFromCenter per dot."""
+    def __init__(self, cloud, **kwargs):
+        kwargs.setdefault("introducer", True)
+        super().__init__(cloud, **kwargs)
+
+    def begin(self):
+        n = self.mobject.points_per_dot
+        self.shapes = []
+        for dots in self.mobject:
+            final = dots.points.reshape(-1, n, 3).copy()
+            self.shapes.append((dots, final.mean(axis=1, keepdims=True), final))
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        alpha = self.rate_func(alpha)
+        for dots, centers, final in self.shapes:
+            dots.points = (centers + (final - centers) * alpha).reshape(-1, 3)
+
+class ProjectionCloud(PMobject):
+    """
+    Projected embeddings as a single point-cloud mobject, one point per row,
+    so 100k points stay one mobject. Points are colored by label from the
+    palette and scaled to fit a cube of the given side; 2D projections lie
+    in the z = 0 plane.
+    """
+    def __init__(self, projections, labels=None, palette=(BLUE, GREEN, YELLOW, RED, PURPLE, TEAL, ORANGE, PINK, MAROON, GOLD), side=5, stroke_width=2, **kwargs):
+        super().__init__(stroke_width=stroke_width, **kwargs)
+        projections = np.asarray(projections, dtype=float)
+        points = np.zeros((len(projections), 3))
+        points[:, :projections.shape[1]] = projections
+        points -= points.mean(axis=0)
+        points *= side / max(2 * np.abs(points).max(), 1e-9)
+        labels = np.zeros(len(points), dtype=int) if labels is None else np.asarray(labels)
+        rgbas = np.array([ManimColor(color).to_rgba() for color in palette])
+        self.add_points(points, rgbas=rgbas[labels % len(rgbas)])
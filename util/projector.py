@@ -0,0 +1,124 @@
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from util.cache import cache_path
+
+# Embedding matrix of the projector slide; synthetic clusters are generated here if it is missing
+PROJECTOR_MATRIX_PATH = "cache/projector/embeddings.npy"
+
+def load_matrix(path):
+    """Opens an (n, d) embedding matrix, memory-mapped for .npy so it never has to fit in RAM."""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    with np.load(path) as data:
+        return data["embed"] if "embed" in data.files else data[data.files[0]]
+
+def make_cluster_embeddings(path, n_points=100_000, dim=64, n_clusters=12, seed=0, chunk_size=16384):
+    """
+    Writes synthetic embeddings to a .npy file chunk by chunk: Gaussian
+    clusters around random centers, plus the cluster of each row in a
+    sibling .labels.npy. Returns the memory-mapped matrix.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)) * 3
+    labels = rng.integers(n_clusters, size=n_points)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_points, dim))
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        matrix[start:stop] = centers[labels[start:stop]] + rng.standard_normal((stop - start, dim))
+    matrix.flush()
+    np.save(labels_path(path), labels)
+    return np.load(path, mmap_mode="r")
+
+def labels_path(path):
+    return os.path.splitext(path)[0] + ".labels.npy"
+
+def load_labels(path):
+    """Per-row labels stored next to a matrix (e.g. clusters or token types), or None."""
+    return np.load(labels_path(path)) if os.path.exists(labels_path(path)) else None
+
+def matrix_digest(X, chunk_size=16384):
+    """sha256 of a matrix read chunk by chunk, so memory-mapped files are never loaded whole."""
+    h = hashlib.sha256(f"{X.dtype}{X.shape}".encode())
+    for start in range(0, len(X), chunk_size):
+        h.update(np.ascontiguousarray(X[start:start + chunk_size]).tobytes())
+    return h.hexdigest()
+
+def _chunks(X, mean, chunk_size):
+    for start in range(0, len(X), chunk_size):
+        yield start, np.asarray(X[start:start + chunk_size], dtype=np.float64) - mean
+
+def randomized_pca(X, n_components=3, oversample=10, n_iter=2, chunk_size=16384, seed=0):
+    """
+    Principal components of X by randomized SVD (Halko et al., 2011), touching
+    X only in row chunks: one pass for the mean, two per power iteration and
+    two for the final factorization. Returns (projections (n, n_components),
+    components (n_components, d), mean, explained variance).
+    """
+    n, d = X.shape
+    k = min(n_components + oversample, d)
+    rng = np.random.default_rng(seed)
+
+    mean = np.zeros(d)
+    for start in range(0, n, chunk_size):
+        mean += np.asarray(X[start:start + chunk_size], dtype=np.float64).sum(axis=0)
+    mean /= n
+
+    # Range finder: Q spans the top singular directions of the centered X
+    omega = rng.standard_normal((d, k))
+    Y = np.empty((n, k))
+    for start, chunk in _chunks(X, mean, chunk_size):
+        Y[start:start + len(chunk)] = chunk @ omega
+    Q = np.linalg.qr(Y)[0]
+    for _ in range(n_iter):
+        Z = np.zeros((d, k))
+        for start, chunk in _chunks(X, mean, chunk_size):
+            Z += chunk.T @ Q[start:start + len(chunk)]
+        Z = np.linalg.qr(Z)[0]
+        for start, chunk in _chunks(X, mean, chunk_size):
+            Y[start:start + len(chunk)] = chunk @ Z
+        Q = np.linalg.qr(Y)[0]
+
+    B = np.zeros((k, d))
+    for start, chunk in _chunks(X, mean, chunk_size):
+        B += Q[start:start + len(chunk)].T @ chunk
+    _, s, Vt = np.linalg.svd(B, full_matrices=False)
+    components = Vt[:n_components]
+
+    projections = np.empty((n, n_components), dtype=np.float32)
+    for start, chunk in _chunks(X, mean, chunk_size):
+        projections[start:start + len(chunk)] = chunk @ components.T
+    return projections, components, mean, s[:n_components] ** 2 / (n - 1)
+
+def project(X, n_components=3, seed=0, **kwargs):
+    """
+    Cached randomized PCA projection of X, keyed by the hash of the matrix.
+    Returns (projections, explained variance).
+    """
+    key = f"{matrix_digest(X)[:32]}-{n_components}-{seed}"
+    path = cache_path("projector", key, ".npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return data["projections"], data["variance"]
+    projections, _, _, variance = randomized_pca(X, n_components, seed=seed, **kwargs)
+    np.savez(path, projections=projections, variance=variance)
+    return projections, variance
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Project an embedding matrix to 2D/3D with chunked randomized PCA.")
+    parser.add_argument("--matrix", default=PROJECTOR_MATRIX_PATH, help=".npy (memory-mapped) or .npz with an `embed` array")
+    parser.add_argument("--components", type=int, default=3)
+    parser.add_argument("--synthetic", type=int, default=100_000, help="rows of synthetic clusters written if the matrix is missing")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.matrix):
+        make_cluster_embeddings(args.matrix, n_points=args.synthetic)
+    X = load_matrix(args.matrix)
+    start = time.perf_counter()
+    projections, variance = project(X, args.components)
+    print(f"{X.shape[0]} x {X.shape[1]} -> {projections.shape[1]}D in {time.perf_counter() - start:.2f}s, explained variance {np.round(variance, 2)}")
@@ -0,0 +1,38 @@
+import argparse
+import importlib
+import time
+
+from manim import config, tempconfig
+
+def time_scene(module, name, quality):
+    """
+    Renders one scene class without writing a movie and returns (seconds,
+    frames), the frame count being the scene's duration at the frame rate.
+    """
+    scene_class = getattr(importlib.import_module(module), name)
+    with tempconfig({"quality": quality, "disable_caching": True, "write_to_movie": False}):
+        scene = scene_class()
+        start = time.perf_counter()
+        scene.render()
+        elapsed = time.perf_counter() - start
+        frames = round(scene.renderer.time * config.frame_rate)
+    return elapsed, frames
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the deck as rendered (3D camera only for the projector) against the whole deck on the 3D camera.")
+    parser.add_argument("--module", default="Presentation")
+    parser.add_argument("--scenes", nargs="+", default=["Presentation", "EmbeddingProjector", "PresentationEnd"])
+    parser.add_argument("--baseline", default="ThreeDPresentation")
+    parser.add_argument("--quality", default="low_quality")
+    args = parser.parse_args()
+
+    totals = {}
+    for group, names in (("split deck", args.scenes), (args.baseline, [args.baseline])):
+        elapsed = frames = 0
+        for name in names:
+            seconds, count = time_scene(args.module, name, args.quality)
+            print(f"{name:<20} {count:6d} frames in {seconds:7.1f}s  {1000 * seconds / max(count, 1):6.2f} ms/frame")
+            elapsed, frames = elapsed + seconds, frames + count
+        totals[group] = elapsed
+        print(f"{group:<20} {frames:6d} frames in {elapsed:7.1f}s")
+    print(f"The split deck renders {totals[args.baseline] / totals['split deck']:.2f}x faster than {args.baseline}")
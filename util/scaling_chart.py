@@ -0,0 +1,46 @@
+from manim import *
+
+class ScalingChart(VGroup):
+    """
+    Log-log chart of measured scaling curves: one line with dots per series
+    (name -> (xs, ys)), ticks at the measured x values and at the powers of
+    ten spanned by y, and a legend. Slopes read directly as exponents, so
+    O(n^2) and O(n) curves separate visibly.
+    """
+    def __init__(self, series, colors, x_label, y_label, x_length=5, y_length=3.5, font_size=20, **kwargs):
+        super().__init__(**kwargs)
+        xs = np.unique(np.concatenate([np.asarray(x, dtype=float) for x, _ in series.values()]))
+        ys = np.concatenate([np.asarray(y, dtype=float) for _, y in series.values()])
+        x_min, x_max = np.log2(xs.min()), np.log2(xs.max())
+        y_min, y_max = np.floor(np.log10(ys.min())), np.ceil(np.log10(ys.max()))
+
+        self.axes = Axes(
+            x_range=[x_min - 0.3, x_max + 0.3, 1],
+            y_range=[y_min, y_max + 0.1, 1],
+            x_length=x_length,
+            y_length=y_length,
+            axis_config={"color": WHITE, "include_ticks": False},
+            tips=False,
+        )
+        ticks = VGroup(
+            *[Text(f"{int(x)}", font_size=font_size - 4).next_to(self.axes.c2p(np.log2(x), y_min), DOWN, buff=0.15) for x in xs],
+            *[MathTex(f"10^{{{int(e)}}}", font_size=font_size).next_to(self.axes.c2p(x_min - 0.3, e), LEFT, buff=0.15) for e in np.arange(y_min, y_max + 1)],
+        )
+        labels = VGroup(
+            Text(x_label, font_size=font_size).next_to(self.axes.x_axis, DOWN, buff=0.5),
+            Text(y_label, font_size=font_size).rotate(90 * DEGREES).next_to(self.axes.y_axis, LEFT, buff=0.6),
+        )
+
+        self.curves = VGroup()
+        legend = VGroup()
+        for name, (x, y) in series.items():
+            points = [self.axes.c2p(np.log2(a), np.log10(b)) for a, b in zip(x, y)]
+            color = colors[name]
+            self.curves.add(VGroup(
+                VMobject(color=color, stroke_width=3).set_points_as_corners(points),
+                *[Dot(point, radius=0.05, color=color) for point in points],
+            ))
+            legend.add(VGroup(Line(ORIGIN, 0.4 * RIGHT, color=color, stroke_width=3), Text(name, font_size=font_size - 4)).arrange(RIGHT, buff=0.15))
+        legend.arrange(DOWN, aligned_edge=LEFT, buff=0.1).next_to(self.axes.c2p(x_min - 0.3, y_max + 0.1), DR, buff=0.2)
+
+        self.add(self.axes, ticks, labels, legend, self.curves)
@@ -1,18 +1,21 @@
 from manim import *
 
+from util.camera import pin_to_frame
+from util.fonts import GlyphText
+
 class SlideNumber:
-    def __init__(self, scene, slide_count=1):
-        self.slide_num = 1
+    def __init__(self, scene, slide_count=1, start=1):
+        self.slide_num = start
         self.scene = scene
         self.slide_count = slide_count
-        self.slide_text = Text(f"{self.slide_num}/{slide_count}", font_size=24, t2c={f"/{slide_count}": GRAY}).to_corner(DR)
-        scene.add_fixed_in_frame_mobjects(self.slide_text)
+        self.slide_text = GlyphText(f"{self.slide_num}/{slide_count}", font_size=24, t2c={f"/{slide_count}": GRAY}).to_corner(DR)
+        pin_to_frame(scene, self.slide_text)
         scene.play(Write(self.slide_text))
 
     def incr(self):
         self.slide_num += 1
-        self.new_text = Text(f"{self.slide_num}/{self.slide_count}", font_size=24, t2c={f"/{self.slide_count}": GRAY}).to_corner(DR)
-        self.scene.add_fixed_in_frame_mobjects(self.new_text)
+        self.new_text = GlyphText(f"{self.slide_num}/{self.slide_count}", font_size=24, t2c={f"/{self.slide_count}": GRAY}).to_corner(DR)
+        pin_to_frame(self.scene, self.new_text)
         self.scene.remove(self.slide_text)
         self.scene.add(self.new_text)
         # self.scene.play(ReplacementTransform(self.slide_text, self.new_text))
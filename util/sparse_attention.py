@@ -0,0 +1,138 @@
+import argparse
+import csv
+import os
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from util.cache import cache_path, digest
+from util.toy_transformer import softmax
+
+# Every kernel maps q, k, v of shape (..., seq, d) to an output of the same
+# shape; causal attention throughout, as in a decoder.
+
+def dense_attention(q, k, v):
+    """softmax(QK^T / sqrt(d) + causal mask) V, materializing the full seq x seq scores."""
+    seq = q.shape[-2]
+    scores = q @ np.swapaxes(k, -1, -2) / np.sqrt(q.shape[-1])
+    scores = np.where(np.tril(np.ones((seq, seq), dtype=bool)), scores, -np.inf)
+    return softmax(scores) @ v
+
+def sliding_window_attention(q, k, v, window=128):
+    """
+    Each query attends to itself and the window - 1 keys before it, so time
+    and memory grow as seq x window. Keys and values are read through a
+    strided view of the padded sequence instead of being copied per query.
+    """
+    seq, d = q.shape[-2:]
+    pad = [(0, 0)] * (q.ndim - 2) + [(window - 1, 0), (0, 0)]
+    view = lambda x: np.swapaxes(np.lib.stride_tricks.sliding_window_view(np.pad(x, pad), window, axis=-2), -1, -2)
+    keys, values = view(k), view(v)
+    scores = np.einsum("...td,...twd->...tw", q, keys) / np.sqrt(d)
+    # Window slots before the start of the sequence are padding
+    valid = np.arange(window)[None, :] >= (window - 1 - np.arange(seq))[:, None]
+    return np.einsum("...tw,...twd->...td", softmax(np.where(valid, scores, -np.inf)), values)
+
+def block_sparse_attention(q, k, v, block=64, n_local=1, n_global=1):
+    """
+    Queries are grouped in blocks that attend to their own block (causally),
+    the n_local blocks before it and the first n_global blocks, so every
+    query sees O(block) keys: time and memory grow as seq x block. The
+    sequence is padded to a whole number of blocks.
+    """
+    seq, d = q.shape[-2:]
+    n_blocks = -(-seq // block)
+    # Short sequences have fewer blocks than requested global ones
+    n_global = min(n_global, n_blocks)
+    pad = [(0, 0)] * (q.ndim - 2) + [(0, n_blocks * block - seq), (0, 0)]
+    split = lambda x: np.pad(x, pad).reshape(x.shape[:-2] + (n_blocks, block, d))
+    qb, kb, vb = split(q), split(k), split(v)
+
+    # Key blocks of every query block; duplicates and future blocks are masked below
+    own = np.arange(n_blocks)[:, None]
+    layout = np.concatenate([
+        np.broadcast_to(np.arange(n_global), (n_blocks, n_global)),
+        own - np.arange(n_local, -1, -1),
+    ], axis=1)
+    usable = (layout >= 0) & (layout <= own)
+    for j in range(n_global):
+        usable[:, n_global:] &= layout[:, n_global:] != j
+    layout = np.maximum(layout, 0)
+
+    keys = kb[..., layout, :, :].reshape(kb.shape[:-3] + (n_blocks, -1, d))
+    values = vb[..., layout, :, :].reshape(vb.shape[:-3] + (n_blocks, -1, d))
+    scores = qb @ np.swapaxes(keys, -1, -2) / np.sqrt(d)
+    query_pos = own * block + np.arange(block)
+    key_pos = (layout[:, :, None] * block + np.arange(block)).reshape(n_blocks, -1)
+    mask = np.repeat(usable, block, axis=1)[:, None, :] & (key_pos[:, None, :] <= query_pos[:, :, None])
+    out = softmax(np.where(mask, scores, -np.inf)) @ values
+    return out.reshape(out.shape[:-3] + (n_blocks * block, d))[..., :seq, :]
+
+ATTENTION_KERNELS = {
+    "Dense": dense_attention,
+    "Sliding window": sliding_window_attention,
+    "Block sparse": block_sparse_attention,
+}
+
+def benchmark_attention(seq_lens=(256, 512, 1024, 2048, 4096), d=64, window=128, block=64, repeats=3, seed=0):
+    """
+    Times every kernel (best of repeats) and records its peak allocation with
+    tracemalloc at each sequence length. Returns one dict per (kernel, length).
+    """
+    rng = np.random.default_rng(seed)
+    options = {"Dense": {}, "Sliding window": {"window": window}, "Block sparse": {"block": block}}
+    results = []
+    for seq in seq_lens:
+        q, k, v = rng.standard_normal((3, seq, d)).astype(np.float32)
+        for name, kernel in ATTENTION_KERNELS.items():
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                kernel(q, k, v, **options[name])
+                times.append(time.perf_counter() - start)
+            tracemalloc.start()
+            kernel(q, k, v, **options[name])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append({"kernel": name, "seq_len": seq, "time_ms": 1000 * min(times), "memory_mb": peak / 2 ** 20})
+    return results
+
+def write_benchmark(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["kernel", "seq_len", "time_ms", "memory_mb"])
+        writer.writeheader()
+        writer.writerows(results)
+
+def read_benchmark(path):
+    with open(path, newline="") as f:
+        return [
+            {"kernel": row["kernel"], "seq_len": int(row["seq_len"]), "time_ms": float(row["time_ms"]), "memory_mb": float(row["memory_mb"])}
+            for row in csv.DictReader(f)
+        ]
+
+def cached_benchmark(**kwargs):
+    """
+    benchmark_attention, measured once per machine and setting and then read
+    from cache/attention, so the chart shows numbers taken where the deck is rendered.
+    """
+    path = cache_path("attention", digest(platform.node(), platform.processor(), kwargs)[:16], ".csv")
+    if not os.path.exists(path):
+        write_benchmark(benchmark_attention(**kwargs), path)
+    return read_benchmark(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dense, sliding-window and block-sparse attention.")
+    parser.add_argument("--seq", type=int, nargs="+", default=[256, 512, 1024, 2048, 4096])
+    parser.add_argument("--window", type=int, default=128)
+    parser.add_argument("--block", type=int, default=64)
+    parser.add_argument("--out", default="cache/attention_benchmark.csv")
+    args = parser.parse_args()
+
+    results = benchmark_attention(args.seq, window=args.window, block=args.block)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    write_benchmark(results, args.out)
+    for r in results:
+        print(f"{r['kernel']:<15} {r['seq_len']:>6}  {r['time_ms']:9.2f} ms  {r['memory_mb']:9.1f} MB")
+    print(f"-> {args.out}")
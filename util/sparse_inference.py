@@ -0,0 +1,183 @@
+import argparse
+import csv
+import os
+import platform
+import time
+
+import numpy as np
+
+# scipy's compiled CSR kernel is used when installed; the NumPy one is a
+# readable reference that is exact but much slower per stored weight
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+CSR_KERNEL = "scipy.sparse" if scipy is not None else "NumPy reference"
+
+from util.cache import cache_path, digest
+from util.l0_sparsity import test_gates, train_l0
+from util.toy_mlp import relu, sigmoid
+
+class CSRMatrix:
+    """
+    A weight matrix W (in, out) stored as compressed sparse rows of W^T, so
+    each output unit's incoming weights are contiguous. x @ W gathers the
+    inputs of every stored weight at once and sums each output's run with
+    np.add.reduceat: work and memory grow with the non-zeros, not in x out.
+    With scipy installed the product runs in its compiled CSR kernel instead.
+    """
+    def __init__(self, data, indices, indptr, shape):
+        self.data, self.indices, self.indptr, self.shape = data, indices, indptr, shape
+        self.compiled = None
+        if scipy is not None:
+            self.compiled = scipy.sparse.csr_matrix((data, indices, indptr), shape=(shape[1], shape[0]))
+
+    @classmethod
+    def from_dense(cls, W):
+        rows, cols = np.nonzero(W.T)
+        indptr = np.zeros(W.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=W.shape[1]), out=indptr[1:])
+        return cls(W.T[rows, cols].astype(W.dtype), cols.astype(np.int32), indptr, W.shape)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.indices.nbytes + self.indptr.nbytes
+
+    def rmatmul(self, x, max_elements=1 << 24):
+        """x @ W for x of shape (batch, in), in row chunks of at most max_elements products."""
+        if self.compiled is not None:
+            return np.asarray((self.compiled @ x.T).T)
+        out = np.zeros((len(x), self.shape[1]), dtype=np.result_type(x, self.data))
+        if self.nnz == 0:
+            return out
+        # reduceat needs valid starts; empty outputs are zeroed afterwards
+        starts = np.minimum(self.indptr[:-1], self.nnz - 1)
+        filled = self.indptr[1:] > self.indptr[:-1]
+        # Gathering rows of x^T keeps every product row contiguous
+        step = max(1, max_elements // self.nnz)
+        for start in range(0, len(x), step):
+            xt = np.ascontiguousarray(x[start:start + step].T)
+            products = xt[self.indices] * self.data[:, None]
+            out[start:start + step, filled] = np.add.reduceat(products, starts, axis=0)[filled].T
+        return out
+
+def pruned_weights(params, sparsity=None):
+    """
+    The L0 model's weights with its test-time gates applied; with sparsity
+    given, its ungated weights are instead magnitude-pruned to that fraction
+    of zeros, like the pruning slide.
+    """
+    n_layers = sum(name.startswith("W") for name in params)
+    if sparsity is None:
+        return [params[f"W{i}"] * test_gates(params[f"log_alpha{i}"]) for i in range(n_layers)]
+    pruned = []
+    for W in (params[f"W{i}"] for i in range(n_layers)):
+        k = int(round(sparsity * W.size))
+        W = W.copy()
+        W.flat[np.argsort(np.abs(W), axis=None)[:k]] = 0
+        pruned.append(W)
+    return pruned
+
+def forward(layers, biases, x):
+    """Forward pass through dense arrays or CSRMatrix layers alike."""
+    for i, (W, b) in enumerate(zip(layers, biases)):
+        x = (W.rmatmul(x) if isinstance(W, CSRMatrix) else x @ W) + b
+        x = relu(x) if i < len(layers) - 1 else sigmoid(x)
+    return x
+
+def _best_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def benchmark_inference(params, sparsities=(0.5, 0.9, 0.99, None), batch_sizes=(1, 64, 1024), scale=16, repeats=3, seed=0):
+    """
+    Dense vs. CSR inference of the pruned network at every sparsity level
+    (None = the L0 gates' own sparsity) and batch size. The toy
+    layers are tiled scale x scale first (divided by scale after the first,
+    so the network computes the same function), which keeps their density
+    and pruning pattern but makes them large enough to time. Returns one
+    dict per (sparsity, batch) with throughput in rows/s and weight memory in KB.
+    """
+    rng = np.random.default_rng(seed)
+    n_layers = sum(name.startswith("W") for name in params)
+    results = []
+    for sparsity in sparsities:
+        weights = pruned_weights(params, sparsity)
+        # Input and output sizes of the task stay; hidden layers are tiled
+        dense = [
+            (np.tile(W, (1 if i == 0 else scale, 1 if i == n_layers - 1 else scale)) / (1 if i == 0 else scale)).astype(np.float32)
+            for i, W in enumerate(weights)
+        ]
+        biases = [np.tile(params[f"b{i}"], 1 if i == n_layers - 1 else scale).astype(np.float32) for i in range(n_layers)]
+        sparse = [CSRMatrix.from_dense(W) for W in dense]
+        density = sum(W.nnz for W in sparse) / sum(W.size for W in dense)
+        for batch in batch_sizes:
+            x = rng.random((batch, dense[0].shape[0]), dtype=np.float32)
+            dense_time = _best_time(lambda: forward(dense, biases, x), repeats)
+            csr_time = _best_time(lambda: forward(sparse, biases, x), repeats)
+            results.append({
+                "sparsity": "L0" if sparsity is None else f"{sparsity:g}",
+                "density": density,
+                "batch": batch,
+                "dense_rows_per_s": batch / dense_time,
+                "csr_rows_per_s": batch / csr_time,
+                "speedup": dense_time / csr_time,
+                "dense_kb": sum(W.nbytes for W in dense) / 1024,
+                "csr_kb": sum(W.nbytes for W in sparse) / 1024,
+            })
+    return results
+
+FIELDS = ["sparsity", "density", "batch", "dense_rows_per_s", "csr_rows_per_s", "speedup", "dense_kb", "csr_kb"]
+
+def write_results(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def read_results(path):
+    with open(path, newline="") as f:
+        return [
+            {name: (row[name] if name == "sparsity" else int(row[name]) if name == "batch" else float(row[name])) for name in FIELDS}
+            for row in csv.DictReader(f)
+        ]
+
+def cached_inference_benchmark(**kwargs):
+    """
+    benchmark_inference on the default L0 model, measured once per machine,
+    CSR kernel and setting and then read from cache/sparse_inference.
+    """
+    path = cache_path("sparse_inference", digest(platform.node(), platform.processor(), CSR_KERNEL, kwargs)[:16], ".csv")
+    if not os.path.exists(path):
+        params, _ = train_l0()
+        write_results(benchmark_inference(params, **kwargs), path)
+    return read_results(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dense vs. CSR inference of the L0-pruned MLP across sparsity levels and batch sizes.")
+    parser.add_argument("--sparsity", type=float, nargs="*", default=[0.5, 0.9, 0.99], help="magnitude-pruning levels, followed by the L0 gates' own")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--scale", type=int, default=16, help="hidden layers are tiled scale x scale")
+    parser.add_argument("--out", default="cache/sparse_inference.csv")
+    args = parser.parse_args()
+
+    params, _ = train_l0()
+    results = benchmark_inference(params, args.sparsity + [None], args.batch, args.scale)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    write_results(results, args.out)
+    for r in results:
+        print(
+            f"sparsity {r['sparsity']:<5} density {r['density']:.3f} batch {r['batch']:>5}  "
+            f"dense {r['dense_rows_per_s']:12.0f} rows/s  csr {r['csr_rows_per_s']:12.0f} rows/s  "
+            f"x{r['speedup']:.2f}  {r['dense_kb']:.0f} KB -> {r['csr_kb']:.0f} KB"
+        )
+    print(f"CSR kernel: {CSR_KERNEL} -> {args.out}")
@@ -0,0 +1,116 @@
+import json
+import os
+
+import numpy as np
+
+from util.cache import cache_path, digest
+
+def feature_batch(rng, batch_size, n_features, sparsity):
+    """Synthetic inputs: each feature is active with probability 1 - sparsity, uniformly in [0, 1]."""
+    active = rng.random((batch_size, n_features)) >= sparsity
+    return rng.random((batch_size, n_features)) * active
+
+def init_params(n_features, n_hidden, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "W1": rng.standard_normal((n_hidden, n_features)) / np.sqrt(n_features),
+        "b1": np.zeros(n_hidden),
+        "W2": rng.standard_normal((n_features, n_hidden)) / np.sqrt(n_hidden),
+        "b2": np.zeros(n_features),
+    }
+
+def forward(params, x):
+    """x -> ReLU(W1 x + b1) -> ReLU(W2 h + b2), returning (hidden, reconstruction)."""
+    h = np.maximum(x @ params["W1"].T + params["b1"], 0)
+    return h, np.maximum(h @ params["W2"].T + params["b2"], 0)
+
+def gradients(params, x, importance, l1):
+    """Importance-weighted squared reconstruction error plus an L1 penalty on the hidden layer."""
+    h, y = forward(params, x)
+    dy = 2 * importance * (y - x) * (y > 0) / len(x)
+    dh = (dy @ params["W2"] + l1 / len(x)) * (h > 0)
+    loss = (importance * (y - x) ** 2).sum() / len(x) + l1 * h.sum() / len(x)
+    return loss, {"W1": dh.T @ x, "b1": dh.sum(axis=0), "W2": dy.T @ h, "b2": dy.sum(axis=0)}
+
+def train_superposition(
+    n_features=6, n_hidden=3, sparsity=0.9, importance_decay=0.9, l1=0.0,
+    steps=5000, batch_size=1024, lr=3e-3, seed=0, checkpoint_every=1000,
+):
+    """
+    Trains the toy model of superposition with a ReLU hidden layer: sparse
+    features squeezed through n_hidden neurons and reconstructed. Mini-batch
+    Adam, every batch drawn fresh. The run is checkpointed under
+    cache/superposition (parameters, optimizer state, step and the batch
+    generator's state) and resumed from there, so finished runs load instantly.
+    Returns the parameters and the loss of each step run in this call.
+    """
+    config = dict(
+        n_features=n_features, n_hidden=n_hidden, sparsity=float(sparsity), importance_decay=float(importance_decay),
+        l1=float(l1), batch_size=batch_size, lr=float(lr), seed=seed,
+    )
+    path = cache_path("superposition", digest(config), ".npz")
+    importance = importance_decay ** np.arange(n_features)
+
+    params = init_params(n_features, n_hidden, seed)
+    m = {name: np.zeros_like(p) for name, p in params.items()}
+    v = {name: np.zeros_like(p) for name, p in params.items()}
+    rng = np.random.default_rng(seed)
+    step = 0
+    if os.path.exists(path):
+        with np.load(path) as data:
+            # Older checkpoints lack the generator state and can't resume exactly, so they are retrained
+            if "rng" in data.files:
+                step = int(data["step"])
+                rng.bit_generator.state = json.loads(str(data["rng"]))
+                for name in params:
+                    params[name], m[name], v[name] = data[name], data["m." + name], data["v." + name]
+
+    def save():
+        np.savez(path, step=step, rng=json.dumps(rng.bit_generator.state), **params, **{"m." + k: a for k, a in m.items()}, **{"v." + k: a for k, a in v.items()})
+
+    losses = []
+    while step < steps:
+        step += 1
+        loss, grads = gradients(params, feature_batch(rng, batch_size, n_features, sparsity), importance, l1)
+        losses.append(loss)
+        for name, g in grads.items():
+            m[name] = 0.9 * m[name] + 0.1 * g
+            v[name] = 0.999 * v[name] + 0.001 * g * g
+            params[name] -= lr * (m[name] / (1 - 0.9 ** step)) / (np.sqrt(v[name] / (1 - 0.999 ** step)) + 1e-8)
+        if step % checkpoint_every == 0 or step == steps:
+            save()
+    return params, np.array(losses)
+
+def neuron_metrics(W1, threshold=0.25):
+    """
+    Per hidden neuron: participation ratio of its input weights (1 when it
+    reads a single feature, up to n_features when it mixes them evenly) and
+    the features it responds to, those with a positive weight of at least
+    threshold times its largest one, strongest first.
+    """
+    w2 = W1 ** 2
+    participation = w2.sum(axis=1) ** 2 / np.maximum((w2 ** 2).sum(axis=1), 1e-12)
+    positive = np.maximum(W1, 0)
+    features = [
+        [int(f) for f in np.argsort(-row) if row[f] > 0 and row[f] >= threshold * row.max()]
+        for row in positive
+    ]
+    return participation, features
+
+def feature_dimensionality(W1):
+    """
+    Fraction of a hidden dimension each feature gets: ||W_i||^2 divided by the
+    sum of its squared overlaps with every feature (1 = a dedicated direction).
+    """
+    norms = np.linalg.norm(W1, axis=0)
+    overlap = (W1.T / np.maximum(norms, 1e-12)[:, None]) @ W1
+    return norms ** 2 / np.maximum((overlap ** 2).sum(axis=1), 1e-12)
+
+def feature_neurons(W1):
+    """
+    For each feature, the neuron that reads it most exclusively: the largest
+    positive weight scaled by the share of the neuron's weight norm it takes.
+    """
+    positive = np.maximum(W1, 0)
+    selectivity = positive ** 2 / np.maximum(np.linalg.norm(W1, axis=1, keepdims=True), 1e-12)
+    return selectivity.argmax(axis=0)
@@ -0,0 +1,63 @@
+from manim import *
+from manim.animation.animation import prepare_animation
+
+class Timeline:
+    """
+    Collects the beats of a slide (start time, animations, duration) and plays
+    everything between two slide breaks as a single continuous scene.play,
+    instead of paying the per-play overhead for every short animation.
+
+    Each animation only begins at its own start time, so later beats see the
+    state left behind by earlier ones, just like consecutive plays.
+    """
+    def __init__(self, scene):
+        self.scene = scene
+        self.beats = []
+        self.cursor = 0.0
+        self.end = 0.0
+
+    def add(self, *animations, start=None, **kwargs):
+        """
+        Adds animations that start together, by default when the previous beat
+        ends. Keyword arguments are applied to each animation like scene.play does.
+        """
+        start = self.cursor if start is None else start
+        duration = 0
+        for animation in animations:
+            animation = prepare_animation(animation)
+            for key, value in kwargs.items():
+                setattr(animation, key, value)
+            self.beats.append((start, animation))
+            duration = max(duration, animation.run_time)
+        self.cursor = start + duration
+        self.end = max(self.end, self.cursor)
+        return self
+
+    def wait(self, duration):
+        """Leaves a gap before the next beat."""
+        self.cursor += duration
+        self.end = max(self.end, self.cursor)
+        return self
+
+    def play(self):
+        """Plays the beats collected so far as one segment."""
+        if self.beats:
+            tracks = [
+                Succession(Wait(run_time=start), animation) if start > 0 else animation
+                for start, animation in self.beats
+            ]
+            # Trailing waits still belong to the segment
+            if self.end > max(start + animation.run_time for start, animation in self.beats):
+                tracks.append(Wait(run_time=self.end))
+            self.scene.play(AnimationGroup(*tracks, lag_ratio=0))
+        elif self.end > 0:
+            self.scene.wait(self.end)
+
+        self.beats = []
+        self.cursor = 0.0
+        self.end = 0.0
+
+    def next_slide(self):
+        """Plays the current segment and starts a new slide."""
+        self.play()
+        self.scene.next_slide()
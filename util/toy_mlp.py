@@ -0,0 +1,104 @@
+import numpy as np
+
+from util.cache import digest
+
+def relu(x):
+    return np.maximum(x, 0)
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+class ToyMLP:
+    """
+    A small ReLU MLP with a sigmoid output, evaluated with NumPy on whole
+    batches at once. Inputs of any shape are flattened per row, so a batch
+    of 3x3 grids can be passed as an (n, 3, 3) array.
+    """
+    def __init__(self, weights, biases):
+        self.weights = [np.asarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+
+    @classmethod
+    def from_seed(cls, sizes, seed=0):
+        rng = np.random.default_rng(seed)
+        weights = [rng.standard_normal((a, b)) * np.sqrt(2 / a) for a, b in zip(sizes, sizes[1:])]
+        biases = [np.zeros(b) for b in sizes[1:]]
+        return cls(weights, biases)
+
+    @property
+    def sizes(self):
+        return [self.weights[0].shape[0]] + [w.shape[1] for w in self.weights]
+
+    def forward(self, X, return_hidden=False):
+        """Output probabilities (n, outputs); optionally also every hidden activation."""
+        x = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+        hidden = []
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            x = relu(x @ w + b)
+            hidden.append(x)
+        out = sigmoid(x @ self.weights[-1] + self.biases[-1])
+        return (out, hidden) if return_hidden else out
+
+    __call__ = forward
+
+    def digest(self):
+        return digest(*self.weights, *self.biases)
+
+    def gradients(self, X, target=0):
+        """
+        Gradient of one output's logit wrt the input and every hidden layer,
+        for a whole batch in one backward pass. Returns (input gradient
+        shaped like X, hidden activations, hidden gradients).
+        """
+        _, hidden = self.forward(X, return_hidden=True)
+        delta = np.zeros((len(X), self.weights[-1].shape[1]))
+        delta[:, target] = 1
+        hidden_grads = []
+        for l in reversed(range(len(self.weights))):
+            delta = delta @ self.weights[l].T
+            if l > 0:
+                hidden_grads.insert(0, delta)
+                delta = delta * (hidden[l - 1] > 0)
+        return delta.reshape(np.shape(X)), hidden, hidden_grads
+
+    def fit(self, X, y, steps=500, lr=0.01, seed=0):
+        """Full-batch Adam on binary cross-entropy. y has shape (n,) or (n, outputs)."""
+        X = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+        y = np.asarray(y, dtype=np.float64).reshape(len(X), -1)
+        params = self.weights + self.biases
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        for t in range(1, steps + 1):
+            out, hidden = self.forward(X, return_hidden=True)
+            inputs = [X] + hidden
+            # Sigmoid + cross-entropy: the gradient wrt the logits is out - y
+            delta = (out - y) / len(X)
+            grad_w, grad_b = [], []
+            for l in reversed(range(len(self.weights))):
+                grad_w.insert(0, inputs[l].T @ delta)
+                grad_b.insert(0, delta.sum(axis=0))
+                if l > 0:
+                    delta = (delta @ self.weights[l].T) * (inputs[l] > 0)
+            for p, g, m_p, v_p in zip(params, grad_w + grad_b, m, v):
+                m_p[...] = 0.9 * m_p + 0.1 * g
+                v_p[...] = 0.999 * v_p + 0.001 * g * g
+                p -= lr * (m_p / (1 - 0.9 ** t)) / (np.sqrt(v_p / (1 - 0.999 ** t)) + 1e-8)
+        return self
+
+def make_grid_data(n_rows, seed=0):
+    """
+    Random 3x3 brightness grids with a soft label that rises as the main
+    diagonal gets brighter than the rest, the "pattern" the attribution
+    slides look for.
+    """
+    rng = np.random.default_rng(seed)
+    grids = rng.random((n_rows, 3, 3))
+    diagonal = np.eye(3, dtype=bool)
+    contrast = grids[:, diagonal].mean(axis=1) - grids[:, ~diagonal].mean(axis=1)
+    labels = sigmoid(10 * (contrast - 0.15))
+    return grids, labels
+
+def grid_model(seed=0):
+    """A 9-16-1 MLP trained to detect the bright diagonal (a fraction of a second)."""
+    grids, labels = make_grid_data(4096, seed)
+    return ToyMLP.from_seed([9, 16, 1], seed).fit(grids, labels)
@@ -0,0 +1,245 @@
+import logging
+import os
+import re
+
+import numpy as np
+
+from util.cache import cache_path, digest
+
+# Tokens of the bracket-nesting task: Python-style lists like `values = [[5, 3]]`
+PAD, BOS, UNK = "<pad>", "<bos>", "<unk>"
+VOCAB = [PAD, BOS, UNK, "values", "=", "[", "[[", "]", "]]", ","] + [str(i) for i in range(16)]
+TOKEN_IDS = {token: i for i, token in enumerate(VOCAB)}
+TOKEN_PATTERN = re.compile(r"\[\[|\]\]|\[|\]|,|=|\d+|[A-Za-z_]+")
+
+DEFAULT_CONFIG = {
+    "d_model": 32,
+    "n_layers": 5,
+    "n_heads": 2,
+    "d_head": 16,
+    "d_mlp": 64,
+    "n_ctx": 32,
+}
+
+def tokenize(text):
+    """Splits a snippet into tokens, e.g. `values = [[5, 3` -> values, =, [[, 5, ",", 3."""
+    return TOKEN_PATTERN.findall(text)
+
+def encode(texts, n_ctx=None):
+    """Encodes snippets as a right-padded (batch, seq) array, each starting with <bos>."""
+    rows = [[TOKEN_IDS[BOS]] + [TOKEN_IDS.get(t, TOKEN_IDS[UNK]) for t in tokenize(text)] for text in texts]
+    length = max(len(row) for row in rows)
+    if n_ctx is not None and length > n_ctx:
+        raise ValueError(f"Snippet needs {length} tokens but the context is {n_ctx}")
+    tokens = np.full((len(rows), length), TOKEN_IDS[PAD], dtype=np.int64)
+    for i, row in enumerate(rows):
+        tokens[i, :len(row)] = row
+    return tokens
+
+def rms_norm(x, w, eps=1e-6):
+    return x / np.sqrt((x * x).mean(-1, keepdims=True) + eps) * w
+
+def softmax(x, axis=-1):
+    x = x - x.max(axis=axis, keepdims=True)
+    e = np.exp(x)
+    return e / e.sum(axis=axis, keepdims=True)
+
+def init_params(config, seed=0):
+    """Random weights for a toy transformer, as a flat dict of float32 arrays."""
+    rng = np.random.default_rng(seed)
+    d, h, e, m = config["d_model"], config["n_heads"], config["d_head"], config["d_mlp"]
+    v = len(VOCAB)
+
+    def normal(*shape, fan_in):
+        return (rng.standard_normal(shape) / np.sqrt(fan_in)).astype(np.float32)
+
+    params = {
+        "embed": normal(v, d, fan_in=1),
+        "pos": normal(config["n_ctx"], d, fan_in=1) * 0.1,
+        "ln_final.w": np.ones(d, dtype=np.float32),
+        "unembed": normal(d, v, fan_in=d),
+    }
+    for l in range(config["n_layers"]):
+        params.update({
+            f"blocks.{l}.ln1.w": np.ones(d, dtype=np.float32),
+            f"blocks.{l}.attn.W_Q": normal(h, d, e, fan_in=d),
+            f"blocks.{l}.attn.W_K": normal(h, d, e, fan_in=d),
+            f"blocks.{l}.attn.W_V": normal(h, d, e, fan_in=d),
+            f"blocks.{l}.attn.W_O": normal(h, e, d, fan_in=h * e),
+            f"blocks.{l}.ln2.w": np.ones(d, dtype=np.float32),
+            f"blocks.{l}.mlp.W_in": normal(d, m, fan_in=d),
+            f"blocks.{l}.mlp.b_in": np.zeros(m, dtype=np.float32),
+            f"blocks.{l}.mlp.W_out": normal(m, d, fan_in=m),
+            f"blocks.{l}.mlp.b_out": np.zeros(d, dtype=np.float32),
+        })
+    return params
+
+class ToyTransformer:
+    """
+    A small decoder-only transformer (RMSNorm, multi-head causal attention,
+    ReLU MLP) evaluated with NumPy on whole batches at once.
+
+    Every intermediate activation passes through a named hook point:
+        hook_embed
+        blocks.{l}.hook_resid_pre
+        blocks.{l}.attn.hook_pattern   (batch, head, query, key)
+        blocks.{l}.attn.hook_z         (batch, pos, head, d_head)
+        blocks.{l}.hook_attn_out
+        blocks.{l}.hook_resid_mid
+        blocks.{l}.mlp.hook_post       (batch, pos, d_mlp)
+        blocks.{l}.hook_mlp_out
+        hook_resid_final
+    """
+    def __init__(self, params, config=None):
+        self.params = params
+        self.config = dict(config or DEFAULT_CONFIG)
+
+    @classmethod
+    def init(cls, config=None, seed=0):
+        config = dict(config or DEFAULT_CONFIG)
+        return cls(init_params(config, seed), config)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            params = {}
+            for name in data.files:
+                if name == "config" or "@" in name:
+                    continue
+                params[name] = data[name].astype(np.float32)
+            # Compact checkpoints store sparse matrices as (flat index, float16 value) pairs
+            for name in {key.split("@")[0] for key in data.files if "@" in key}:
+                dense = np.zeros(data[name + "@shape"], dtype=np.float32)
+                dense.flat[data[name + "@index"]] = data[name + "@value"]
+                params[name] = dense
+            config = dict(zip(DEFAULT_CONFIG, data["config"].tolist()))
+        return cls(params, config)
+
+    def save(self, path, compact=False):
+        """
+        Saves the config and weights. compact stores every matrix that is at
+        least half zeros as its non-zero indices and float16 values.
+        """
+        config = np.array([self.config[name] for name in DEFAULT_CONFIG])
+        arrays = {}
+        for name, param in self.params.items():
+            if compact and param.ndim > 1 and (param == 0).mean() >= 0.5:
+                index = np.flatnonzero(param)
+                arrays[name + "@shape"] = np.array(param.shape)
+                arrays[name + "@index"] = index.astype(np.uint32)
+                arrays[name + "@value"] = param.flat[index].astype(np.float16)
+            else:
+                arrays[name] = param
+        np.savez_compressed(path, config=config, **arrays)
+
+    def digest(self):
+        return digest("toy-transformer", self.config, *[
+            part for name in sorted(self.params) for part in (name, self.params[name])
+        ])
+
+    def hook_names(self):
+        names = ["hook_embed"]
+        for l in range(self.config["n_layers"]):
+            names += [
+                f"blocks.{l}.hook_resid_pre",
+                f"blocks.{l}.attn.hook_pattern",
+                f"blocks.{l}.attn.hook_z",
+                f"blocks.{l}.hook_attn_out",
+                f"blocks.{l}.hook_resid_mid",
+                f"blocks.{l}.mlp.hook_post",
+                f"blocks.{l}.hook_mlp_out",
+            ]
+        return names + ["hook_resid_final"]
+
+    def forward(self, tokens, hooks=None, cache=None):
+        """
+        Runs a (batch, seq) token array and returns the logits.
+
+        hooks maps hook names to functions that may return a replacement
+        activation; cache, if given, is filled with every activation.
+        """
+        p = self.params
+        d_head = self.config["d_head"]
+
+        def hook(name, act):
+            if hooks and name in hooks:
+                out = hooks[name](act)
+                if out is not None:
+                    act = out
+            if cache is not None:
+                cache[name] = act
+            return act
+
+        batch, seq = tokens.shape
+        # Causal mask that also hides padding keys: (batch, 1, query, key)
+        causal = np.tril(np.ones((seq, seq), dtype=bool))
+        mask = causal[None, None] & (tokens != TOKEN_IDS[PAD])[:, None, None, :]
+
+        x = hook("hook_embed", p["embed"][tokens] + p["pos"][:seq])
+        for l in range(self.config["n_layers"]):
+            x = hook(f"blocks.{l}.hook_resid_pre", x)
+
+            h = rms_norm(x, p[f"blocks.{l}.ln1.w"])
+            q = np.einsum("btd,hde->bhte", h, p[f"blocks.{l}.attn.W_Q"])
+            k = np.einsum("btd,hde->bhte", h, p[f"blocks.{l}.attn.W_K"])
+            v = np.einsum("btd,hde->bhte", h, p[f"blocks.{l}.attn.W_V"])
+            scores = np.einsum("bhqe,bhke->bhqk", q, k) / np.sqrt(d_head)
+            pattern = hook(f"blocks.{l}.attn.hook_pattern", softmax(np.where(mask, scores, -1e9)))
+            z = hook(f"blocks.{l}.attn.hook_z", np.einsum("bhqk,bhke->bqhe", pattern, v))
+            attn_out = hook(f"blocks.{l}.hook_attn_out", np.einsum("bqhe,hed->bqd", z, p[f"blocks.{l}.attn.W_O"]))
+            x = hook(f"blocks.{l}.hook_resid_mid", x + attn_out)
+
+            h = rms_norm(x, p[f"blocks.{l}.ln2.w"])
+            post = np.maximum(h @ p[f"blocks.{l}.mlp.W_in"] + p[f"blocks.{l}.mlp.b_in"], 0)
+            post = hook(f"blocks.{l}.mlp.hook_post", post)
+            mlp_out = hook(f"blocks.{l}.hook_mlp_out", post @ p[f"blocks.{l}.mlp.W_out"] + p[f"blocks.{l}.mlp.b_out"])
+            x = x + mlp_out
+
+        x = hook("hook_resid_final", x)
+        return rms_norm(x, p["ln_final.w"]) @ p["unembed"]
+
+    def run_with_cache(self, tokens, names=None, hooks=None):
+        """Runs the model and returns (logits, {hook name: activation})."""
+        cache = {}
+        logits = self.forward(tokens, hooks=hooks, cache=cache)
+        if names is not None:
+            cache = {name: cache[name] for name in names}
+        return logits, cache
+
+def cached_activations(model, texts, names, batch_size=256):
+    """
+    Activations of `names` for many snippets, computed in batches once and
+    stored as float16 in a compressed .npz keyed by model, snippets and names.
+    Returns a dict with the tokens, logits and each requested activation.
+    """
+    path = cache_path("activations", digest("activations", model.digest(), list(texts), list(names)), ".npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    tokens = encode(texts, model.config["n_ctx"])
+    results = {"tokens": tokens, "logits": [], **{name: [] for name in names}}
+    for start in range(0, len(tokens), batch_size):
+        logits, cache = model.run_with_cache(tokens[start:start + batch_size], names=names)
+        results["logits"].append(logits.astype(np.float16))
+        for name in names:
+            results[name].append(cache[name].astype(np.float16))
+
+    for name in ["logits", *names]:
+        results[name] = np.concatenate(results[name])
+    np.savez_compressed(path, **results)
+    return results
+
+def load_model(path=None):
+    """
+    Loads a trained checkpoint if there is one, otherwise a seeded random
+    model, with a warning: its attention patterns and patching effects
+    mean nothing.
+    """
+    if path and os.path.exists(path):
+        return ToyTransformer.load(path)
+    logging.getLogger(__name__).warning(
+        f"No checkpoint at {path!r}, using an untrained model. "
+        "Train it with: python -m util.bracket_trainer --keep 1 0.25 0.1 0.05 --jobs -1"
+    )
+    return ToyTransformer.init()
@@ -0,0 +1,60 @@
+from manim import *
+
+# How the outgoing section leaves the screen
+TRANSITIONS = {
+    "fade": lambda mob: FadeOut(mob),
+    "shrink": lambda mob: FadeOut(mob, scale=0.5),
+    "slide": lambda mob: FadeOut(mob, shift=LEFT * config.frame_width),
+    "rise": lambda mob: FadeOut(mob, shift=UP),
+}
+
+def snapshot(scene):
+    """
+    Renders the current frame once and returns it as an ImageMobject covering
+    the frame, or None if the renderer can't hand out its frame.
+    """
+    renderer = scene.renderer
+    if not hasattr(renderer, "get_frame"):
+        return None
+    renderer.update_frame(scene)
+    image = ImageMobject(renderer.get_frame(), scale_to_resolution=config.pixel_height)
+    if hasattr(scene.camera, "frame"):
+        # Moving camera: cover wherever the frame currently is
+        image.scale_to_fit_height(scene.camera.frame.height).move_to(scene.camera.frame)
+    return image
+
+def release(mobjects):
+    """Drops the point data of mobjects that are no longer needed."""
+    for mob in mobjects:
+        for sub in mob.get_family():
+            sub.clear_updaters()
+            if isinstance(sub, VMobject):
+                sub.points = np.zeros((0, 3))
+
+def clear_scene(scene, style="fade", run_time=1):
+    """
+    Transitions out everything on screen with a single animation and leaves
+    the scene empty.
+
+    The frame is rendered once and the transition animates that image, so a
+    frame of the transition costs the same however many mobjects were on
+    screen. The old mobjects are removed and their points released up front.
+    """
+    mobjects = list(scene.mobjects)
+    if not mobjects:
+        return
+
+    transition = TRANSITIONS[style]
+    image = snapshot(scene)
+    if image is None:
+        scene.play(transition(Group(*mobjects)), run_time=run_time)
+        scene.remove(*mobjects)
+        release(mobjects)
+        return
+
+    scene.remove(*mobjects)
+    release(mobjects)
+    if hasattr(scene, "add_fixed_in_frame_mobjects"):
+        # Keep the snapshot glued to the screen whatever the 3D camera does
+        scene.add_fixed_in_frame_mobjects(image)
+    scene.play(transition(image), run_time=run_time)
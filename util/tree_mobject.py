@@ -0,0 +1,146 @@
+from manim import *
+
+from util.decision_tree import TREE_LEAF, decision_path, tidy_layout
+
+def segment_points(starts, ends):
+    """Straight cubic Bezier segments from starts to ends, as a (4n, 3) array."""
+    delta = ends - starts
+    return np.stack([starts, starts + delta / 3, starts + 2 * delta / 3, ends], axis=1).reshape(-1, 3)
+
+def tip_points(starts, ends, length=0.2, width=0.16):
+    """Closed triangular arrow tips pointing at ends, as a (12n, 3) array."""
+    direction = ends - starts
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    normal = np.stack([-direction[:, 1], direction[:, 0], np.zeros(len(direction))], axis=1)
+    base = ends - direction * length
+    left, right = base + normal * width / 2, base - normal * width / 2
+    corners = [ends, left, right, ends]
+    return np.stack([
+        segment_points(a, b).reshape(-1, 4, 3) for a, b in zip(corners, corners[1:])
+    ], axis=1).reshape(-1, 3)
+
+class DecisionTreeMobject(VGroup):
+    """
+    Draws a tree given in flat-array form with batched geometry: one VMobject
+    per (depth, node style) for the boxes and per (depth, branch) for the
+    arrows, so trees of depth 8-10 stay a few dozen mobjects.
+
+    Internal nodes read "<feature> > <threshold>?"; the right branch is Yes.
+    Text labels are only drawn for small trees.
+    """
+    def __init__(
+        self, tree, class_colors, feature_formats=None,
+        h_spacing=3.0, v_spacing=2.5, node_width=2.5, leaf_width=2.0, node_height=0.8,
+        max_labelled_nodes=31, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.tree = tree
+        left, right = tree["children_left"], tree["children_right"]
+        n_nodes = len(left)
+        is_leaf = left == TREE_LEAF
+        feature_formats = feature_formats or ["{:g}"] * len(tree["feature_names"])
+
+        slot, depth = tidy_layout(left, right)
+        centers = np.zeros((n_nodes, 3))
+        centers[:, 0] = (slot - slot.max() / 2) * h_spacing
+        centers[:, 1] = -depth * v_spacing
+        widths = np.where(is_leaf, leaf_width, node_width)
+        classes = tree["value"].argmax(axis=1)
+        # Internal nodes are style -1, leaves are styled by their majority class
+        styles = np.where(is_leaf, classes, -1)
+        show_labels = n_nodes <= max_labelled_nodes
+
+        # Invisible per-node anchors (center and top-right corner) that follow
+        # every transform, so highlights can be placed after moving the tree
+        corners = centers + np.stack([widths / 2, np.full(n_nodes, node_height / 2), np.zeros(n_nodes)], axis=1)
+        self.anchors = VMobject(stroke_width=0, fill_opacity=0)
+        self.anchors.set_points(segment_points(centers, corners))
+        self.add(self.anchors)
+
+        self.nodes, self.node_labels, self.edges, self.edge_labels = [], [], [], []
+        for d in range(depth.max() + 1):
+            at_depth = depth == d
+
+            nodes = VGroup()
+            for style in np.unique(styles[at_depth]):
+                index = np.flatnonzero(at_depth & (styles == style))
+                width = node_width if style == -1 else leaf_width
+                template = RoundedRectangle(width=width, height=node_height, corner_radius=0.15).points
+                color = BLUE if style == -1 else class_colors[style]
+                boxes = VMobject(
+                    color=color, fill_opacity=0.3 if style == -1 else 0.4, stroke_width=3
+                )
+                boxes.set_points((template[None] + centers[index, None, :]).reshape(-1, 3))
+                nodes.add(boxes)
+
+            node_labels = VGroup()
+            if show_labels:
+                for i in np.flatnonzero(at_depth):
+                    if is_leaf[i]:
+                        text = rf"\textbf{{{tree['class_names'][classes[i]]}}}"
+                    else:
+                        f = tree["feature"][i]
+                        text = tree["feature_names"][f] + r" $>$ " + feature_formats[f].format(tree["threshold"][i]) + "?"
+                    node_labels.add(Tex(text, font_size=24, color=WHITE).move_to(centers[i]))
+
+            edges, edge_labels = VGroup(), VGroup()
+            if d > 0:
+                parents = np.flatnonzero((depth == d - 1) & ~is_leaf)
+                for branch, children, color, word, side in (
+                    ("yes", right[parents], GREEN, "Yes", RIGHT),
+                    ("no", left[parents], RED, "No", LEFT),
+                ):
+                    # Leave the parent from a point offset towards the child, like the hand-drawn tree
+                    offset = np.sign(centers[children, 0] - centers[parents, 0])[:, None] * np.array([0.6, 0, 0])
+                    starts = centers[parents] + offset - np.array([0, node_height / 2 + 0.1, 0])
+                    ends = centers[children] + np.array([0, node_height / 2 + 0.1, 0]) - offset / 2
+                    arrows = VMobject(color=color, stroke_width=4, fill_color=color, fill_opacity=1)
+                    arrows.set_points(np.concatenate([segment_points(starts, ends), tip_points(starts, ends)]))
+                    edges.add(arrows)
+                    if show_labels:
+                        for start, end in zip(starts, ends):
+                            edge_labels.add(Tex(word, font_size=20, color=color).next_to((start + end) / 2, side, buff=0.1))
+
+            self.nodes.append(nodes)
+            self.node_labels.append(node_labels)
+            self.edges.append(edges)
+            self.edge_labels.append(edge_labels)
+            self.add(edges, nodes, node_labels, edge_labels)
+
+    def node_box(self, i):
+        """Returns the current (center, width, height) of node i."""
+        center, corner = self.anchors.points[4 * i], self.anchors.points[4 * i + 3]
+        half = corner - center
+        return center, 2 * half[0], 2 * half[1]
+
+    def highlight_path(self, row, color=YELLOW):
+        """
+        Traverses the tree for one input row and returns one (node outline,
+        arrow into the next node) pair per step; the last arrow is None.
+        """
+        path = decision_path(self.tree, row)
+        steps = []
+        for k, node in enumerate(path):
+            center, width, height = self.node_box(node)
+            outline = RoundedRectangle(width=width, height=height, corner_radius=0.15, color=color, stroke_width=5).move_to(center)
+            arrow = None
+            if k + 1 < len(path):
+                child_center, _, child_height = self.node_box(path[k + 1])
+                arrow = Arrow(
+                    center + DOWN * height / 2, child_center + UP * child_height / 2,
+                    color=color, buff=0.1, stroke_width=6, max_tip_length_to_length_ratio=0.2,
+                )
+            steps.append((outline, arrow))
+        return steps
+
+    def explain(self, row, feature_formats=None):
+        """Returns the conditions on the decision path of a row as Tex strings."""
+        tree = self.tree
+        feature_formats = feature_formats or ["{:g}"] * len(tree["feature_names"])
+        path = decision_path(tree, row)
+        conditions = []
+        for node, child in zip(path, path[1:]):
+            f = tree["feature"][node]
+            op = r"$\le$" if child == tree["children_left"][node] else r"$>$"
+            conditions.append(f"{tree['feature_names'][f]} {op} {feature_formats[f].format(tree['threshold'][node])}")
+        return conditions